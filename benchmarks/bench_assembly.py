@@ -0,0 +1,186 @@
+"""
+ECIDS Assembly Benchmark - merge chain vs. aligned concat
+
+Compares the two ways of assembling the indicator frame from the four domain
+frames (and attaching it to the Child table, as generate_full_dataset does):
+1. Merge chain: four left merges on Child DCN, then a merge onto Child
+2. Aligned: domain frames indexed in Child.csv order, one concat(axis=1),
+   then positional column assignment (what risk_scoring does now)
+
+The population is scaled up by cloning synthetic_data children under new
+DCNs (--children, default 1M), so no data generation is needed. Domain
+frames are calculated once; only the assembly step is measured, each run in
+a forked process: wall time and peak RSS growth (Linux, via /proc).
+
+Usage:
+    python benchmarks/bench_assembly.py [--data-dir synthetic_data] [--children 1000000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from risk_scoring import TABLE_ATTRS, ReadinessRiskScorer  # noqa: E402
+
+
+# Columns the domain calculators read (clones carry nothing else, to save memory)
+SCORING_COLUMNS = {
+    "ChildParticipation": ["EnrollmentDate", "ServicePlanEndDate", "NumberOfDaysInAttendance"],
+    "ChildDisability": [],
+    "ChildImmunization": [],
+    "ChildScreening": [],
+    "ChildOutcomes": ["COSRatingA.Description", "COSRatingB.Description",
+                      "COSRatingC.Description", "COSRatingPhysical.Description"],
+}
+
+
+def scale_scorer(data_dir, num_children):
+    """Scorer whose scoring tables are synthetic_data cloned up to num_children"""
+    base = ReadinessRiskScorer(data_dir)
+    base_dcns = base.df_child["Child DCN"]
+    copies = -(-num_children // len(base_dcns))  # ceil
+    # The last copy only takes the first few children
+    last_copy_dcns = base_dcns.iloc[:num_children - (copies - 1) * len(base_dcns)]
+
+    scaled = ReadinessRiskScorer(data_dir)
+    for table in ReadinessRiskScorer.SCORING_TABLES:
+        df = getattr(base, TABLE_ATTRS[table])
+        if table in SCORING_COLUMNS:
+            df = df[["Child DCN", *SCORING_COLUMNS[table]]]
+
+        copy_id = np.repeat(np.arange(copies, dtype=np.int64), len(df))
+        in_last = np.tile(df["Child DCN"].isin(last_copy_dcns).to_numpy(), copies)
+        keep = (copy_id < copies - 1) | in_last
+
+        clone = df.iloc[np.tile(np.arange(len(df)), copies)[keep]].reset_index(drop=True)
+        # New DCN = copy number * 10^10 + original DCN, still unique 10+ digit strings
+        dcn = copy_id[keep] * 10**10 + np.tile(df["Child DCN"].astype("int64").to_numpy(), copies)[keep]
+        clone["Child DCN"] = pd.array(dcn.astype(str), dtype=df["Child DCN"].dtype)
+        setattr(scaled, TABLE_ATTRS[table], clone)
+    return scaled
+
+
+def merge_assembly(child, domains):
+    """The original assembly: successive left merges on Child DCN"""
+    risk_df = child[["Child DCN", "Child MOSIS ID"]].copy()
+    for domain in domains:
+        risk_df = risk_df.merge(domain.reset_index(), on="Child DCN", how="left")
+
+    new_cols = [col for col in risk_df.columns if col not in child.columns or col == "Child DCN"]
+    return child.merge(risk_df[new_cols], on="Child DCN", how="left")
+
+
+def aligned_assembly(child, domains):
+    """DCN-aligned domain frames: one concat, then positional assignment"""
+    ids = child[["Child DCN", "Child MOSIS ID"]].set_index("Child DCN", drop=False)
+    risk_df = pd.concat([ids[["Child MOSIS ID"]], *domains], axis=1)
+    risk_df.insert(0, "Child DCN", ids["Child DCN"].array)
+    risk_df = risk_df.reset_index(drop=True)
+
+    full_df = child.copy()
+    for col in risk_df.columns:
+        if col not in full_df.columns:
+            full_df[col] = risk_df[col].array
+    return full_df
+
+
+def proc_status_mb(field):
+    """VmRSS/VmHWM of this process in MB (Linux /proc)"""
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def reset_peak_rss():
+    """Reset this process's VmHWM to its current RSS (Linux); returns that RSS in MB"""
+    Path("/proc/self/clear_refs").write_text("5")
+    return proc_status_mb("VmRSS")
+
+
+def run_forked(func, *args):
+    """func(*args) in a forked child process; returns its (JSON-serializable) result"""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 1
+        try:
+            os.write(write_fd, json.dumps(func(*args)).encode())
+            status = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        payload = pipe.read()
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        raise RuntimeError(f"{func.__name__} failed in the forked benchmark process")
+    return json.loads(payload)
+
+
+def timed_call(func, *args):
+    """[wall seconds, peak MB growth] for one call of func(*args) in this process"""
+    start_mb = reset_peak_rss()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    return [elapsed, proc_status_mb("VmHWM") - start_mb]
+
+
+def measure(func, *args):
+    """
+    (wall seconds, peak MB) for one call of func(*args), run in a forked
+    child so the peak RSS it reports belongs to this call alone
+    """
+    elapsed, peak_mb = run_forked(timed_call, func, *args)
+    return elapsed, peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark merge vs. aligned indicator assembly")
+    parser.add_argument("--data-dir", default="synthetic_data")
+    parser.add_argument("--children", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"Scaling {args.data_dir} to {args.children:,} children...")
+    scorer = scale_scorer(args.data_dir, args.children)
+    child = scorer.df_child
+    domains = [
+        scorer.calculate_stability_indicators(),
+        scorer.calculate_engagement_indicators(),
+        scorer.calculate_developmental_indicators(),
+        scorer.calculate_context_indicators(),
+    ]
+
+    merge_time, merge_mb = measure(merge_assembly, child, domains)
+    aligned_time, aligned_mb = measure(aligned_assembly, child, domains)
+    merged = merge_assembly(child, domains)
+    if not merged.equals(aligned_assembly(child, domains)[merged.columns]):
+        sys.exit("Merge and aligned assemblies differ")
+
+    print()
+    print("=" * 70)
+    print("ASSEMBLY BENCHMARK")
+    print("=" * 70)
+    print(f"  Children:         {len(child):,}")
+    print(f"  Merge chain:      {merge_time:.3f}s  peak {merge_mb:,.0f} MB")
+    print(f"  Aligned concat:   {aligned_time:.3f}s  peak {aligned_mb:,.0f} MB  "
+          f"({merge_time / aligned_time:.1f}x faster)")
+    print("✓ Both assemblies produce the same frame")
+
+
+if __name__ == "__main__":
+    main()
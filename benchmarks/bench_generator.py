@@ -0,0 +1,70 @@
+"""
+ECIDS Generator Benchmark - peak memory vs. population size
+
+Generates synthetic populations of increasing size two ways and reports wall
+time and peak RSS growth of each run (forked, Linux /proc, as in
+bench_assembly):
+1. Whole tables: the population in a single batch (every table built in full
+   before it is written, as the generator used to work)
+2. Streamed: batches of --batch-size children appended to the files
+
+Streamed peak memory should stay flat as the population grows, while the
+whole-table peak grows with it; whole-table runs are skipped above
+--max-whole children to stay within RAM. Only generation and writing are
+measured (Faker name pools are built once up front; no QA summary).
+
+Usage:
+    python benchmarks/bench_generator.py [--sizes 10000 50000 200000 1000000]
+                                         [--batch-size 50000] [--format csv]
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_assembly import measure  # noqa: E402
+from generate_ecids_data import BATCH_SIZE, SEED, build_name_pools, stream_tables  # noqa: E402
+
+
+def generate(names, num_children, batch_size, file_format):
+    """One generator run into a scratch directory"""
+    with tempfile.TemporaryDirectory(prefix="ecids_bench_") as out_dir:
+        stream_tables(np.random.default_rng(SEED), names, 1, num_children, out_dir,
+                      batch_size, file_format, verbose=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generator peak memory vs. population size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 200_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--max-whole", type=int, default=200_000,
+                        help="Largest population to also generate as whole tables")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    args = parser.parse_args()
+
+    names = build_name_pools(SEED)
+    rows = []
+    for size in args.sizes:
+        print(f"Generating {size:,} children...")
+        streamed = measure(generate, names, size, args.batch_size, args.format)
+        whole = (measure(generate, names, size, size, args.format)
+                 if size <= args.max_whole else None)
+        rows.append((size, whole, streamed))
+
+    print()
+    print("=" * 70)
+    print(f"GENERATOR BENCHMARK ({args.format}, batches of {args.batch_size:,} children)")
+    print("=" * 70)
+    print(f"  {'Children':>10}  {'Whole tables':>22}  {'Streamed':>22}")
+    for size, whole, streamed in rows:
+        whole_text = f"{whole[0]:7.1f}s {whole[1]:8,.0f} MB" if whole else "skipped"
+        print(f"  {size:>10,}  {whole_text:>22}  {streamed[0]:7.1f}s {streamed[1]:8,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+ECIDS Load Benchmark - CSV vs. Parquet cache
+
+Times ReadinessRiskScorer.load_data three ways:
+1. CSV only (cache disabled)
+2. Cold cache (cache removed first, so CSVs are parsed and the cache written)
+3. Warm cache (Parquet reads)
+
+Usage:
+    python benchmarks/bench_load.py [--data-dir synthetic_data] [--repeat 3]
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ecids_io import CACHE_DIRNAME, HAS_PYARROW  # noqa: E402
+from risk_scoring import ReadinessRiskScorer  # noqa: E402
+
+
+def time_load(scorer, repeat, before=None):
+    """Best-of-N wall time for scorer.load_data()"""
+    timings = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        scorer.load_data()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ECIDS cold vs. warm loads")
+    parser.add_argument("--data-dir", default="synthetic_data")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not HAS_PYARROW:
+        sys.exit("pyarrow is required for the Parquet cache benchmark")
+
+    data_dir = Path(args.data_dir)
+    cache_dir = data_dir / CACHE_DIRNAME
+
+    def drop_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    csv_scorer = ReadinessRiskScorer(data_dir, use_cache=False)
+    csv_time = time_load(csv_scorer, args.repeat)
+
+    cached_scorer = ReadinessRiskScorer(data_dir)
+    cold_time = time_load(cached_scorer, args.repeat, before=drop_cache)
+    warm_time = time_load(cached_scorer, args.repeat)
+
+    csv_bytes = sum(f.stat().st_size for f in data_dir.glob("*.csv"))
+    cache_bytes = sum(f.stat().st_size for f in cache_dir.glob("*.parquet"))
+
+    print()
+    print("=" * 70)
+    print("LOAD BENCHMARK")
+    print("=" * 70)
+    print(f"  Data directory:   {data_dir}")
+    print(f"  CSV size:         {csv_bytes / 1e6:,.1f} MB")
+    print(f"  Cache size:       {cache_bytes / 1e6:,.1f} MB")
+    print(f"  CSV only:         {csv_time:.3f}s")
+    print(f"  Cold (build):     {cold_time:.3f}s")
+    print(f"  Warm (cached):    {warm_time:.3f}s  ({csv_time / warm_time:.1f}x faster than CSV)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+ECIDS Scoring Benchmark - ReadinessRiskScorer stages vs. population size
+
+Generates synthetic populations (generate_ecids_data, seed 42) and times each
+stage of the scoring engine on them:
+1. load_data (typed CSV reads, Parquet cache disabled)
+2. calculate_stability/engagement/developmental/context_indicators
+3. calculate_indicators (the four domains + assembly)
+4. calculate_domain_scores, calculate_composite_score
+5. generate_full_dataset (no export)
+
+Each population size runs in its own forked process; within it, stages run in
+order and each records wall time and peak RSS growth (VmHWM reset before the
+stage, Linux /proc, as in bench_assembly). Populations are generated once and
+kept in --data-root for later runs (10M children take ~5 GB of CSV, and
+scoring them needs well over 16 GB of RAM).
+
+Results are written as JSON (--out) and compared against a stored baseline:
+a stage regresses when it is more than --tolerance slower (or uses that much
+more memory) than the baseline, beyond a small absolute noise floor. Any
+regression makes the script exit with status 1.
+
+Usage:
+    python benchmarks/bench_scoring.py [--sizes 5000 100000 1000000 10000000]
+                                       [--baseline benchmarks/results/scoring_baseline.json]
+                                       [--save-baseline] [--tolerance 0.25]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_assembly import proc_status_mb, reset_peak_rss, run_forked  # noqa: E402
+from generate_ecids_data import BATCH_SIZE, SEED, build_name_pools, stream_tables  # noqa: E402
+from risk_scoring import ReadinessRiskScorer  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+DATA_ROOT = BENCH_DIR / ".data"
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINE_FILE = RESULTS_DIR / "scoring_baseline.json"
+RESULTS_VERSION = 1
+
+SIZES = [5_000, 100_000, 1_000_000]
+DOMAIN_STAGES = ["calculate_stability_indicators", "calculate_engagement_indicators",
+                 "calculate_developmental_indicators", "calculate_context_indicators"]
+TOLERANCE = 0.25
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_MB = 25
+
+
+def population_dir(data_root, num_children):
+    return Path(data_root) / f"children_{num_children}_seed{SEED}"
+
+
+def generate_population(out_dir, num_children):
+    stream_tables(np.random.default_rng(SEED), build_name_pools(SEED), 1, num_children,
+                  out_dir, BATCH_SIZE, "csv", verbose=False)
+
+
+def ensure_population(data_root, num_children):
+    """Generated population directory for num_children, generating it if needed"""
+    data_dir = population_dir(data_root, num_children)
+    if (data_dir / "Child.csv").exists():
+        return data_dir
+
+    print(f"Generating {num_children:,} children into {data_dir}...")
+    tmp_dir = data_dir.with_name(f"{data_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    run_forked(generate_population, str(tmp_dir), num_children)
+    os.replace(tmp_dir, data_dir)
+    return data_dir
+
+
+def score_stages(data_dir):
+    """Run every scorer stage on data_dir in order: {stage: {"seconds", "peak_mb"}}"""
+    stages = {}
+
+    def stage(name, func, *args):
+        start_mb = reset_peak_rss()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func(*args)
+        stages[name] = {"seconds": round(time.perf_counter() - start, 4),
+                        "peak_mb": round(proc_status_mb("VmHWM") - start_mb, 1)}
+        return result
+
+    scorer = ReadinessRiskScorer(data_dir, use_cache=False)
+    stage("load_data", scorer.load_data)
+    for name in DOMAIN_STAGES:
+        stage(name, getattr(scorer, name))
+    risk_df = stage("calculate_indicators", scorer.calculate_indicators)
+    risk_df = stage("calculate_domain_scores", scorer.calculate_domain_scores, risk_df)
+    risk_df = stage("calculate_composite_score", scorer.calculate_composite_score, risk_df)
+    stage("generate_full_dataset", lambda: scorer.generate_full_dataset(risk_df=risk_df))
+    return {"children": len(scorer.df_child), "stages": stages}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Regressions vs. baseline: list of (size, stage, metric, baseline value, value)"""
+    regressions = []
+    for size, result in results["sizes"].items():
+        base_stages = baseline["sizes"].get(size, {}).get("stages", {})
+        for stage, metrics in result["stages"].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            for metric, floor in (("seconds", MIN_SECONDS), ("peak_mb", MIN_MB)):
+                if (metrics[metric] > base[metric] * (1 + tolerance)
+                        and metrics[metric] - base[metric] > floor):
+                    regressions.append((size, stage, metric, base[metric], metrics[metric]))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print()
+    print("=" * 70)
+    print("SCORING BENCHMARK")
+    print("=" * 70)
+    for size, result in results["sizes"].items():
+        base_stages = (baseline or {}).get("sizes", {}).get(size, {}).get("stages", {})
+        print(f"\n  {result['children']:,} children")
+        print(f"  {'Stage':<36} {'Time':>9} {'Peak':>10} {'vs. baseline':>12}")
+        for stage, metrics in result["stages"].items():
+            base = base_stages.get(stage)
+            change = f"{metrics['seconds'] / base['seconds']:11.2f}x" if base and base["seconds"] else ""
+            print(f"  {stage:<36} {metrics['seconds']:8.3f}s {metrics['peak_mb']:7,.0f} MB {change:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ReadinessRiskScorer stages vs. population size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="Population sizes (add 10000000 on a large machine)")
+    parser.add_argument("--data-root", default=str(DATA_ROOT),
+                        help="Where generated populations are kept between runs")
+    parser.add_argument("--out", default=None,
+                        help="Results JSON (default: benchmarks/results/scoring_<timestamp>.json)")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE),
+                        help="Baseline results JSON to compare against (skipped if missing)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Also write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="Allowed slowdown / memory growth vs. the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {"benchmark": "scoring", "version": RESULTS_VERSION,
+               "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+               "environment": environment(), "sizes": {}}
+    for size in args.sizes:
+        data_dir = ensure_population(args.data_root, size)
+        print(f"Scoring {size:,} children...")
+        results["sizes"][str(size)] = run_forked(score_stages, str(data_dir))
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    print_results(results, baseline)
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out = Path(args.out) if args.out else RESULTS_DIR / f"scoring_{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\n✓ Results saved to {out}")
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"✓ Baseline saved to {baseline_path}")
+        return
+
+    if baseline is None:
+        print(f"No baseline at {baseline_path} (create one with --save-baseline)")
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    for size, stage, metric, before, after in regressions:
+        unit = "s" if metric == "seconds" else " MB"
+        print(f"  ✗ {int(size):,} children, {stage}: {metric} {before:g}{unit} -> {after:g}{unit}")
+    if regressions:
+        sys.exit(f"✗ {len(regressions)} regression(s) vs. {baseline_path}")
+    print(f"✓ No regressions vs. {baseline_path} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ export default function CohortExplorerPage() {
     district: 'All Districts',
     riskTier: 'All Risk Tiers',
     povertyLevel: 'All Poverty Levels',
+    program: 'All Programs',
   });
   const [searchTerm, setSearchTerm] = useState('');
   const [sortColumn, setSortColumn] = useState<string>('composite_risk_score');
@@ -166,7 +167,7 @@ export default function CohortExplorerPage() {
             <h2 className="text-xl font-bold mb-3">Cohort Explorer</h2>
             <p className="text-gray-700 leading-relaxed">
               <strong>Drill down into individual child-level records</strong> to identify specific children for targeted outreach and intervention.
-              Filter by risk tier, county, or poverty level, then export lists for case management and program enrollment.
+              Filter by risk tier, county, poverty level, or program, then export lists for case management and program enrollment.
             </p>
           </div>
         </div>
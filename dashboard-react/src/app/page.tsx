@@ -1,8 +1,8 @@
 'use client';
 
 import React, { useState, useEffect } from 'react';
-import { loadAllData, filterData } from '@/lib/dataLoader';
-import { ChildWithRisk } from '@/lib/types';
+import { loadAllData, loadRollups, filterData, isUnfiltered } from '@/lib/dataLoader';
+import { ChildWithRisk, Rollups } from '@/lib/types';
 import Filters from '@/components/Filters';
 import MetricCard from '@/components/MetricCard';
 import BarChart from '@/components/charts/BarChart';
@@ -11,6 +11,7 @@ import Container from '@/components/layout/Container';
 
 export default function OverviewPage() {
   const [data, setData] = useState<ChildWithRisk[]>([]);
+  const [rollups, setRollups] = useState<Rollups>({});
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState({
     county: 'All Counties',
@@ -24,6 +25,7 @@ export default function OverviewPage() {
       setData(loadedData);
       setLoading(false);
     });
+    loadRollups(['overall']).then(setRollups);
   }, []);
 
   if (loading) {
@@ -38,27 +40,34 @@ export default function OverviewPage() {
   }
 
   const filteredData = filterData(data, filters);
+  // Unfiltered view: tier counts and mean scores come from the overall rollup
+  const overall = isUnfiltered(filters) ? rollups.overall?.rows[0] : undefined;
 
   // Calculate metrics
-  const totalChildren = filteredData.length;
-  const highRiskPct = (filteredData.filter(d => d.risk_tier === 'High').length / totalChildren) * 100;
-  const avgScore = filteredData.reduce((sum, d) => sum + d.composite_risk_score, 0) / totalChildren;
+  const totalChildren = overall ? overall.children : filteredData.length;
+  const highRiskPct = overall
+    ? overall.high_pct
+    : (filteredData.filter(d => d.risk_tier === 'High').length / totalChildren) * 100;
+  const avgScore = overall
+    ? overall.mean.composite_risk_score
+    : filteredData.reduce((sum, d) => sum + d.composite_risk_score, 0) / totalChildren;
   const instabilityPct = (filteredData.filter(d => d.num_enrollment_gaps > 0).length / totalChildren) * 100;
   const missingScreeningPct = (filteredData.filter(d => d.num_screenings_completed < 4).length / totalChildren) * 100;
 
   // Risk tier distribution
-  const riskDistribution = [
-    { name: 'Low', value: filteredData.filter(d => d.risk_tier === 'Low').length },
-    { name: 'Moderate', value: filteredData.filter(d => d.risk_tier === 'Moderate').length },
-    { name: 'High', value: filteredData.filter(d => d.risk_tier === 'High').length },
-  ];
+  const riskDistribution = ['Low', 'Moderate', 'High'].map(tier => ({
+    name: tier,
+    value: overall ? overall.tiers[tier] : filteredData.filter(d => d.risk_tier === tier).length,
+  }));
 
   // Domain scores
+  const domainMean = (field: 'stability_score' | 'engagement_score' | 'developmental_score' | 'context_score') =>
+    overall ? overall.mean[field] : filteredData.reduce((sum, d) => sum + d[field], 0) / totalChildren;
   const domainScores = [
-    { domain: 'Stability', score: filteredData.reduce((sum, d) => sum + d.stability_score, 0) / totalChildren },
-    { domain: 'Engagement', score: filteredData.reduce((sum, d) => sum + d.engagement_score, 0) / totalChildren },
-    { domain: 'Developmental', score: filteredData.reduce((sum, d) => sum + d.developmental_score, 0) / totalChildren },
-    { domain: 'Context', score: filteredData.reduce((sum, d) => sum + d.context_score, 0) / totalChildren },
+    { domain: 'Stability', score: domainMean('stability_score') },
+    { domain: 'Engagement', score: domainMean('engagement_score') },
+    { domain: 'Developmental', score: domainMean('developmental_score') },
+    { domain: 'Context', score: domainMean('context_score') },
   ].sort((a, b) => b.score - a.score);
 
   // High-risk children analysis
@@ -210,7 +219,7 @@ export default function OverviewPage() {
         <div className="grid grid-cols-1 md:grid-cols-2 gap-6 mb-8">
           <div className="card">
             <h3 className="text-lg font-semibold mb-2 text-gray-800">{highRiskPct.toFixed(1)}% of Children Show High Risk</h3>
-            <p className="text-xs text-gray-600 mb-4">{filteredData.filter(d => d.risk_tier === 'High').length.toLocaleString()} children flagged for targeted intervention—early identification enables prevention</p>
+            <p className="text-xs text-gray-600 mb-4">{riskDistribution[2].value.toLocaleString()} children flagged for targeted intervention—early identification enables prevention</p>
             <DonutChart
               data={riskDistribution}
               nameKey="name"
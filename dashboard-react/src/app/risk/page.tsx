@@ -1,8 +1,8 @@
 'use client';
 
 import React, { useState, useEffect } from 'react';
-import { loadAllData, filterData } from '@/lib/dataLoader';
-import { ChildWithRisk } from '@/lib/types';
+import { loadAllData, loadRollups, filterData, isUnfiltered } from '@/lib/dataLoader';
+import { ChildWithRisk, Rollups } from '@/lib/types';
 import { getRegion } from '@/lib/moRegions';
 import Filters from '@/components/Filters';
 import MetricCard from '@/components/MetricCard';
@@ -13,6 +13,7 @@ import Container from '@/components/layout/Container';
 
 export default function RiskPage() {
   const [data, setData] = useState<ChildWithRisk[]>([]);
+  const [rollups, setRollups] = useState<Rollups>({});
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState({
     county: 'All Counties',
@@ -26,6 +27,7 @@ export default function RiskPage() {
       setData(loadedData);
       setLoading(false);
     });
+    loadRollups(['overall', 'county', 'program', 'poverty_band']).then(setRollups);
   }, []);
 
   if (loading) {
@@ -40,15 +42,21 @@ export default function RiskPage() {
   }
 
   const filteredData = filterData(data, filters);
+  // Unfiltered view: tier counts and breakdowns come from the rollup cubes
+  const cubes: Rollups = isUnfiltered(filters) ? rollups : {};
+  const overall = cubes.overall?.rows[0];
 
   // Risk distribution
-  const riskCounts = {
-    Low: filteredData.filter(d => d.risk_tier === 'Low').length,
-    Moderate: filteredData.filter(d => d.risk_tier === 'Moderate').length,
-    High: filteredData.filter(d => d.risk_tier === 'High').length,
-  };
+  const riskCounts = overall
+    ? { Low: overall.tiers.Low, Moderate: overall.tiers.Moderate, High: overall.tiers.High }
+    : {
+        Low: filteredData.filter(d => d.risk_tier === 'Low').length,
+        Moderate: filteredData.filter(d => d.risk_tier === 'Moderate').length,
+        High: filteredData.filter(d => d.risk_tier === 'High').length,
+      };
+  const totalChildren = overall ? overall.children : filteredData.length;
 
-  const highRiskPct = (riskCounts.High / filteredData.length) * 100;
+  const highRiskPct = (riskCounts.High / totalChildren) * 100;
 
   // 1. Risk by poverty band
   const riskByPoverty = [
@@ -66,7 +74,11 @@ export default function RiskPage() {
   ];
 
   povertyGroups.forEach(({ data: groupData, index }) => {
-    if (groupData.length > 0) {
+    const band = cubes.poverty_band?.rows.find(row => row.key === riskByPoverty[index].band);
+    if (cubes.poverty_band) {
+      riskByPoverty[index].avgRisk = band?.mean.composite_risk_score ?? 0;
+      riskByPoverty[index].highPct = band?.high_pct ?? 0;
+    } else if (groupData.length > 0) {
       riskByPoverty[index].avgRisk = groupData.reduce((sum, d) => sum + d.composite_risk_score, 0) / groupData.length;
       riskByPoverty[index].highPct = (groupData.filter(d => d.risk_tier === 'High').length / groupData.length) * 100;
     }
@@ -143,12 +155,17 @@ export default function RiskPage() {
     });
   });
 
-  const programRiskData = Object.entries(programRisk)
-    .map(([program, stats]: [string, any]) => ({
-      program,
-      avgRisk: stats.sum / stats.count,
-      count: stats.count,
-    }))
+  const programRiskData = (cubes.program
+    ? cubes.program.rows.map(row => ({
+        program: String(row.key),
+        avgRisk: row.mean.composite_risk_score,
+        count: row.children,
+      }))
+    : Object.entries(programRisk).map(([program, stats]: [string, any]) => ({
+        program,
+        avgRisk: stats.sum / stats.count,
+        count: stats.count,
+      })))
     .filter(d => d.count >= 20)
     .sort((a, b) => b.avgRisk - a.avgRisk);
 
@@ -223,22 +240,28 @@ export default function RiskPage() {
   });
 
   // 11. Average risk score by county
-  const countyAvgRiskAll = Object.entries(
-    filteredData.reduce((acc: any, child) => {
-      const county = child.AddressCountyName;
-      if (!acc[county]) acc[county] = { sum: 0, count: 0, highRisk: 0 };
-      acc[county].sum += child.composite_risk_score;
-      acc[county].count += 1;
-      if (child.risk_tier === 'High') acc[county].highRisk += 1;
-      return acc;
-    }, {})
-  )
-    .map(([county, stats]: [string, any]) => ({
-      county,
-      avgRisk: stats.sum / stats.count,
-      highRiskPct: (stats.highRisk / stats.count) * 100,
-      count: stats.count,
-    }));
+  const countyAvgRiskAll = cubes.county
+    ? cubes.county.rows.map(row => ({
+        county: String(row.key),
+        avgRisk: row.mean.composite_risk_score,
+        highRiskPct: row.high_pct,
+        count: row.children,
+      }))
+    : Object.entries(
+        filteredData.reduce((acc: any, child) => {
+          const county = child.AddressCountyName;
+          if (!acc[county]) acc[county] = { sum: 0, count: 0, highRisk: 0 };
+          acc[county].sum += child.composite_risk_score;
+          acc[county].count += 1;
+          if (child.risk_tier === 'High') acc[county].highRisk += 1;
+          return acc;
+        }, {})
+      ).map(([county, stats]: [string, any]) => ({
+        county,
+        avgRisk: stats.sum / stats.count,
+        highRiskPct: (stats.highRisk / stats.count) * 100,
+        count: stats.count,
+      }));
 
 
   return (
@@ -252,14 +275,14 @@ export default function RiskPage() {
           <MetricCard
             label="Low Risk Children"
             value={riskCounts.Low.toLocaleString()}
-            delta={`${((riskCounts.Low / filteredData.length) * 100).toFixed(1)}%`}
+            delta={`${((riskCounts.Low / totalChildren) * 100).toFixed(1)}%`}
             icon="✅"
             color="green"
           />
           <MetricCard
             label="Moderate Risk Children"
             value={riskCounts.Moderate.toLocaleString()}
-            delta={`${((riskCounts.Moderate / filteredData.length) * 100).toFixed(1)}%`}
+            delta={`${((riskCounts.Moderate / totalChildren) * 100).toFixed(1)}%`}
             icon="⚠️"
             color="yellow"
           />
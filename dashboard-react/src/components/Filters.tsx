@@ -2,6 +2,7 @@
 
 import React, { useMemo } from 'react';
 import { ChildWithRisk } from '@/lib/types';
+import { getPrograms } from '@/lib/dataLoader';
 
 interface FiltersProps {
   data: ChildWithRisk[];
@@ -10,6 +11,7 @@ interface FiltersProps {
     district: string;
     riskTier: string;
     povertyLevel: string;
+    program?: string;  // Program filter is shown only when the page tracks it
   };
   onChange: (filters: any) => void;
 }
@@ -20,6 +22,8 @@ export default function Filters({ data, filters, onChange }: FiltersProps) {
     return ['All Counties', ...unique];
   }, [data]);
 
+  const programs = useMemo(() => ['All Programs', ...getPrograms()], [data]);
+
   const riskTiers = ['All Risk Tiers', 'Low', 'Moderate', 'High'];
 
   const povertyLevels = [
@@ -33,7 +37,7 @@ export default function Filters({ data, filters, onChange }: FiltersProps) {
   return (
     <div className="bg-white border-b border-gray-200 py-4">
       <div className="max-w-7xl mx-auto px-4">
-        <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+        <div className={`grid grid-cols-1 ${filters.program !== undefined ? 'md:grid-cols-4' : 'md:grid-cols-3'} gap-4`}>
           {/* County Filter */}
           <div>
             <label className="block text-sm font-medium text-gray-700 mb-1">
@@ -87,6 +91,26 @@ export default function Filters({ data, filters, onChange }: FiltersProps) {
               ))}
             </select>
           </div>
+
+          {/* Program Filter */}
+          {filters.program !== undefined && (
+            <div>
+              <label className="block text-sm font-medium text-gray-700 mb-1">
+                🏫 Program
+              </label>
+              <select
+                value={filters.program}
+                onChange={(e) => onChange({ ...filters, program: e.target.value })}
+                className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-purple-500 focus:border-transparent"
+              >
+                {programs.map((program) => (
+                  <option key={program} value={program}>
+                    {program}
+                  </option>
+                ))}
+              </select>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -1,10 +1,31 @@
 /**
  * Data loading utilities for ECIDS dashboard
- * Loads CSV files and merges with risk scores
+ * Loads the pre-joined bundle written by risk_scoring.py --export-dir
+ * (children_with_risk.json.gz: Child.csv + risk scores + programs, columnar)
+ * and the per-dimension rollup cubes (rollups/<dimension>.json)
  */
 
 import Papa from 'papaparse';
-import { ChildWithRisk } from './types';
+import { ChildWithRisk, Rollup, RollupDimension, Rollups } from './types';
+
+const BUNDLE_FILE = 'children_with_risk.json.gz';
+const CSV_FILE = 'children_with_risk.csv';
+const ROLLUP_DIR = 'rollups';
+
+// Program names in programs_mask bit order (bit i = programNames[i], sorted),
+// known once the data is loaded
+let programNames: string[] = [];
+
+type BundleColumn =
+  | { type: 'number' | 'boolean' | 'date' | 'string'; values: any[] }
+  | { type: 'dictionary'; dictionary: string[]; codes: number[] }
+  | { type: 'list'; dictionary: string[]; codes: number[][] };
+
+interface DataBundle {
+  version: number;
+  rows: number;
+  columns: Record<string, BundleColumn>;
+}
 
 export async function loadCSV(filename: string): Promise<any[]> {
   const response = await fetch(`/data/${filename}`);
@@ -21,60 +42,124 @@ export async function loadCSV(filename: string): Promise<any[]> {
   });
 }
 
-export async function loadAllData(): Promise<ChildWithRisk[]> {
-  try {
-    // Load child data, risk scores, and participation data
-    const [childData, riskScores, participationData] = await Promise.all([
-      loadCSV('Child.csv'),
-      loadCSV('risk_scores.csv'),
-      loadCSV('ChildParticipation.csv'),
-    ]);
-
-    // Get all programs for each child
-    const childPrograms: any = {};
-    participationData.forEach((p: any) => {
-      const dcn = p['Child DCN'];
-      if (!childPrograms[dcn]) {
-        childPrograms[dcn] = [];
-      }
-      if (p['RefProgramType.Description']) {
-        childPrograms[dcn].push(p['RefProgramType.Description']);
-      }
-    });
+async function loadBundle(filename: string): Promise<DataBundle> {
+  const response = await fetch(`/data/${filename}`);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${filename}: ${response.status}`);
+  }
+  const bytes = new Uint8Array(await response.arrayBuffer());
+
+  // Servers that send Content-Encoding: gzip hand over the JSON already inflated
+  const isGzip = bytes[0] === 0x1f && bytes[1] === 0x8b;
+  const text = isGzip
+    ? await new Response(
+        new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'))
+      ).text()
+    : new TextDecoder().decode(bytes);
+  return JSON.parse(text);
+}
 
-    // Merge child data with risk scores and programs
-    const merged = childData.map((child: any) => {
-      const risk = riskScores.find(
-        (r: any) => r['Child DCN'] === child['Child DCN']
-      );
+function decodeColumn(column: BundleColumn): any[] {
+  switch (column.type) {
+    case 'dictionary':
+      return column.codes.map((code) => (code < 0 ? null : column.dictionary[code]));
+    case 'list':
+      return column.codes.map((codes) => codes.map((code) => column.dictionary[code]));
+    default:
+      return column.values;
+  }
+}
 
-      const programs = childPrograms[child['Child DCN']] || [];
-      const uniquePrograms = Array.from(new Set(programs));
-
-      return {
-        ...child,
-        ...risk,
-        programs_list: uniquePrograms,
-        // Convert Yes/No to boolean
-        HomelessnessStatus: child.HomelessnessStatus === 'Yes',
-        MigrantStatus: child.MigrantStatus === 'Yes',
-        ChildAbuseNeglect: child.ChildAbuseNeglect === 'Yes',
-        FamilyMemberIncarcerated: child.FamilyMemberIncarcerated === 'Yes',
-        FamilyMemberSubstanceUseAbuse: child.FamilyMemberSubstanceUseAbuse === 'Yes',
-        HouseholdMemberDepressedOrMentallyIll: child.HouseholdMemberDepressedOrMentallyIll === 'Yes',
-        LossOfParent: child.LossOfParent === 'Yes',
-        in_foster_care: child.FosterCareStartDate && child.FosterCareStartDate !== '',
-        deep_poverty: child.PercentOfFederalPovertyLevel < 100,
-      };
-    });
+function bundleRows(bundle: DataBundle): ChildWithRisk[] {
+  const programs = bundle.columns.programs_list;
+  if (programs?.type === 'list') programNames = programs.dictionary;
+
+  const names = Object.keys(bundle.columns);
+  const columns = names.map((name) => decodeColumn(bundle.columns[name]));
+
+  const rows = new Array(bundle.rows);
+  for (let i = 0; i < bundle.rows; i++) {
+    const row: any = {};
+    for (let j = 0; j < names.length; j++) {
+      row[names[j]] = columns[j][i];
+    }
+    rows[i] = row;
+  }
+  return rows;
+}
+
+// Fallback: the same rows as CSV (pandas writes booleans as True/False)
+async function loadChildrenCSV(): Promise<ChildWithRisk[]> {
+  const rows = await loadCSV(CSV_FILE);
+  const children: ChildWithRisk[] = rows.map((row: any) => {
+    for (const key of Object.keys(row)) {
+      if (row[key] === 'True') row[key] = true;
+      else if (row[key] === 'False') row[key] = false;
+    }
+    const programs = row.programs_enrolled ? String(row.programs_enrolled).split(', ') : [];
+    return { ...row, programs_list: programs };
+  });
+  programNames = Array.from(new Set(children.flatMap((child) => child.programs_list))).sort();
+  return children;
+}
+
+/** Program names for filters, in programs_mask bit order */
+export function getPrograms(): string[] {
+  return programNames;
+}
+
+/** programs_mask bit for a program (0 if unknown) */
+export function programBit(program: string): number {
+  const index = programNames.indexOf(program);
+  return index < 0 ? 0 : 2 ** index;
+}
+
+export async function loadAllData(): Promise<ChildWithRisk[]> {
+  try {
+    return bundleRows(await loadBundle(BUNDLE_FILE));
+  } catch (error) {
+    console.warn(`Falling back to ${CSV_FILE}:`, error);
+  }
 
-    return merged as ChildWithRisk[];
+  try {
+    return await loadChildrenCSV();
   } catch (error) {
     console.error('Error loading data:', error);
     return [];
   }
 }
 
+/**
+ * Pre-aggregated tier counts and mean domain scores for one dimension.
+ * A few KB instead of the full bundle, for charts that don't need
+ * child-level filtering.
+ */
+export async function loadRollup(dimension: RollupDimension): Promise<Rollup> {
+  const response = await fetch(`/data/${ROLLUP_DIR}/${dimension}.json`);
+  if (!response.ok) {
+    throw new Error(`Failed to load ${dimension} rollup: ${response.status}`);
+  }
+  return response.json();
+}
+
+/** Several rollups at once; a cube that fails to load is left out */
+export async function loadRollups(dimensions: RollupDimension[]): Promise<Rollups> {
+  const rollups: Rollups = {};
+  await Promise.all(dimensions.map(async (dimension) => {
+    try {
+      rollups[dimension] = await loadRollup(dimension);
+    } catch (error) {
+      console.warn(`Rollup ${dimension} unavailable, aggregating child rows instead:`, error);
+    }
+  }));
+  return rollups;
+}
+
+/** True when every filter is at its 'All ...' default, i.e. the rollups apply */
+export function isUnfiltered(filters: { [key: string]: string | undefined }): boolean {
+  return Object.values(filters).every(value => !value || value.startsWith('All '));
+}
+
 export function filterData(
   data: ChildWithRisk[],
   filters: {
@@ -82,6 +167,7 @@ export function filterData(
     district?: string;
     riskTier?: string;
     povertyLevel?: string;
+    program?: string;
   }
 ): ChildWithRisk[] {
   let filtered = [...data];
@@ -114,6 +200,12 @@ export function filterData(
     }
   }
 
+  if (filters.program && filters.program !== 'All Programs') {
+    // Integer test on the multi-hot mask instead of searching program names
+    const bit = programBit(filters.program);
+    filtered = filtered.filter(d => (d.programs_mask & bit) !== 0);
+  }
+
   return filtered;
 }
 
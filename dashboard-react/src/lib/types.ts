@@ -44,6 +44,9 @@ export interface ChildWithRisk extends Child {
   num_enrollment_gaps: number;
   max_gap_days: number;
   has_gap_over_6mo: boolean;
+  num_overlapping_episodes: number;
+  has_concurrent_enrollment: boolean;
+  covered_days: number;
   num_participation_episodes: number;
   total_attendance_days: number;
   avg_attendance_days: number;
@@ -68,9 +71,38 @@ export interface ChildWithRisk extends Child {
   num_household_stressors: number;
   programs_enrolled: string;
   total_enrollments: number;
+  // Multi-hot: bit i set for the i-th program name in sorted order
+  programs_mask: number;
   programs_list: string[];
 }
 
+export type RollupDimension =
+  | 'overall'
+  | 'county'
+  | 'region'
+  | 'program'
+  | 'poverty_band'
+  | 'race'
+  | 'birth_cohort';
+
+export interface RollupRow {
+  key: string | number;
+  children: number;
+  tiers: { [tier: string]: number };
+  high_pct: number;
+  mean: { [score: string]: number };
+}
+
+export interface Rollup {
+  version: number;
+  dimension: RollupDimension;
+  tiers: string[];
+  scores: string[];
+  rows: RollupRow[];
+}
+
+export type Rollups = Partial<Record<RollupDimension, Rollup>>;
+
 export interface FilterState {
   county: string;
   district: string;
@@ -0,0 +1,227 @@
+"""
+ECIDS Dashboard Export - Pre-joined Data Bundle
+
+Writes the output of ReadinessRiskScorer.generate_full_dataset (Child.csv
+joined with every indicator, domain score, tier and program aggregate) for
+the dashboard, so the browser parses one file instead of joining raw CSVs:
+- children_with_risk.json.gz: columnar JSON, gzip-compressed. Each column
+  carries its type; repetitive strings (counties, tiers, programs, ...) are
+  dictionary-encoded as codes into a list of distinct values
+- children_with_risk.csv: the same rows as a flat CSV
+
+Bundle layout (version 1):
+
+    {"version": 1, "rows": n, "columns": {name: column, ...}}
+
+    column = {"type": "number" | "boolean" | "date" | "string", "values": [...]}
+           | {"type": "dictionary", "dictionary": [...], "codes": [...]}      (-1 = missing)
+           | {"type": "list", "dictionary": [...], "codes": [[...], ...]}     (programs_list)
+
+Dates are "YYYY-MM-DD" strings; missing values are null.
+
+Pages that only chart summaries can use the rollup cubes instead, written
+next to the bundle as rollups/<dimension>.json: risk tier counts and mean
+domain scores per county, region, program, poverty band, race and birth
+cohort (plus rollups/overall.json), a few KB each:
+
+    {"version": 1, "dimension": "county", "tiers": [...], "scores": [...],
+     "rows": [{"key": "ADAIR", "children": n, "tiers": {"Low": n, ...},
+               "high_pct": 12.5, "mean": {"composite_risk_score": 21.3, ...}}, ...]}
+
+Rows are sorted by key and carry children counts, so rows can be combined
+(e.g. several counties) by weighting their means by children.
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ecids_io import write_ecids_csv
+
+BUNDLE_FILE = "children_with_risk.json.gz"
+CSV_FILE = "children_with_risk.csv"
+BUNDLE_VERSION = 1
+
+# String columns with fewer distinct values than this share of rows are dictionary-encoded
+DICTIONARY_MAX_SHARE = 0.5
+PROGRAMS_SEPARATOR = ", "
+
+ROLLUP_DIR = "rollups"
+ROLLUP_SCORES = ["stability_score", "engagement_score", "developmental_score",
+                 "context_score", "composite_risk_score"]
+# Same bands as the dashboard's risk-by-poverty chart
+POVERTY_BINS = [-np.inf, 100, 200, 300, np.inf]
+POVERTY_BANDS = ["<100% FPL", "100-200%", "200-300%", ">300%"]
+# Region -> counties, shared with the dashboard (src/lib/moRegions.ts)
+REGIONS_FILE = Path(__file__).parent / "dashboard-react" / "src" / "lib" / "moRegions.json"
+OTHER_REGION = "Other"
+
+
+def encode_values(values, missing):
+    """Python list for JSON, with None where missing"""
+    return [None if is_missing else value for value, is_missing in zip(values.tolist(), missing)]
+
+
+def encode_column(series):
+    """One bundle column (see module docstring) from a full-dataset column"""
+    missing = series.isna().to_numpy()
+    # Flags reindexed over children without rows (e.g. has_gap_over_6mo) are
+    # object columns of bools and NaN: still booleans, with nulls
+    if pd.api.types.is_bool_dtype(series) or (
+            series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "boolean"):
+        return {"type": "boolean", "values": encode_values(series.astype(object), missing)}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        dates = np.datetime_as_string(series.to_numpy().astype("datetime64[D]"))
+        return {"type": "date", "values": encode_values(pd.Series(dates), missing)}
+    if pd.api.types.is_numeric_dtype(series):
+        return {"type": "number", "values": encode_values(series.astype(object), missing)}
+
+    codes, dictionary = pd.factorize(series, sort=True)
+    if len(dictionary) < DICTIONARY_MAX_SHARE * len(series):
+        return {"type": "dictionary", "dictionary": [str(value) for value in dictionary],
+                "codes": codes.tolist()}
+    return {"type": "string", "values": encode_values(series.astype(str), missing)}
+
+
+def split_programs(programs_enrolled):
+    """
+    programs_enrolled as (codes, program lists): codes index the distinct
+    values (-1 = missing), each split into its program names once.
+    """
+    codes, combinations = pd.factorize(programs_enrolled)
+    lists = [[name for name in str(value).split(PROGRAMS_SEPARATOR) if name] for value in combinations]
+    return codes, lists
+
+
+def encode_programs(programs_enrolled):
+    """programs_list column: each child's programs as codes into the sorted program names"""
+    codes, lists = split_programs(programs_enrolled)
+    dictionary = sorted({name for names in lists for name in names})
+    position = {name: code for code, name in enumerate(dictionary)}
+    combination_codes = [[position[name] for name in names] for names in lists] + [[]]
+    return {"type": "list", "dictionary": dictionary,
+            "codes": [combination_codes[code] for code in codes.tolist()]}
+
+
+def build_bundle(full_df):
+    """Columnar bundle dict for a generate_full_dataset frame"""
+    columns = {col: encode_column(full_df[col]) for col in full_df.columns}
+    if "programs_enrolled" in full_df.columns:
+        columns["programs_list"] = encode_programs(full_df["programs_enrolled"])
+    return {"version": BUNDLE_VERSION, "rows": len(full_df), "columns": columns}
+
+
+def write_bytes_atomic(path, data):
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def load_county_regions(path=REGIONS_FILE):
+    """County name (upper case) -> Missouri region"""
+    regions = json.loads(Path(path).read_text())
+    return {county: region for region, counties in regions.items() for county in counties}
+
+
+def rollup_keys(full_df):
+    """
+    Dimension name -> Series of group keys indexed by row position in full_df.
+
+    A child appears once per dimension, except under "program" where it
+    appears once per program enrolled (and not at all with no programs).
+    """
+    positions = pd.RangeIndex(len(full_df))
+    keys = {"overall": pd.Series("All", index=positions)}
+    if "AddressCountyName" in full_df.columns:
+        county = pd.Series(full_df["AddressCountyName"].to_numpy(), index=positions)
+        keys["county"] = county
+        regions = load_county_regions()
+        keys["region"] = county.str.upper().map(regions).fillna(OTHER_REGION).where(county.notna())
+    if "programs_enrolled" in full_df.columns:
+        codes, lists = split_programs(full_df["programs_enrolled"])
+        programs = pd.Series(lists, dtype=object).explode().dropna().rename("program")
+        enrolled = pd.DataFrame({"position": positions, "code": codes})
+        enrolled = enrolled.merge(programs, left_on="code", right_index=True)
+        keys["program"] = pd.Series(enrolled["program"].to_numpy(), index=enrolled["position"].to_numpy())
+    if "PercentOfFederalPovertyLevel" in full_df.columns:
+        bands = pd.cut(full_df["PercentOfFederalPovertyLevel"].to_numpy(dtype=float),
+                       POVERTY_BINS, right=False, labels=POVERTY_BANDS)
+        keys["poverty_band"] = pd.Series(bands, index=positions)
+    if "RefRace.Description" in full_df.columns:
+        keys["race"] = pd.Series(full_df["RefRace.Description"].to_numpy(), index=positions)
+    if "BirthDate" in full_df.columns:
+        years = pd.to_datetime(full_df["BirthDate"]).dt.year
+        keys["birth_cohort"] = pd.Series(years.to_numpy(), index=positions).astype("Int64")
+    return keys
+
+
+def build_rollup(dimension, keys, tiers, scores):
+    """
+    One cube: tier counts and mean scores per key.
+
+    keys is a rollup_keys Series; tiers (ordered categorical) and scores
+    (frame of ROLLUP_SCORES columns) are full_df-aligned by row position.
+    """
+    keys = keys.dropna()
+    positions = keys.index.to_numpy()
+    frame = scores.iloc[positions].reset_index(drop=True)
+    frame["key"] = keys.array
+    frame["tier"] = tiers.take(positions)
+
+    grouped = frame.groupby("key", observed=True, sort=True)
+    children = grouped.size()
+    means = grouped[scores.columns.tolist()].mean()
+    tier_counts = (frame.groupby(["key", "tier"], observed=False).size()
+                   .unstack(fill_value=0).reindex(children.index))
+    high_tier = tiers.categories[-1]
+
+    rows = []
+    for key, count in children.items():
+        counts = {str(tier): int(tier_counts.at[key, tier]) for tier in tiers.categories}
+        rows.append({
+            "key": key.item() if isinstance(key, np.generic) else key,
+            "children": int(count),
+            "tiers": counts,
+            "high_pct": round(100 * counts[str(high_tier)] / count, 2),
+            "mean": {col: round(float(means.at[key, col]), 4) for col in scores.columns},
+        })
+    return {"version": BUNDLE_VERSION, "dimension": dimension,
+            "tiers": [str(tier) for tier in tiers.categories],
+            "scores": scores.columns.tolist(), "rows": rows}
+
+
+def build_rollups(full_df):
+    """Dimension name -> rollup cube for a generate_full_dataset frame"""
+    tiers = pd.Categorical(full_df["risk_tier"])
+    scores = full_df[[col for col in ROLLUP_SCORES if col in full_df.columns]].reset_index(drop=True)
+    return {dimension: build_rollup(dimension, keys, tiers, scores)
+            for dimension, keys in rollup_keys(full_df).items()}
+
+
+def write_rollups(full_df, out_dir):
+    """Write <out_dir>/rollups/<dimension>.json for each rollup cube; returns the directory"""
+    rollup_dir = Path(out_dir) / ROLLUP_DIR
+    rollup_dir.mkdir(parents=True, exist_ok=True)
+    for dimension, cube in build_rollups(full_df).items():
+        payload = json.dumps(cube, separators=(",", ":"), allow_nan=False) + "\n"
+        write_bytes_atomic(rollup_dir / f"{dimension}.json", payload.encode())
+    return rollup_dir
+
+
+def write_dashboard_bundle(full_df, out_dir):
+    """Write children_with_risk.json.gz and children_with_risk.csv; returns their paths"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    payload = json.dumps(build_bundle(full_df), separators=(",", ":"), allow_nan=False)
+    bundle_path = out_dir / BUNDLE_FILE
+    # mtime=0 keeps the archive byte-identical for identical data
+    write_bytes_atomic(bundle_path, gzip.compress(payload.encode(), compresslevel=9, mtime=0))
+
+    csv_path = out_dir / CSV_FILE
+    write_ecids_csv(full_df, csv_path)
+    return bundle_path, csv_path
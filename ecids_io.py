@@ -0,0 +1,435 @@
+"""
+ECIDS Flat File I/O
+
+Schema registry for the 9 ECIDS flat files and a typed CSV reader:
+- IDs (Child DCN, MOSIS ID, ZIP, district codes) stay strings so leading zeros survive
+- Ref*.Description and Yes/No columns are categoricals
+- ISO dates (YYYY-MM-DD) are parsed at load time; other formats are read as
+  missing, with a warning
+- Counts and measurements use small nullable integer types (blanks stay NA)
+
+Parsed tables are cached as Parquet in a .ecids_cache/ folder next to the CSVs
+(requires pyarrow). A cache entry is reused while the source CSV's size, mtime
+and schema are unchanged, and rebuilt automatically otherwise.
+"""
+
+import hashlib
+import json
+import os
+import warnings
+import pandas as pd
+from pathlib import Path
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+    STRING = "string[pyarrow]"  # Arrow-backed: compact buffers, fast hashing
+except ImportError:
+    HAS_PYARROW = False
+    STRING = "string"
+
+CACHE_DIRNAME = ".ecids_cache"
+CACHE_FORMAT_VERSION = 2
+
+CATEGORY = "category"
+
+# Columns shared by every child-keyed file
+CHILD_KEYS = {
+    "Child DCN": STRING,
+    "Child MOSIS ID": STRING,
+}
+
+# Table name -> file name, column dtypes and date columns
+ECIDS_SCHEMAS = {
+    "Child": {
+        "file": "Child.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "LastName": STRING,
+            "FirstName": STRING,
+            "MiddleName": STRING,
+            "GenerationCode": CATEGORY,
+            "PostalCode": STRING,
+            "AddressCountyName": CATEGORY,
+            "City": STRING,
+            "ResponsibleOrganizationIdentifier": STRING,
+            "RefSex.Description": CATEGORY,
+            "RefRace.Description": CATEGORY,
+            "HispanicLatinoEthnicity": CATEGORY,
+            "ChildAbuseNeglect": CATEGORY,
+            "RefLanguage.Description": CATEGORY,
+            "HomelessnessStatus": CATEGORY,
+            "MigrantStatus": CATEGORY,
+            "RefParentMaritalStatus.Description": CATEGORY,
+            "FamilyMemberIncarcerated": CATEGORY,
+            "FamilyMemberSubstanceUseAbuse": CATEGORY,
+            "LossOfParent": CATEGORY,
+            "PercentOfFederalPovertyLevel": "Int16",
+            "FamilyIncome": "Int32",
+            "NumberOfPeopleInFamily": "Int8",
+            "HouseholdMemberDepressedOrMentallyIll": CATEGORY,
+            "WeightAtBirth": "Int16",
+            "WeeksOfGestation": "Int8",
+        },
+        "dates": ["BirthDate", "FosterCareStartDate", "FosterCareEndDate"],
+    },
+    "RelatedPerson": {
+        "file": "RelatedPerson.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "RefPersonRelationshipType.Description": CATEGORY,
+            "RelatedPerson LastName": STRING,
+            "RelatedPerson FirstName": STRING,
+            "RelatedPerson MiddleName": STRING,
+            "RelatedPerson GenerationCode": CATEGORY,
+            "RelatedPerson PostalCode": STRING,
+            "RelatedPerson AddressCountyName": CATEGORY,
+            "RelatedPerson City": STRING,
+            "RelatedPerson RefSex.Description": CATEGORY,
+            "RelatedPerson HispanicLatinoEthnicity": CATEGORY,
+            "RelatedPerson RefEmploymentStatus.Description": CATEGORY,
+        },
+        "dates": ["RelatedPerson BirthDate", "RelatedPerson EmploymentStatusDate"],
+    },
+    "ChildParticipation": {
+        "file": "ChildParticipation.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "RefProgramType.Description": CATEGORY,
+            "VisitingIndicator": CATEGORY,
+            "NumberOfDaysInAttendance": "Int16",
+            "RefStudentGradeLevel.Description": CATEGORY,
+            "RefFundingSource.Descriptions": CATEGORY,
+        },
+        "dates": ["EnrollmentDate", "ServicePlanDate", "ServicePlanEndDate"],
+    },
+    "ChildDisability": {
+        "file": "ChildDisability.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "DisabilityStatus": CATEGORY,
+            "RefIDEADisabilityType": CATEGORY,
+        },
+        "dates": [],
+    },
+    "ChildMonitoring": {
+        "file": "ChildMonitoring.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "RefVisitingType.Description": CATEGORY,
+        },
+        "dates": ["VisitDate"],
+    },
+    "ChildInsurance": {
+        "file": "ChildInsurance.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "RefHealthInsuranceCoverage.Description": CATEGORY,
+        },
+        "dates": ["HealthInsuranceStatusDate"],
+    },
+    "ChildImmunization": {
+        "file": "ChildImmunization.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "RefImmunizationType.Description": CATEGORY,
+        },
+        "dates": ["ImmunizationDate"],
+    },
+    "ChildScreening": {
+        "file": "ChildScreening.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            "RefScheduledWellChildScreening.Description": CATEGORY,
+        },
+        "dates": ["WellChildScreeningReceivedDate"],
+    },
+    "ChildOutcomes": {
+        "file": "ChildOutcomes.csv",
+        "dtypes": {
+            **CHILD_KEYS,
+            # Ratings are usually "1"-"7" but stay categorical so non-numeric
+            # codes load; the scorer coerces them to numbers
+            "COSRatingA.Description": CATEGORY,
+            "COSRatingB.Description": CATEGORY,
+            "COSRatingC.Description": CATEGORY,
+            "COSRatingPhysical.Description": CATEGORY,
+            "COSRatingSummary.Description": CATEGORY,
+            "RefOutcomeTimePoint.Description": CATEGORY,
+        },
+        "dates": ["OutcomeDate"],
+    },
+}
+
+
+def read_ecids_csv(path, table, columns=None):
+    """
+    Read one ECIDS flat file with the dtypes pinned by ECIDS_SCHEMAS[table].
+
+    columns limits the read to those columns (any the file lacks are skipped).
+    """
+    schema = ECIDS_SCHEMAS[table]
+    header = pd.read_csv(path, nrows=0).columns
+    if columns is not None:
+        header = [col for col in header if col in columns]
+    dates = [col for col in schema["dates"] if col in header]
+
+    df = pd.read_csv(
+        path,
+        usecols=None if columns is None else header,
+        dtype={col: dtype for col, dtype in schema["dtypes"].items() if col in header},
+    )
+    for col in dates:
+        df[col] = parse_iso_dates(df[col], f"{Path(path).name} {col}")
+    return df
+
+
+def parse_iso_dates(values, label):
+    """
+    YYYY-MM-DD strings -> datetime64. Values in any other format become NaT
+    with a warning, instead of leaving the whole column as strings.
+    """
+    dates = pd.to_datetime(values, format="%Y-%m-%d", errors="coerce")
+    invalid = dates.isna() & values.notna()
+    if invalid.any():
+        warnings.warn(f"{label}: {int(invalid.sum()):,} values are not YYYY-MM-DD dates and "
+                      f"were read as missing (e.g. {values[invalid].iloc[0]!r})", stacklevel=3)
+    return dates
+
+
+def write_ecids_csv(df, path, mode="w", header=True):
+    """
+    Write a frame as an ECIDS flat file: dates as YYYY-MM-DD, blanks for missing.
+
+    With pyarrow the rows are serialized by Arrow's CSV writer (much faster
+    than to_csv); values are left unquoted exactly as to_csv writes them, and
+    frames holding a value that would need quoting go through to_csv instead,
+    as do frames with float or boolean columns (Arrow formats those
+    differently: 31 vs 31.0, true vs True). mode="a" with header=False
+    appends a batch to an existing file.
+    """
+    arrow_formattable = not any(pd.api.types.is_float_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)
+                                for dtype in df.dtypes)
+    if HAS_PYARROW and arrow_formattable:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            for i, field in enumerate(table.schema):
+                if pa.types.is_timestamp(field.type):
+                    table = table.set_column(i, field.name, table.column(i).cast(pa.date32()))
+            sink = pa.BufferOutputStream()
+            pa_csv.write_csv(table, sink, pa_csv.WriteOptions(include_header=False,
+                                                              quoting_style="none"))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass
+        else:
+            with open(path, mode + "b") as f:
+                if header:
+                    f.write(df.iloc[:0].to_csv(index=False).encode())
+                f.write(sink.getvalue().to_pybytes())
+            return
+
+    df.to_csv(path, mode=mode, header=header, index=False, date_format="%Y-%m-%d")
+
+
+class BatchWriter:
+    """
+    Write one table to a CSV or Parquet file in batches, so only the current
+    batch is ever in memory.
+
+    CSV batches are appended with write_ecids_csv (header once). Parquet
+    batches become row groups of a single file; the Arrow schema is fixed by
+    the first batch (all-missing columns are typed as strings), and later
+    batches are cast to it. Use as a context manager or call close().
+    """
+
+    def __init__(self, path, file_format="csv"):
+        if file_format not in ("csv", "parquet"):
+            raise ValueError(f"Unknown file format: {file_format}")
+        if file_format == "parquet" and not HAS_PYARROW:
+            raise ImportError("pyarrow is required for Parquet output") from None
+        self.path = Path(path)
+        self.file_format = file_format
+        self.rows = 0
+        self.batches = 0
+        self._parquet = None
+        self._schema = None
+
+    def write(self, df):
+        if self.file_format == "csv":
+            write_ecids_csv(df, self.path, mode="a" if self.batches else "w", header=not self.batches)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet is None:
+                schema = pa.Schema.from_pandas(df, preserve_index=False)
+                self._schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type)
+                                          else field for field in schema])
+                self._parquet = pq.ParquetWriter(self.path, self._schema)
+            self._parquet.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        self.rows += len(df)
+        self.batches += 1
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_ecids_table(data_dir, table):
+    """Read an ECIDS table by name from a directory of flat files"""
+    return read_ecids_csv(Path(data_dir) / ECIDS_SCHEMAS[table]["file"], table)
+
+
+def schema_signature(table):
+    """Short hash of a table's schema; cache entries built under another schema are stale"""
+    schema = ECIDS_SCHEMAS[table]
+    payload = json.dumps(
+        {"version": CACHE_FORMAT_VERSION, "dtypes": schema["dtypes"], "dates": schema["dates"]},
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def source_fingerprint(path, table):
+    """Identify a CSV by size + mtime (cheap: no need to hash the contents)"""
+    stat = Path(path).stat()
+    return {
+        "source": Path(path).name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "schema": schema_signature(table),
+    }
+
+
+def cache_paths(data_dir, name):
+    """Parquet file and fingerprint sidecar for a cache entry (table or derived artifact)"""
+    cache_dir = Path(data_dir) / CACHE_DIRNAME
+    return cache_dir / f"{name}.parquet", cache_dir / f"{name}.json"
+
+
+def read_cached_frame(data_dir, name, fingerprint):
+    """Cached frame if its stored fingerprint equals fingerprint, else None"""
+    if not HAS_PYARROW:
+        return None
+    parquet_path, meta_path = cache_paths(data_dir, name)
+    if not (parquet_path.exists() and meta_path.exists()):
+        return None
+    try:
+        cached = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        return None
+    return pd.read_parquet(parquet_path) if cached == fingerprint else None
+
+
+def write_cached_frame(data_dir, name, df, fingerprint):
+    """Store a frame + fingerprint in the cache; silently skipped if that's not possible"""
+    if not HAS_PYARROW:
+        return
+    parquet_path, meta_path = cache_paths(data_dir, name)
+    try:
+        parquet_path.parent.mkdir(exist_ok=True)
+        # Write to temp files and rename so a crashed or concurrent run never
+        # leaves a half-written cache entry behind
+        tmp_parquet = parquet_path.with_suffix(f".parquet.{os.getpid()}.tmp")
+        tmp_meta = meta_path.with_suffix(f".json.{os.getpid()}.tmp")
+        df.to_parquet(tmp_parquet, index=False)
+        tmp_meta.write_text(json.dumps(fingerprint))
+        os.replace(tmp_parquet, parquet_path)
+        os.replace(tmp_meta, meta_path)
+    except OSError:
+        pass  # Read-only data directory: serve the frame uncached
+
+
+def load_ecids_table(data_dir, table, use_cache=True, rebuild=False):
+    """
+    Load an ECIDS table, going through the Parquet cache when possible.
+
+    The cache is read when its fingerprint matches the source CSV; otherwise
+    (or with rebuild=True) the CSV is parsed and the cache rewritten. Without
+    pyarrow, or if the cache can't be written, this is a plain typed CSV read.
+    """
+    csv_path = Path(data_dir) / ECIDS_SCHEMAS[table]["file"]
+    if not (use_cache and HAS_PYARROW):
+        return read_ecids_csv(csv_path, table)
+
+    fingerprint = source_fingerprint(csv_path, table)
+    if not rebuild:
+        cached = read_cached_frame(data_dir, table, fingerprint)
+        if cached is not None:
+            return cached
+
+    df = read_ecids_csv(csv_path, table)
+    write_cached_frame(data_dir, table, df, fingerprint)
+    return df
+
+
+def dcn_partition(dcns, num_partitions):
+    """Stable partition number per Child DCN (same DCN -> same partition, every run)"""
+    hashes = pd.util.hash_array(pd.Series(dcns).astype(str).to_numpy(dtype=object))
+    return (hashes % num_partitions).astype("int64")
+
+
+def partition_dir(out_dir, partition):
+    """Directory holding one partition's flat files"""
+    return Path(out_dir) / f"part-{partition:04d}"
+
+
+def partition_ecids_tables(data_dir, out_dir, tables, num_partitions, chunksize=250_000):
+    """
+    Split child-keyed ECIDS files into num_partitions directories by DCN hash.
+
+    Each CSV is streamed in chunks of chunksize rows and every row is appended
+    to out_dir/part-NNNN/<file>, so memory is bounded by the chunk size rather
+    than the file size. Values are copied verbatim (no parsing), so reading a
+    partition with read_ecids_table gives the same dtypes as the full file.
+    Every partition gets every file (header only if it has no rows).
+    """
+    for partition in range(num_partitions):
+        partition_dir(out_dir, partition).mkdir(parents=True, exist_ok=True)
+
+    for table in tables:
+        file_name = ECIDS_SCHEMAS[table]["file"]
+        csv_path = Path(data_dir) / file_name
+        header = pd.read_csv(csv_path, nrows=0).columns
+        for partition in range(num_partitions):
+            pd.DataFrame(columns=header).to_csv(partition_dir(out_dir, partition) / file_name, index=False)
+
+        reader = pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_filter=False,
+                             chunksize=chunksize)
+        for chunk in reader:
+            parts = dcn_partition(chunk["Child DCN"], num_partitions)
+            for partition, rows in chunk.groupby(parts, sort=True):
+                rows.to_csv(partition_dir(out_dir, partition) / file_name,
+                            mode="a", header=False, index=False)
+
+
+def write_frame(df, path):
+    """Write a typed frame for another process to read (Parquet, or pickle without pyarrow)"""
+    if HAS_PYARROW:
+        df.to_parquet(path, index=False)
+    else:
+        df.to_pickle(path)
+
+
+def read_frame(path):
+    """Read a frame written by write_frame"""
+    return pd.read_parquet(path) if HAS_PYARROW else pd.read_pickle(path)
+
+
+def concat_ecids(frames, table):
+    """Concatenate frames of one table, restoring categoricals whose categories differ"""
+    df = pd.concat(frames, ignore_index=True)
+    for col, dtype in ECIDS_SCHEMAS[table]["dtypes"].items():
+        if dtype == CATEGORY and col in df.columns and df[col].dtype != CATEGORY:
+            df[col] = df[col].astype(CATEGORY)
+    return df
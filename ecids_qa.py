@@ -0,0 +1,260 @@
+"""
+ECIDS Data QA - Validation and Statistics Report
+
+Validates a directory of ECIDS flat files (CSV, or Parquet as written by
+generate_ecids_data.py --format parquet) and summarizes it:
+- Row counts per file
+- Referential integrity: rows whose Child DCN is not in Child.csv
+- Child DCN uniqueness, episodes ending before they start
+- Participation episodes per child
+- Enrollment gaps (> GAP_DAYS) and concurrent (overlapping) enrollment
+- Risk indicator prevalence
+
+Only the columns needed are read, and every statistic is a groupby/array
+computation (timeline features come from timeline.episode_timelines), so a
+directory with millions of children is checked in seconds. The report is a
+JSON-serializable dict:
+
+    python ecids_qa.py synthetic_data [--out synthetic_data/qa_report.json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from ecids_io import ECIDS_SCHEMAS, HAS_PYARROW, read_ecids_csv
+from timeline import GAP_DAYS, episode_timelines
+
+REPORT_FILE = "qa_report.json"
+
+# Child.csv Yes/No flags (and foster care start date) reported as prevalence
+PREVALENCE_FLAGS = {
+    "Homelessness": "HomelessnessStatus",
+    "Migrant Status": "MigrantStatus",
+    "Child Abuse/Neglect": "ChildAbuseNeglect",
+    "Family Incarceration": "FamilyMemberIncarcerated",
+    "Substance Abuse": "FamilyMemberSubstanceUseAbuse",
+    "Depression/Mental Illness": "HouseholdMemberDepressedOrMentallyIll",
+}
+FOSTER_CARE_COLUMN = "FosterCareStartDate"
+EPISODE_COLUMNS = ["EnrollmentDate", "ServicePlanEndDate"]
+
+
+def read_qa_table(data_dir, table, columns):
+    """Columns of one table from <file>.csv or <table>.parquet; None if neither exists"""
+    csv_path = Path(data_dir) / ECIDS_SCHEMAS[table]["file"]
+    parquet_path = csv_path.with_suffix(".parquet")
+    if csv_path.exists():
+        return read_ecids_csv(csv_path, table, columns=columns)
+    if parquet_path.exists():
+        import pyarrow.parquet as pq
+
+        present = set(pq.read_schema(parquet_path).names)
+        return pd.read_parquet(parquet_path, columns=[col for col in columns if col in present])
+    return None
+
+
+def dcns_in(dcns, known_dcns):
+    """Boolean array: which of dcns are in known_dcns (hash lookup, no per-value Python)"""
+    if HAS_PYARROW:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        # Series.isin on Arrow strings converts the whole value set to Python objects
+        found = pc.is_in(pa.array(dcns.array), value_set=pa.array(known_dcns.array))
+        return found.to_numpy(zero_copy_only=False).astype(bool)
+    return pd.Index(known_dcns).get_indexer(dcns) >= 0
+
+
+def rate(count, total):
+    return round(count / total, 4) if total else 0.0
+
+
+def participation_stats(child_dcns, df_participation):
+    """Episodes per child, gap and concurrent enrollment counts"""
+    num_children = len(child_dcns)
+    counts = df_participation.groupby("Child DCN", observed=True).size()
+    counts = counts.reindex(child_dcns, fill_value=0)
+    episodes_per_child = {
+        "0": int((counts == 0).sum()),
+        "1": int((counts == 1).sum()),
+        "2": int((counts == 2).sum()),
+        "3": int((counts == 3).sum()),
+        "4+": int((counts >= 4).sum()),
+    }
+
+    stats = {
+        "episodes": len(df_participation),
+        "episodes_per_child": episodes_per_child,
+        "episodes_per_child_rate": {k: rate(v, num_children) for k, v in episodes_per_child.items()},
+    }
+    if not all(col in df_participation.columns for col in EPISODE_COLUMNS):
+        return stats
+
+    # Episodes without a DCN belong to no child (reported under checks)
+    episodes = df_participation[df_participation["Child DCN"].notna()]
+    start = episodes["EnrollmentDate"]
+    end = episodes["ServicePlanEndDate"]
+    timelines = episode_timelines(episodes["Child DCN"], start, end)
+    children_with_gap = int((timelines["num_gaps"] > 0).sum())
+    children_concurrent = int((timelines["num_overlaps"] > 0).sum())
+    gaps = timelines.loc[timelines["num_gaps"] > 0]
+
+    stats.update({
+        "gap_days_threshold": GAP_DAYS,
+        "children_with_gap": children_with_gap,
+        "children_with_gap_rate": rate(children_with_gap, num_children),
+        "total_gaps": int(timelines["num_gaps"].sum()),
+        "max_gap_days": int(gaps["max_gap"].max()) if len(gaps) else 0,
+        "median_max_gap_days": float(gaps["max_gap"].median()) if len(gaps) else 0.0,
+        "children_with_concurrent": children_concurrent,
+        "children_with_concurrent_rate": rate(children_concurrent, num_children),
+        "overlapping_episodes": int(timelines["num_overlaps"].sum()),
+        "episodes_ending_before_start": int((end < start).sum()),
+        "episodes_missing_dates": int((start.isna() | end.isna()).sum()),
+    })
+    return stats
+
+
+def prevalence_stats(df_child, disability_dcns):
+    """Count and share of children with each risk indicator"""
+    num_children = len(df_child)
+    counts = {label: int((df_child[col] == "Yes").sum())
+              for label, col in PREVALENCE_FLAGS.items() if col in df_child.columns}
+    if FOSTER_CARE_COLUMN in df_child.columns:
+        counts["Foster Care"] = int(df_child[FOSTER_CARE_COLUMN].notna().sum())
+    if disability_dcns is not None:
+        counts["Disability"] = int(dcns_in(df_child["Child DCN"], disability_dcns).sum())
+    return {label: {"count": count, "rate": rate(count, num_children)}
+            for label, count in counts.items()}
+
+
+def qa_report(data_dir):
+    """
+    Validate and summarize the ECIDS files in data_dir.
+
+    Returns the report dict; "passed" is False if Child.csv is missing, any
+    Child DCN is duplicated or missing (in Child.csv or ChildParticipation.csv),
+    or any table has orphan rows.
+    """
+    data_dir = Path(data_dir)
+    child_columns = ["Child DCN", FOSTER_CARE_COLUMN, *PREVALENCE_FLAGS.values()]
+    table_columns = {table: ["Child DCN"] for table in ECIDS_SCHEMAS}
+    table_columns["Child"] = child_columns
+    table_columns["ChildParticipation"] = ["Child DCN", *EPISODE_COLUMNS]
+
+    tables = {table: read_qa_table(data_dir, table, columns)
+              for table, columns in table_columns.items()}
+    missing = [table for table, df in tables.items() if df is None]
+    tables = {table: df for table, df in tables.items() if df is not None}
+
+    report = {
+        "data_dir": str(data_dir),
+        "row_counts": {table: len(df) for table, df in tables.items()},
+        "total_records": int(sum(len(df) for df in tables.values())),
+        "missing_tables": missing,
+    }
+    df_child = tables.get("Child")
+    if df_child is None:
+        report["passed"] = False
+        return report
+
+    child_dcns = pd.Index(df_child["Child DCN"].dropna().unique())
+    checks = {
+        "duplicate_child_dcns": int(df_child["Child DCN"].duplicated().sum()),
+        "missing_child_dcns": int(df_child["Child DCN"].isna().sum()),
+    }
+    report["children"] = len(df_child)
+
+    integrity = {}
+    for table, df in tables.items():
+        if table == "Child":
+            continue
+        orphans = int((~dcns_in(df["Child DCN"], child_dcns)).sum())
+        integrity[table] = {"orphan_rows": orphans, "passed": orphans == 0}
+    report["referential_integrity"] = integrity
+
+    if "ChildParticipation" in tables:
+        checks["missing_participation_dcns"] = int(tables["ChildParticipation"]["Child DCN"].isna().sum())
+        report["participation"] = participation_stats(child_dcns, tables["ChildParticipation"])
+    disability = tables.get("ChildDisability")
+    report["prevalence"] = prevalence_stats(
+        df_child, None if disability is None else disability["Child DCN"].drop_duplicates())
+
+    report["checks"] = checks
+    report["passed"] = (not any(checks.values())
+                        and all(result["passed"] for result in integrity.values()))
+    return report
+
+
+def write_qa_report(report, path):
+    Path(path).write_text(json.dumps(report, indent=2) + "\n")
+
+
+def print_qa_report(report):
+    """Console summary of a qa_report"""
+    print()
+    print("=" * 70)
+    print("QA CHECKS & DATA SUMMARY")
+    print("=" * 70)
+
+    print("\n📊 Row Counts by File:")
+    for table, count in report["row_counts"].items():
+        print(f"   {ECIDS_SCHEMAS[table]['file']}: {count:,}")
+    print(f"   TOTAL RECORDS: {report['total_records']:,}")
+    for table in report["missing_tables"]:
+        print(f"   {ECIDS_SCHEMAS[table]['file']}: ✗ MISSING")
+    if "children" not in report:
+        return
+
+    participation = report.get("participation")
+    if participation:
+        print("\n📈 Participation Statistics:")
+        for label, count in participation["episodes_per_child"].items():
+            share = participation["episodes_per_child_rate"][label]
+            plural = "record" if label == "1" else "records"
+            print(f"   Children with {label} participation {plural}: {count:,} ({share:.1%})")
+        if "children_with_gap" in participation:
+            print(f"   Children with ≥1 gap (>{participation['gap_days_threshold']} days): "
+                  f"{participation['children_with_gap']:,} ({participation['children_with_gap_rate']:.1%})")
+            print(f"   Children with concurrent programs: {participation['children_with_concurrent']:,} "
+                  f"({participation['children_with_concurrent_rate']:.1%})")
+
+    print("\n⚠️  Risk Indicator Prevalence:")
+    for label, stats in report["prevalence"].items():
+        print(f"   {label}: {stats['count']:,} ({stats['rate']:.1%})")
+
+    print("\n✅ Referential Integrity Checks:")
+    for table, result in report["referential_integrity"].items():
+        status = "✓ PASS" if result["passed"] else f"✗ FAIL ({result['orphan_rows']:,} orphan rows)"
+        print(f"   {table.removeprefix('Child') or table}: {status}")
+    for check, count in report["checks"].items():
+        if count:
+            print(f"   ✗ {check.replace('_', ' ').capitalize()}: {count:,}")
+
+    print()
+    print("✓ All QA checks passed" if report["passed"] else "✗ QA checks FAILED")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and summarize a directory of ECIDS flat files")
+    parser.add_argument("data_dir", nargs="?", default="synthetic_data")
+    parser.add_argument("--out", default=None,
+                        help=f"JSON report path (default: <data_dir>/{REPORT_FILE})")
+    args = parser.parse_args()
+    if not Path(args.data_dir).is_dir():
+        parser.error(f"{args.data_dir} is not a directory")
+
+    report = qa_report(args.data_dir)
+    print_qa_report(report)
+    out = args.out or Path(args.data_dir) / REPORT_FILE
+    write_qa_report(report, out)
+    print(f"✓ Report saved to {out}")
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,43 +4,51 @@ Generates 9 flat files for Kindergarten Readiness Risk Index PoC
 
 Uses Faker for realistic synthetic data and Excel specifications for field definitions.
 
+Every table is sampled with NumPy Generator arrays, a whole attribute block at
+a time (bernoulli/choice/integers with per-child, risk-tier-dependent
+parameters):
+
+    python generate_ecids_data.py --children 5000 --seed 42 --out synthetic_data
+
+Large populations can be split into independently seeded shards generated on
+a process pool (seeds spawned from SeedSequence(seed), so the files depend
+only on seed, size, shard count and batch size):
+
+    python generate_ecids_data.py --children 10000000 --shards 32 --out big_data
+
+Tables are generated and written BATCH_SIZE children at a time (CSV appends
+or Parquet row groups), so peak memory is flat in the population size.
+
 Author: Claude Code
 Date: 2026-02-26
 """
 
+import argparse
+import functools
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
 from pathlib import Path
 from faker import Faker
 
-# Initialize Faker with US locale
-fake = Faker('en_US')
-Faker.seed(42)
-np.random.seed(42)
-random.seed(42)
+from ecids_io import CACHE_DIRNAME, BatchWriter, partition_dir
+from ecids_qa import REPORT_FILE, print_qa_report, qa_report, write_qa_report
 
 # Configuration
 NUM_CHILDREN = 5000
 OUTPUT_DIR = Path("synthetic_data")
-OUTPUT_DIR.mkdir(exist_ok=True)
+SEED = 42
 
-print("=" * 70)
-print("ECIDS SYNTHETIC DATA GENERATION")
-print("=" * 70)
-print(f"Generating data for {NUM_CHILDREN} children using Faker library...")
-print()
+# Data extract date: nothing (immunizations, screenings, foster care) is dated later
+EXTRACT_DATE = np.datetime64("2026-02-26")
 
-# Load reference data from Excel
-print("Loading reference data from Excel...")
-EXCEL_FILE = Path("/Users/vickinomwesigwa/Documents/ECIDS-Readiness/Flat File Templates.xlsx")
-df_languages = pd.read_excel(EXCEL_FILE, sheet_name='Language')
-df_relationships = pd.read_excel(EXCEL_FILE, sheet_name='PersonRelationshipType')
-
-# Extract reference lists
-LANGUAGES = df_languages.iloc[:, 0].dropna().tolist()
-RELATIONSHIP_TYPES = df_relationships.iloc[:, 0].dropna().tolist()
+# Reference lists (Language and PersonRelationshipType sheets of Flat File
+# Templates.xlsx), shipped as JSON; --reference-xlsx converts another workbook
+REFERENCE_FILE = Path(__file__).resolve().with_name("reference_lists.json")
+REFERENCE_SHEETS = ["Language", "PersonRelationshipType"]
 
 # Filter to common relationship types for parent/guardian
 GUARDIAN_RELATIONSHIPS = [
@@ -49,10 +57,8 @@ GUARDIAN_RELATIONSHIPS = [
     'Adoptive parent', 'Stepmother', 'Stepfather',
     'Aunt', 'Uncle', 'Court appointed guardian'
 ]
-
-print(f"  ✓ Loaded {len(LANGUAGES)} languages")
-print(f"  ✓ Loaded {len(RELATIONSHIP_TYPES)} relationship types")
-print()
+FEMALE_RELATIONSHIPS = ["Mother", "Grandmother", "Foster mother", "Stepmother", "Aunt"]
+PARENT_RELATIONSHIPS = ["Mother", "Father", "Stepmother", "Stepfather"]
 
 # Missouri Counties
 MO_COUNTIES = [
@@ -126,956 +132,1046 @@ IMMUNIZATION_TYPES = [
     "HepA", "Hib", "PCV", "Rotavirus"
 ]
 
+# Immunization schedule (CDC pediatric schedule): (type, days after birth)
+IMMUNIZATION_SCHEDULE = [
+    ("HepB", 0),      # Birth
+    ("DTaP", 60),     # 2 months
+    ("Polio", 60),
+    ("Hib", 60),
+    ("PCV", 60),
+    ("Rotavirus", 60),
+    ("DTaP", 120),    # 4 months
+    ("Polio", 120),
+    ("Hib", 120),
+    ("PCV", 120),
+    ("Rotavirus", 120),
+    ("DTaP", 180),    # 6 months
+    ("Polio", 180),
+    ("Hib", 180),
+    ("PCV", 180),
+    ("HepB", 180),
+    ("MMR", 365),     # 12 months
+    ("Varicella", 365),
+    ("HepA", 365),
+    ("DTaP", 450),    # 15 months
+    ("PCV", 450),
+    ("HepA", 548),    # 18 months
+]
+
 SCREENING_TYPES = [
     "6-month", "12-month", "18-month",
     "24-month", "36-month", "48-month"
 ]
 
+# Well-child screening schedule: (type, days after birth)
+SCREENING_SCHEDULE = [
+    ("6-month", 180),
+    ("12-month", 365),
+    ("18-month", 548),
+    ("24-month", 730),
+    ("36-month", 1095),
+    ("48-month", 1460),
+]
+
 COS_RATINGS = ["1", "2", "3", "4", "5", "6", "7"]
 OUTCOME_TIMEPOINTS = ["Entry", "Exit", "Annual Review"]
 FUNDING_SOURCES = ["Federal", "State", "Local", "Private"]
 GRADE_LEVELS = ["Pre-K", "Preschool", "Early Intervention", ""]
 
+# Internal risk tiers (codes index every per-tier parameter table below)
+RISK_TIERS = ["Low", "Medium", "High"]
+LOW, MEDIUM, HIGH = range(3)
+RISK_TIER_WEIGHTS = [0.40, 0.40, 0.20]  # Low (40%), Medium (40%), High (20%)
+
+# Risk factors - CORRELATED WITH RISK TIER: probability per tier (Low, Medium, High)
+RISK_FACTOR_RATES = {
+    "homelessness": (0.01, 0.04, 0.15),
+    "foster_care": (0.01, 0.03, 0.12),
+    "migrant": (0.01, 0.02, 0.05),
+    "child_abuse": (0.02, 0.08, 0.20),
+    "incarcerated": (0.03, 0.08, 0.18),
+    "substance_abuse": (0.04, 0.10, 0.20),
+    "depression": (0.05, 0.12, 0.25),
+    "loss_parent": (0.01, 0.03, 0.10),
+    "low_birth_weight": (0.07, 0.10, 0.15),
+    "premature": (0.07, 0.10, 0.15),
+}
+# Inclusive ranges per tier (Low, Medium, High)
+POVERTY_LEVEL_RANGES = ((150, 400), (50, 200), (0, 100))  # % FPL
+FAMILY_INCOME_RANGES = ((45000, 100000), (20000, 50000), (0, 25000))
+
+# Guardians: 1-2 (weighted toward 2-parent households for low-risk)
+TWO_GUARDIAN_RATES = (0.70, 0.70, 0.40)
+EMPLOYMENT_WEIGHTS = (
+    (0.75, 0.05, 0.10, 0.10),
+    (0.60, 0.15, 0.15, 0.10),
+    (0.45, 0.25, 0.20, 0.10),
+)
+
+# Participation: distribution of episode counts 40%=1, 35%=2, 20%=3, 5%=4-5
+PARTICIPATION_COUNT_SHARES = ((1, 0.40), (2, 0.35), (3, 0.20))
+CONCURRENT_RATE = 0.125  # 10-15% with overlapping programs
+GAP_RATE = 0.30          # 25-35% with gaps
+DURATION_RANGES = ((365, 1095), (180, 730), (60, 365))  # Longer, stable -> shorter, unstable
+GAP_RANGES = ((30, 120), (30, 120), (60, 180))          # Longer gaps for high-risk
+ATTENDANCE_FACTORS = ((0.85, 1.0), (0.7, 0.95), (0.5, 0.8))
+ATTENDANCE_RANGES = {  # Base attendance days by program
+    "Head Start": (80, 180),
+    "State Pre-K": (80, 180),
+    "Home Visiting": (5, 30),
+    "Early Intervention": (10, 60),
+    "First Steps": (10, 60),
+}
+CHILDCARE_ATTENDANCE = (50, 220)
+MAX_PARTICIPATION_AGE_DAYS = int(5.5 * 365)  # Cap at age 5.5
+
+# Disability prevalence (10-14%, higher for high-risk)
+DISABILITY_RATES = (0.08, 0.12, 0.18)
+# Monitoring visits per child (inclusive) by tier
+VISIT_COUNT_RANGES = ((0, 2), (1, 4), (3, 6))
+# Insurance type weights by poverty band: <150% FPL, <250% FPL, higher
+INSURANCE_WEIGHTS = (
+    (0.70, 0.20, 0.05, 0.05),
+    (0.40, 0.35, 0.20, 0.05),
+    (0.10, 0.20, 0.65, 0.05),
+)
+# Compliance rates by tier (lower risk = better compliance)
+IMMUNIZATION_COMPLIANCE = (0.95, 0.80, 0.60)
+SCREENING_COMPLETION = (0.92, 0.75, 0.50)
+# COS Ratings (1-7) - CORRELATED WITH RISK: weights per tier for A/B/C and physical
+COS_WEIGHTS = (
+    (0.03, 0.05, 0.10, 0.15, 0.27, 0.25, 0.15),
+    (0.10, 0.15, 0.20, 0.25, 0.20, 0.07, 0.03),
+    (0.25, 0.25, 0.20, 0.15, 0.10, 0.03, 0.02),
+)
+COS_PHYSICAL_WEIGHTS = (
+    (0.02, 0.03, 0.08, 0.12, 0.25, 0.30, 0.20),
+    (0.08, 0.12, 0.20, 0.25, 0.20, 0.10, 0.05),
+    (0.20, 0.20, 0.20, 0.20, 0.10, 0.05, 0.05),
+)
+
+# Faker draws are pooled: each name/city column samples from this many Faker values
+NAME_POOL_SIZE = 4000
+
+# Children generated and written per batch (bounds peak memory: ~0.5 GB at 50K)
+BATCH_SIZE = 50_000
+
+
+@functools.lru_cache(maxsize=None)
+def load_reference_lists(reference_xlsx=None):
+    """
+    (languages, relationship types), read on first use and cached.
+
+    Comes from the packaged reference_lists.json unless reference_xlsx names
+    a flat file templates workbook, which is converted by convert_reference_xlsx.
+    """
+    path = REFERENCE_FILE if reference_xlsx is None else convert_reference_xlsx(reference_xlsx)
+    lists = json.loads(Path(path).read_text())
+    return tuple(tuple(lists[sheet]) for sheet in REFERENCE_SHEETS)
+
 
-def generate_dcn(index):
-    """Generate 10-digit Child DCN"""
-    return f"{index:010d}"
+def convert_reference_xlsx(xlsx_path):
+    """
+    JSON file with the workbook's reference lists, in .ecids_cache/ next to it.
 
+    The workbook is parsed (pd.read_excel, needs openpyxl) only when there is
+    no conversion for its current size + mtime; the sheets have no header
+    row, so every value in the first column is kept.
+    """
+    xlsx_path = Path(xlsx_path)
+    stat = xlsx_path.stat()
+    fingerprint = {"source": xlsx_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    json_path = xlsx_path.parent / CACHE_DIRNAME / f"reference_lists_{xlsx_path.stem}.json"
+    try:
+        if json.loads(json_path.read_text())["fingerprint"] == fingerprint:
+            return json_path
+    except (OSError, ValueError, KeyError):
+        pass
+
+    sheets = pd.read_excel(xlsx_path, sheet_name=REFERENCE_SHEETS, header=None, dtype=str)
+    lists = {sheet: [value.strip() for value in df.iloc[:, 0].dropna() if value.strip()]
+             for sheet, df in sheets.items()}
+    json_path.parent.mkdir(exist_ok=True)
+    tmp_path = json_path.with_suffix(f".json.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"fingerprint": fingerprint, **lists}, indent=2))
+    os.replace(tmp_path, json_path)
+    return json_path
+
+
+def build_name_pools(seed, size=NAME_POOL_SIZE):
+    """Faker names/cities drawn once (Faker's own weighting), then sampled with NumPy"""
+    fake = Faker('en_US')
+    fake.seed_instance(seed)
+    return {
+        "male": np.array([fake.first_name_male() for _ in range(size)], dtype=object),
+        "female": np.array([fake.first_name_female() for _ in range(size)], dtype=object),
+        "any": np.array([fake.first_name() for _ in range(size)], dtype=object),
+        "last": np.array([fake.last_name() for _ in range(size)], dtype=object),
+        "city": np.array([fake.city() for _ in range(size)], dtype=object),
+    }
 
-def generate_mosis_id(index):
-    """Generate 6-digit MOSIS ID"""
-    return f"{index:06d}"
 
+# ============================================================================
+# VECTORIZED SAMPLING HELPERS
+# ============================================================================
+def bernoulli(rng, p):
+    """One True/False draw per element of p"""
+    p = np.asarray(p, dtype=float)
+    return rng.random(p.shape) < p
 
-def generate_district_code():
-    """Generate 6-digit district code"""
-    return f"{random.randint(1, 9999):06d}"
 
+def integers(rng, low, high):
+    """Inclusive integer draws (like random.randint) with array bounds"""
+    low, high = np.broadcast_arrays(np.asarray(low), np.asarray(high))
+    return rng.integers(low, high + 1)
 
-def generate_school_code():
-    """Generate 4-digit school code"""
-    return f"{random.randint(1, 999):04d}"
 
+def by_tier(tier, values):
+    """Per-tier parameter table -> per-row parameters"""
+    return np.asarray(values)[tier]
 
-def generate_district_id(county):
-    """
-    Generate 6-digit school district ID based on county.
-    Format: 3-digit county code + 3-digit district number = 6 digits total
-    Example: County code 048 (Jackson) + district 230 = "048230"
 
-    This represents the school district where the student LIVES (residential).
+def weighted_choice(rng, weights, size=None):
+    """
+    Index draws from weights: shape (k,) for one distribution, or (n, k) for a
+    distribution per row (like random.choices)
     """
-    county_code = MO_COUNTIES.index(county) + 1 if county in MO_COUNTIES else random.randint(1, 115)
-    district_num = random.randint(1, 999)
-    return f"{county_code:03d}{district_num:03d}"
+    weights = np.asarray(weights, dtype=float)
+    cdf = np.cumsum(weights, axis=-1)
+    cdf /= cdf[..., -1:]
+    if weights.ndim == 1:
+        return np.searchsorted(cdf, rng.random(size), side="right")
+    u = rng.random(len(weights))
+    return np.minimum((u[:, None] >= cdf).sum(axis=1), weights.shape[1] - 1)
 
 
-def random_date(start_date, end_date):
-    """Generate random date between start and end"""
-    delta = end_date - start_date
-    random_days = random.randint(0, max(1, delta.days))
-    return start_date + timedelta(days=random_days)
+def choose(rng, options, size):
+    """Uniform draws from options (like random.choice)"""
+    return np.asarray(options, dtype=object)[rng.integers(0, len(options), size)]
 
 
-def get_age_at_date(birthdate, ref_date):
-    """Calculate age in years at reference date"""
-    return (ref_date - birthdate).days / 365.25
+def pick_true(rng, mask):
+    """Uniform column index among each row's True entries (every row needs one)"""
+    k = np.floor(rng.random(len(mask)) * mask.sum(axis=1)).astype(int)
+    return np.argmax(np.cumsum(mask, axis=1) > k[:, None], axis=1)
 
 
-def assign_risk_tier():
-    """Assign internal risk tier: Low (40%), Medium (40%), High (20%)"""
-    rand = random.random()
-    if rand < 0.40:
-        return "Low"
-    elif rand < 0.80:
-        return "Medium"
-    else:
-        return "High"
+def days(values):
+    """Integer day counts -> timedelta64[D]"""
+    return np.asarray(values).astype("timedelta64[D]")
+
 
+def age_years(birth_date, ref_date):
+    """Age in years at reference date"""
+    return (ref_date - birth_date).astype(int) / 365.25
 
-def get_missouri_zip():
-    """Generate realistic Missouri ZIP code"""
-    # Missouri ZIP ranges: 63000-65899
-    return f"{random.randint(63000, 65899)}"
 
+def yes_no(flags):
+    return np.where(flags, "Yes", "No")
 
-def assign_language(race, hispanic, migrant):
+
+def zero_pad(values, width):
+    """Integers -> zero-padded digit strings"""
+    return pd.Series(values).astype(str).str.zfill(width).to_numpy(dtype=object)
+
+
+def child_ids(first_index, num_children):
+    """10-digit Child DCNs and 6-digit MOSIS IDs for consecutive child numbers"""
+    index = np.arange(first_index, first_index + num_children)
+    return zero_pad(index, 10), zero_pad(index, 6)
+
+
+def assign_language(rng, race, hispanic, migrant):
     """
     Assign language based on demographics for realism.
-    Correlates with race, ethnicity, and migrant status.
+    Correlates with race, ethnicity, and migrant status (first matching rule wins).
     """
+    n = len(race)
     # Default: Most people speak English (~75-80% overall)
+    language = np.full(n, "English", dtype=object)
+    unassigned = np.ones(n, dtype=bool)
 
-    # Hispanic/Latino → higher probability of Spanish
-    if hispanic:
-        if migrant:
-            return random.choices(["Spanish", "English"], weights=[0.80, 0.20])[0]
+    def assign(rule, options, weights=None):
+        rows = unassigned & rule
+        if weights is None:
+            language[rows] = choose(rng, options, rows.sum())
         else:
-            return random.choices(["Spanish", "English"], weights=[0.40, 0.60])[0]
-
-    # Asian → Asian languages
-    if race == "Asian":
-        if random.random() < 0.50:  # 50% speak Asian language at home
-            return random.choice([
-                "Chinese", "Vietnamese", "Korean", "Tagalog",
-                "Japanese", "Hindi", "Urdu", "Thai", "Cambodian"
-            ])
-        else:
-            return "English"
+            language[rows] = np.asarray(options, dtype=object)[weighted_choice(rng, weights, rows.sum())]
+        unassigned[rows] = False
 
+    # Hispanic/Latino → higher probability of Spanish
+    assign(hispanic & migrant, ["Spanish", "English"], [0.80, 0.20])
+    assign(hispanic, ["Spanish", "English"], [0.40, 0.60])
+    # Asian → Asian languages (50% speak Asian language at home)
+    asian = race == "Asian"
+    assign(asian & bernoulli(rng, np.full(n, 0.50)),
+           ["Chinese", "Vietnamese", "Korean", "Tagalog", "Japanese", "Hindi", "Urdu", "Thai", "Cambodian"])
+    unassigned &= ~asian
     # Migrant status → more likely non-English
-    if migrant:
-        return random.choices(
-            ["Spanish", "English", "Vietnamese", "Chinese", "Arabic"],
-            weights=[0.50, 0.20, 0.10, 0.10, 0.10]
-        )[0]
-
-    # American Indian/Alaska Native → may speak indigenous language
-    if race == "American Indian or Alaska Native":
-        if random.random() < 0.15:  # 15% speak indigenous language
-            return random.choice(["Cherokee", "Navajo", "Osage", "English"])
-        else:
-            return "English"
-
-    # Pacific Islander
-    if race == "Native Hawaiian or Other Pacific Islander":
-        if random.random() < 0.20:
-            return random.choice(["Samoan", "Hawaiian", "Tongan", "English"])
-        else:
-            return "English"
-
+    assign(migrant, ["Spanish", "English", "Vietnamese", "Chinese", "Arabic"],
+           [0.50, 0.20, 0.10, 0.10, 0.10])
+    # American Indian/Alaska Native → may speak indigenous language (15%)
+    native = race == "American Indian or Alaska Native"
+    assign(native & bernoulli(rng, np.full(n, 0.15)), ["Cherokee", "Navajo", "Osage", "English"])
+    unassigned &= ~native
+    # Pacific Islander (20%)
+    islander = race == "Native Hawaiian or Other Pacific Islander"
+    assign(islander & bernoulli(rng, np.full(n, 0.20)), ["Samoan", "Hawaiian", "Tongan", "English"])
+    unassigned &= ~islander
     # Default to English for most others (White, Black, etc.)
     # With small chance of other languages due to immigration/diversity
-    if random.random() < 0.95:
-        return "English"
-    else:
-        return random.choice(["Spanish", "French", "German", "Russian", "Arabic", "English"])
+    assign(bernoulli(rng, np.full(n, 0.05)), ["Spanish", "French", "German", "Russian", "Arabic", "English"])
+
+    return language
 
 
 # ============================================================================
 # 1. GENERATE CHILD.CSV
 # ============================================================================
-print("1. Generating Child.csv...")
-
-children = []
-risk_tiers = {}  # Store for correlation logic
-
-for i in range(1, NUM_CHILDREN + 1):
-    child_dcn = generate_dcn(i)
-    child_mosis_id = generate_mosis_id(i)
+def generate_children(rng, names, first_index, num_children):
+    """Child table for children first_index.. (+ internal risk tier codes for correlations)"""
+    n = num_children
+    child_dcn, child_mosis_id = child_ids(first_index, n)
 
     # Assign internal risk tier for correlations
-    risk_tier = assign_risk_tier()
-    risk_tiers[child_dcn] = risk_tier
+    tier = weighted_choice(rng, RISK_TIER_WEIGHTS, n)
 
     # Birth year: 2018-2021 (cohort for K-readiness)
-    birth_year = random.choice([2018, 2019, 2020, 2021])
-    birth_date = fake.date_of_birth(minimum_age=2, maximum_age=7)
-    # Override to ensure 2018-2021
-    birth_date = datetime(birth_year, random.randint(1, 12), random.randint(1, 28))
-
-    # Demographics using Faker
-    sex = random.choice(SEX_OPTIONS)
-
-    # Gender-appropriate names
-    if sex == "Male":
-        first_name = fake.first_name_male()
-        middle_name = fake.first_name_male() if random.random() > 0.2 else ""
-    elif sex == "Female":
-        first_name = fake.first_name_female()
-        middle_name = fake.first_name_female() if random.random() > 0.2 else ""
-    else:
-        first_name = fake.first_name()
-        middle_name = fake.first_name() if random.random() > 0.2 else ""
-
-    last_name = fake.last_name()
+    birth_date = (
+        (rng.choice([2018, 2019, 2020, 2021], n) - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+        + rng.integers(0, 12, n).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + days(rng.integers(0, 28, n))
+
+    # Demographics using Faker name pools (gender-appropriate names)
+    sex = choose(rng, SEX_OPTIONS, n)
+    name_pool = np.select([sex == "Male", sex == "Female"], [0, 1], 2)
+    pools = [names["male"], names["female"], names["any"]]
+    first_name = np.empty(n, dtype=object)
+    middle_name = np.empty(n, dtype=object)
+    for k, pool in enumerate(pools):
+        rows = name_pool == k
+        first_name[rows] = choose(rng, pool, rows.sum())
+        middle_name[rows] = choose(rng, pool, rows.sum())
+    middle_name[~bernoulli(rng, np.full(n, 0.8))] = ""
+    last_name = choose(rng, names["last"], n)
 
     # Generation code (Jr., Sr., III, etc.) - rare
-    generation_code = random.choice(["", "", "", "", "Jr.", "Sr.", "III"]) if random.random() > 0.9 else ""
+    generation_code = np.where(bernoulli(rng, np.full(n, 0.1)),
+                               choose(rng, ["", "", "", "", "Jr.", "Sr.", "III"], n), "")
 
     # Race and ethnicity - weighted distribution
     # Missouri demographics: ~80% White, ~12% Black, ~4% Hispanic, ~2% Asian, ~2% Other
-    race = random.choices(
-        RACE_OPTIONS,
-        weights=[0.02, 0.04, 0.12, 0.01, 0.79, 0.015, 0.005]  # Matches order in RACE_OPTIONS
-    )[0]
+    race = np.asarray(RACE_OPTIONS, dtype=object)[
+        weighted_choice(rng, [0.02, 0.04, 0.12, 0.01, 0.79, 0.015, 0.005], n)  # Matches order in RACE_OPTIONS
+    ]
 
     # Hispanic ethnicity (separate from race)
-    # Higher rates for "Two or More Races"
-    if race == "Demographic Race Two or More Races":
-        hispanic = random.random() < 0.20
-    else:
-        hispanic = random.random() < 0.04  # ~4% Hispanic in Missouri
+    # Higher rates for "Two or More Races", ~4% Hispanic in Missouri otherwise
+    hispanic = bernoulli(rng, np.where(race == "Demographic Race Two or More Races", 0.20, 0.04))
 
-    # Geography - use Faker for city, but constrain to Missouri
-    county = random.choice(MO_COUNTIES)
-    city = fake.city()
-    zip_code = get_missouri_zip()
+    # Geography - Faker cities, constrained to Missouri counties and ZIPs (63000-65899)
+    county_index = rng.integers(0, len(MO_COUNTIES), n)
+    county = np.asarray(MO_COUNTIES, dtype=object)[county_index]
+    city = choose(rng, names["city"], n)
+    zip_code = rng.integers(63000, 65900, n).astype(str)
 
-    # Responsible Organization = 6-digit school district ID where student lives
-    district_id = generate_district_id(county)
+    # Responsible Organization = 6-digit school district ID where student lives:
+    # 3-digit county code + 3-digit district number, e.g. 048 (Jackson) + 230 = "048230"
+    district_id = zero_pad((county_index + 1) * 1000 + rng.integers(1, 1000, n), 6)
 
     # Risk factors - CORRELATED WITH RISK TIER
-    if risk_tier == "High":
-        # High-risk children have elevated risk factors
-        homelessness = random.random() < 0.15
-        foster_care = random.random() < 0.12
-        migrant = random.random() < 0.05
-        child_abuse = random.random() < 0.20
-        poverty_level = random.randint(0, 100)  # 0-100% FPL
-        family_income = random.randint(0, 25000)
-        incarcerated = random.random() < 0.18
-        substance_abuse = random.random() < 0.20
-        depression = random.random() < 0.25
-        loss_parent = random.random() < 0.10
-        low_birth_weight = random.random() < 0.15
-        premature = random.random() < 0.15
-    elif risk_tier == "Medium":
-        homelessness = random.random() < 0.04
-        foster_care = random.random() < 0.03
-        migrant = random.random() < 0.02
-        child_abuse = random.random() < 0.08
-        poverty_level = random.randint(50, 200)
-        family_income = random.randint(20000, 50000)
-        incarcerated = random.random() < 0.08
-        substance_abuse = random.random() < 0.10
-        depression = random.random() < 0.12
-        loss_parent = random.random() < 0.03
-        low_birth_weight = random.random() < 0.10
-        premature = random.random() < 0.10
-    else:  # Low risk
-        homelessness = random.random() < 0.01
-        foster_care = random.random() < 0.01
-        migrant = random.random() < 0.01
-        child_abuse = random.random() < 0.02
-        poverty_level = random.randint(150, 400)
-        family_income = random.randint(45000, 100000)
-        incarcerated = random.random() < 0.03
-        substance_abuse = random.random() < 0.04
-        depression = random.random() < 0.05
-        loss_parent = random.random() < 0.01
-        low_birth_weight = random.random() < 0.07
-        premature = random.random() < 0.07
+    factors = {name: bernoulli(rng, by_tier(tier, rates)) for name, rates in RISK_FACTOR_RATES.items()}
+    poverty = by_tier(tier, POVERTY_LEVEL_RANGES)
+    poverty_level = integers(rng, poverty[:, 0], poverty[:, 1])
+    income = by_tier(tier, FAMILY_INCOME_RANGES)
+    family_income = integers(rng, income[:, 0], income[:, 1])
 
     # Language - CORRELATED with race, ethnicity, and migrant status
-    language = assign_language(race, hispanic, migrant)
-
-    # Foster care dates (if applicable)
-    foster_start = ""
-    foster_end = ""
-    if foster_care:
-        foster_start_date = random_date(birth_date, datetime(2025, 12, 31))
-        foster_start = foster_start_date.strftime("%Y-%m-%d")
-        # 70% still in foster care
-        if random.random() > 0.3:
-            foster_end_date = foster_start_date + timedelta(days=random.randint(30, 730))
-            if foster_end_date > datetime(2026, 2, 26):
-                foster_end_date = datetime(2026, 2, 26)
-            foster_end = foster_end_date.strftime("%Y-%m-%d")
-
-    # Family structure
-    marital_status = random.choice(MARITAL_STATUS)
-    num_people = random.randint(2, 7)
-
-    # Birth characteristics
-    if low_birth_weight:
-        weight_at_birth = random.randint(1800, 2499)  # grams
-    else:
-        weight_at_birth = random.randint(2500, 4500)
+    language = assign_language(rng, race, hispanic, factors["migrant"])
 
-    if premature:
-        weeks_gestation = random.randint(28, 36)
-    else:
-        weeks_gestation = random.randint(37, 42)
+    # Foster care dates (if applicable): start between birth and 2025-12-31,
+    # 70% still in foster care
+    foster = factors["foster_care"]
+    foster_span = np.maximum(1, (np.datetime64("2025-12-31") - birth_date).astype(int))
+    foster_start = birth_date + days(integers(rng, np.zeros(n, dtype=int), foster_span))
+    foster_end = np.minimum(foster_start + days(rng.integers(30, 731, n)), EXTRACT_DATE)
+    foster_end = np.where(foster & bernoulli(rng, np.full(n, 0.7)), foster_end, np.datetime64("NaT"))
+    foster_start = np.where(foster, foster_start, np.datetime64("NaT"))
 
-    # Build child record
-    child = {
+    # Birth characteristics
+    weight_at_birth = np.where(factors["low_birth_weight"],
+                               rng.integers(1800, 2500, n),  # grams
+                               rng.integers(2500, 4501, n))
+    weeks_gestation = np.where(factors["premature"],
+                               rng.integers(28, 37, n),
+                               rng.integers(37, 43, n))
+
+    df_child = pd.DataFrame({
         "Child DCN": child_dcn,
         "Child MOSIS ID": child_mosis_id,
         "LastName": last_name,
         "FirstName": first_name,
         "MiddleName": middle_name,
         "GenerationCode": generation_code,
-        "BirthDate": birth_date.strftime("%Y-%m-%d"),
+        "BirthDate": birth_date,
         "PostalCode": zip_code,
         "AddressCountyName": county,
         "City": city,
         "ResponsibleOrganizationIdentifier": district_id,
         "RefSex.Description": sex,
         "RefRace.Description": race,
-        "HispanicLatinoEthnicity": "Yes" if hispanic else "No",
+        "HispanicLatinoEthnicity": yes_no(hispanic),
         "FosterCareStartDate": foster_start,
         "FosterCareEndDate": foster_end,
-        "ChildAbuseNeglect": "Yes" if child_abuse else "No",
+        "ChildAbuseNeglect": yes_no(factors["child_abuse"]),
         "RefLanguage.Description": language,
-        "HomelessnessStatus": "Yes" if homelessness else "No",
-        "MigrantStatus": "Yes" if migrant else "No",
-        "RefParentMaritalStatus.Description": marital_status,
-        "FamilyMemberIncarcerated": "Yes" if incarcerated else "No",
-        "FamilyMemberSubstanceUseAbuse": "Yes" if substance_abuse else "No",
-        "LossOfParent": "Yes" if loss_parent else "No",
+        "HomelessnessStatus": yes_no(factors["homelessness"]),
+        "MigrantStatus": yes_no(factors["migrant"]),
+        # Family structure
+        "RefParentMaritalStatus.Description": choose(rng, MARITAL_STATUS, n),
+        "FamilyMemberIncarcerated": yes_no(factors["incarcerated"]),
+        "FamilyMemberSubstanceUseAbuse": yes_no(factors["substance_abuse"]),
+        "LossOfParent": yes_no(factors["loss_parent"]),
         "PercentOfFederalPovertyLevel": poverty_level,
         "FamilyIncome": family_income,
-        "NumberOfPeopleInFamily": num_people,
-        "HouseholdMemberDepressedOrMentallyIll": "Yes" if depression else "No",
+        "NumberOfPeopleInFamily": rng.integers(2, 8, n),
+        "HouseholdMemberDepressedOrMentallyIll": yes_no(factors["depression"]),
         "WeightAtBirth": weight_at_birth,
         "WeeksOfGestation": weeks_gestation
-    }
-
-    children.append(child)
+    })
+    return df_child, tier
 
-df_child = pd.DataFrame(children)
-df_child.to_csv(OUTPUT_DIR / "Child.csv", index=False)
-print(f"   ✓ Generated {len(df_child):,} children")
 
 # ============================================================================
 # 2. GENERATE RELATEDPERSON.CSV
 # ============================================================================
-print("2. Generating RelatedPerson.csv...")
-
-related_persons = []
-
-for _, child in df_child.iterrows():
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    risk_tier = risk_tiers[child_dcn]
-
+def generate_related_persons(rng, names, df_child, tier):
+    """1-2 guardians per child, employment correlated with risk tier"""
     # Number of guardians: 1-2 (weighted toward 2-parent households for low-risk)
-    if risk_tier == "High":
-        num_guardians = random.choices([1, 2], weights=[0.60, 0.40])[0]
-    else:
-        num_guardians = random.choices([1, 2], weights=[0.30, 0.70])[0]
-
-    # Select relationship types
-    relationships = random.sample(GUARDIAN_RELATIONSHIPS, min(num_guardians, len(GUARDIAN_RELATIONSHIPS)))
-
-    for relationship in relationships:
-        # Generate guardian demographics with Faker
-        rel_sex = "Female" if relationship in ["Mother", "Grandmother", "Foster mother", "Stepmother", "Aunt"] else "Male"
-
-        if rel_sex == "Female":
-            rel_first = fake.first_name_female()
-            rel_middle = fake.first_name_female() if random.random() > 0.3 else ""
-        else:
-            rel_first = fake.first_name_male()
-            rel_middle = fake.first_name_male() if random.random() > 0.3 else ""
-
-        # Last name same as child if parent/step-parent
-        if relationship in ["Mother", "Father", "Stepmother", "Stepfather"]:
-            rel_last = child["LastName"]
-        else:
-            rel_last = fake.last_name()
-
-        rel_generation = random.choice(["", "", "", "Jr.", "Sr."]) if random.random() > 0.95 else ""
-
-        # Guardian birth date (age 18-55)
-        rel_birthdate = fake.date_of_birth(minimum_age=18, maximum_age=55)
-
-        rel_hispanic = random.choice([True, False])
+    num_guardians = 1 + bernoulli(rng, by_tier(tier, TWO_GUARDIAN_RATES))
+
+    # Select distinct relationship types (like random.sample)
+    first_rel = rng.integers(0, len(GUARDIAN_RELATIONSHIPS), len(df_child))
+    second_rel = rng.integers(0, len(GUARDIAN_RELATIONSHIPS) - 1, len(df_child))
+    second_rel += second_rel >= first_rel
+
+    child_row = np.repeat(np.arange(len(df_child)), num_guardians)
+    is_second = np.zeros(len(child_row), dtype=bool)
+    is_second[1:] = child_row[1:] == child_row[:-1]
+    relationship = np.asarray(GUARDIAN_RELATIONSHIPS, dtype=object)[
+        np.where(is_second, second_rel[child_row], first_rel[child_row])
+    ]
+    n = len(child_row)
+    child = df_child.iloc[child_row]
+
+    # Generate guardian demographics from the Faker name pools
+    female = np.isin(relationship, FEMALE_RELATIONSHIPS)
+    rel_sex = np.where(female, "Female", "Male")
+    rel_first = np.where(female, choose(rng, names["female"], n), choose(rng, names["male"], n))
+    rel_middle = np.where(female, choose(rng, names["female"], n), choose(rng, names["male"], n))
+    rel_middle[~bernoulli(rng, np.full(n, 0.7))] = ""
+
+    # Last name same as child if parent/step-parent
+    rel_last = np.where(np.isin(relationship, PARENT_RELATIONSHIPS),
+                        child["LastName"].to_numpy(dtype=object), choose(rng, names["last"], n))
+
+    rel_generation = np.where(bernoulli(rng, np.full(n, 0.05)),
+                              choose(rng, ["", "", "", "Jr.", "Sr."], n), "")
+
+    # Guardian birth date (age 18-55 at extract date)
+    oldest = EXTRACT_DATE - np.timedelta64(56 * 365 + 14, "D")
+    youngest = EXTRACT_DATE - np.timedelta64(18 * 365 + 4, "D")
+    rel_birthdate = oldest + days(rng.integers(1, (youngest - oldest).astype(int) + 1, n))
+
+    # Employment status - CORRELATED WITH RISK, dated within the last 5 years
+    emp_status = np.asarray(EMPLOYMENT_STATUS, dtype=object)[
+        weighted_choice(rng, by_tier(tier[child_row], EMPLOYMENT_WEIGHTS))
+    ]
+    emp_date = EXTRACT_DATE - days(rng.integers(0, 5 * 365 + 2, n))
+
+    return pd.DataFrame({
+        "Child DCN": child["Child DCN"].to_numpy(),
+        "Child MOSIS ID": child["Child MOSIS ID"].to_numpy(),
+        "RefPersonRelationshipType.Description": relationship,
+        "RelatedPerson LastName": rel_last,
+        "RelatedPerson FirstName": rel_first,
+        "RelatedPerson MiddleName": rel_middle,
+        "RelatedPerson GenerationCode": rel_generation,
+        "RelatedPerson BirthDate": rel_birthdate,
+        "RelatedPerson PostalCode": child["PostalCode"].to_numpy(),
+        "RelatedPerson AddressCountyName": child["AddressCountyName"].to_numpy(),
+        "RelatedPerson City": child["City"].to_numpy(),
+        "RelatedPerson RefSex.Description": rel_sex,
+        "RelatedPerson HispanicLatinoEthnicity": yes_no(bernoulli(rng, np.full(n, 0.5))),
+        "RelatedPerson RefEmploymentStatus.Description": emp_status,
+        "RelatedPerson EmploymentStatusDate": emp_date
+    })
 
-        # Employment status - CORRELATED WITH RISK
-        if risk_tier == "High":
-            emp_status = random.choices(EMPLOYMENT_STATUS, weights=[0.45, 0.25, 0.20, 0.10])[0]
-        elif risk_tier == "Medium":
-            emp_status = random.choices(EMPLOYMENT_STATUS, weights=[0.60, 0.15, 0.15, 0.10])[0]
-        else:
-            emp_status = random.choices(EMPLOYMENT_STATUS, weights=[0.75, 0.05, 0.10, 0.10])[0]
-
-        emp_date = fake.date_between(start_date='-5y', end_date='today')
-
-        related = {
-            "Child DCN": child_dcn,
-            "Child MOSIS ID": child_mosis_id,
-            "RefPersonRelationshipType.Description": relationship,
-            "RelatedPerson LastName": rel_last,
-            "RelatedPerson FirstName": rel_first,
-            "RelatedPerson MiddleName": rel_middle,
-            "RelatedPerson GenerationCode": rel_generation,
-            "RelatedPerson BirthDate": rel_birthdate.strftime("%Y-%m-%d"),
-            "RelatedPerson PostalCode": child["PostalCode"],
-            "RelatedPerson AddressCountyName": child["AddressCountyName"],
-            "RelatedPerson City": child["City"],
-            "RelatedPerson RefSex.Description": rel_sex,
-            "RelatedPerson HispanicLatinoEthnicity": "Yes" if rel_hispanic else "No",
-            "RelatedPerson RefEmploymentStatus.Description": emp_status,
-            "RelatedPerson EmploymentStatusDate": emp_date.strftime("%Y-%m-%d")
-        }
-
-        related_persons.append(related)
-
-df_related = pd.DataFrame(related_persons)
-df_related.to_csv(OUTPUT_DIR / "RelatedPerson.csv", index=False)
-print(f"   ✓ Generated {len(df_related):,} related persons")
 
 # ============================================================================
 # 3. GENERATE CHILDPARTICIPATION.CSV (with specific distribution rules)
 # ============================================================================
-print("3. Generating ChildParticipation.csv...")
-
-participations = []
-
-# Participation distribution: 40%=1, 35%=2, 20%=3, 5%=4-5
-participation_counts = []
-for _ in range(int(NUM_CHILDREN * 0.40)):
-    participation_counts.append(1)
-for _ in range(int(NUM_CHILDREN * 0.35)):
-    participation_counts.append(2)
-for _ in range(int(NUM_CHILDREN * 0.20)):
-    participation_counts.append(3)
-for _ in range(NUM_CHILDREN - len(participation_counts)):
-    participation_counts.append(random.randint(4, 5))
-
-random.shuffle(participation_counts)
-
-for idx, (_, child) in enumerate(df_child.iterrows()):
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    birthdate = datetime.strptime(child["BirthDate"], "%Y-%m-%d")
-    risk_tier = risk_tiers[child_dcn]
+def participation_counts(rng, num_children):
+    """Episodes per child: exactly 40%=1, 35%=2, 20%=3, rest 4-5, shuffled"""
+    counts = [np.full(int(num_children * share), count) for count, share in PARTICIPATION_COUNT_SHARES]
+    assigned = sum(len(c) for c in counts)
+    counts.append(rng.integers(4, 6, num_children - assigned))
+    return rng.permutation(np.concatenate(counts))
 
-    num_participations = participation_counts[idx]
 
-    # Determine if has concurrent programs (10-15%)
-    has_concurrent = random.random() < 0.125
+def generate_participation(rng, df_child, tier):
+    """
+    Participation episodes, generated episode position by episode position
+    (all children's 1st episode, then 2nd, ...) since each starts after the last
+    """
+    n = len(df_child)
+    birth = df_child["BirthDate"].to_numpy().astype("datetime64[D]")
+    counts = participation_counts(rng, n)
 
-    # Determine if has gaps (25-35%)
-    has_gaps = random.random() < 0.30
+    # Determine if has concurrent programs (10-15%) / gaps (25-35%)
+    has_concurrent = bernoulli(rng, np.full(n, CONCURRENT_RATE))
+    has_gaps = bernoulli(rng, np.full(n, GAP_RATE))
 
     # Start participation between age 1mo - 2yrs
-    current_date = birthdate + timedelta(days=random.randint(30, 730))
-
-    participation_records = []
-
-    for p in range(num_participations):
-        # Select age-appropriate program
-        child_age = get_age_at_date(birthdate, current_date)
-
-        valid_programs = [prog for prog, (min_age, max_age) in PROGRAM_TYPES.items()
-                         if min_age <= child_age <= max_age]
-
-        if not valid_programs:
-            current_date = birthdate + timedelta(days=365)
-            valid_programs = [prog for prog, (min_age, max_age) in PROGRAM_TYPES.items()
-                             if min_age <= 1 <= max_age]
-
-        program = random.choice(valid_programs)
+    current = birth + days(rng.integers(30, 731, n))
+
+    programs = list(PROGRAM_TYPES)
+    min_age = np.array([window[0] for window in PROGRAM_TYPES.values()])
+    max_age = np.array([window[1] for window in PROGRAM_TYPES.values()])
+    attendance_range = np.array([ATTENDANCE_RANGES.get(p, CHILDCARE_ATTENDANCE) for p in programs])
+    duration = by_tier(tier, DURATION_RANGES)
+    gap_range = by_tier(tier, GAP_RANGES)
+    factor_range = by_tier(tier, ATTENDANCE_FACTORS)
+
+    max_count = counts.max() if n else 0
+    shape = (n, max_count)
+    program = np.zeros(shape, dtype=int)
+    enrollment = np.empty(shape, dtype="datetime64[D]")
+    plan = np.empty(shape, dtype="datetime64[D]")
+    end = np.empty(shape, dtype="datetime64[D]")
+    attendance = np.zeros(shape, dtype=int)
+
+    for p in range(max_count):
+        # Select age-appropriate program (children past every window restart at age 1)
+        age = age_years(birth, current)[:, None]
+        valid = (min_age <= age) & (age <= max_age)
+        too_old = ~valid.any(axis=1)
+        current[too_old] = birth[too_old] + np.timedelta64(365, "D")
+        valid[too_old] = (min_age <= 1) & (1 <= max_age)
+        program[:, p] = pick_true(rng, valid)
 
         # Duration based on risk tier
-        if risk_tier == "High":
-            duration_days = random.randint(60, 365)  # Shorter, unstable
-        elif risk_tier == "Medium":
-            duration_days = random.randint(180, 730)
-        else:
-            duration_days = random.randint(365, 1095)  # Longer, stable
-
-        enrollment_date = current_date
-        service_plan_date = enrollment_date + timedelta(days=random.randint(1, 30))
-        service_end_date = service_plan_date + timedelta(days=duration_days)
+        enrollment[:, p] = current
+        plan[:, p] = current + days(rng.integers(1, 31, n))
+        end[:, p] = plan[:, p] + days(integers(rng, duration[:, 0], duration[:, 1]))
 
         # Cap at age 5.5
-        age_at_end = get_age_at_date(birthdate, service_end_date)
-        if age_at_end > 5.5:
-            service_end_date = birthdate + timedelta(days=int(5.5 * 365))
-
-        # Attendance based on program type and risk
-        if program in ["Head Start", "State Pre-K"]:
-            base_attendance = random.randint(80, 180)
-        elif program in ["Home Visiting"]:
-            base_attendance = random.randint(5, 30)
-        elif program in ["Early Intervention", "First Steps"]:
-            base_attendance = random.randint(10, 60)
-        else:  # Childcare
-            base_attendance = random.randint(50, 220)
-
-        # Adjust for risk
-        if risk_tier == "High":
-            attendance = int(base_attendance * random.uniform(0.5, 0.8))
-        elif risk_tier == "Medium":
-            attendance = int(base_attendance * random.uniform(0.7, 0.95))
-        else:
-            attendance = int(base_attendance * random.uniform(0.85, 1.0))
-
-        # Grade level
-        if program in ["State Pre-K", "Head Start"]:
-            grade_level = "Pre-K"
-        elif program in ["Early Intervention", "First Steps"]:
-            grade_level = "Early Intervention"
-        else:
-            grade_level = ""
+        past_cap = age_years(birth, end[:, p]) > 5.5
+        end[past_cap, p] = birth[past_cap] + np.timedelta64(MAX_PARTICIPATION_AGE_DAYS, "D")
 
-        # Funding source
-        funding = random.choice(FUNDING_SOURCES)
-
-        # Visiting indicator
-        visiting = "Yes" if program == "Home Visiting" else "No"
-
-        participation = {
-            "Child DCN": child_dcn,
-            "Child MOSIS ID": child_mosis_id,
-            "RefProgramType.Description": program,
-            "EnrollmentDate": enrollment_date.strftime("%Y-%m-%d"),
-            "ServicePlanDate": service_plan_date.strftime("%Y-%m-%d"),
-            "ServicePlanEndDate": service_end_date.strftime("%Y-%m-%d"),
-            "VisitingIndicator": visiting,
-            "NumberOfDaysInAttendance": attendance,
-            "RefStudentGradeLevel.Description": grade_level,
-            "RefFundingSource.Descriptions": funding
-        }
-
-        participation_records.append(participation)
+        # Attendance based on program type, adjusted for risk
+        base = attendance_range[program[:, p]]
+        base_attendance = integers(rng, base[:, 0], base[:, 1])
+        attendance[:, p] = (base_attendance * rng.uniform(factor_range[:, 0], factor_range[:, 1])).astype(int)
 
         # Move to next enrollment with potential gaps
-        if has_gaps and p < num_participations - 1:
-            if risk_tier == "High":
-                gap_days = random.randint(60, 180)  # Longer gaps
-            else:
-                gap_days = random.randint(30, 120)
-            current_date = service_end_date + timedelta(days=gap_days)
-        else:
-            current_date = service_end_date + timedelta(days=random.randint(1, 30))
+        gap = np.where(has_gaps & (p < counts - 1),
+                       integers(rng, gap_range[:, 0], gap_range[:, 1]),
+                       rng.integers(1, 31, n))
+        current = end[:, p] + days(gap)
 
     # Handle concurrent programs (overlapping dates for 10-15%)
-    if has_concurrent and len(participation_records) >= 2:
-        overlap_start = datetime.strptime(participation_records[0]["ServicePlanDate"], "%Y-%m-%d")
-        participation_records[1]["EnrollmentDate"] = (overlap_start + timedelta(days=30)).strftime("%Y-%m-%d")
-        participation_records[1]["ServicePlanDate"] = (overlap_start + timedelta(days=45)).strftime("%Y-%m-%d")
+    overlap = has_concurrent & (counts >= 2)
+    enrollment[overlap, 1] = plan[overlap, 0] + np.timedelta64(30, "D")
+    plan[overlap, 1] = plan[overlap, 0] + np.timedelta64(45, "D")
+
+    # Flatten child-major: each child's episodes in order
+    rows, positions = np.nonzero(np.arange(max_count) < counts[:, None])
+    program_name = np.asarray(programs, dtype=object)[program[rows, positions]]
+    n_rows = len(rows)
+
+    # Grade level
+    grade_level = np.select(
+        [np.isin(program_name, ["State Pre-K", "Head Start"]),
+         np.isin(program_name, ["Early Intervention", "First Steps"])],
+        ["Pre-K", "Early Intervention"], "")
+
+    return pd.DataFrame({
+        "Child DCN": df_child["Child DCN"].to_numpy()[rows],
+        "Child MOSIS ID": df_child["Child MOSIS ID"].to_numpy()[rows],
+        "RefProgramType.Description": program_name,
+        "EnrollmentDate": enrollment[rows, positions],
+        "ServicePlanDate": plan[rows, positions],
+        "ServicePlanEndDate": end[rows, positions],
+        "VisitingIndicator": yes_no(program_name == "Home Visiting"),
+        "NumberOfDaysInAttendance": attendance[rows, positions],
+        "RefStudentGradeLevel.Description": grade_level,
+        "RefFundingSource.Descriptions": choose(rng, FUNDING_SOURCES, n_rows)
+    })
+
+
+def episode_index(df_child, df_participation):
+    """
+    Per-child episode lookup, built once after participation is generated.
 
-    participations.extend(participation_records)
+    Participation rows are child-major (each child's episodes together, in
+    df_child order), so child i's episodes are rows offsets[i]..offsets[i] +
+    counts[i]; "child" maps each episode back to its df_child row. Service
+    plan dates are kept as day arrays for the stages that date events
+    within an episode.
+    """
+    child = pd.Index(df_child["Child DCN"]).get_indexer(df_participation["Child DCN"])
+    counts = np.bincount(child, minlength=len(df_child))
+    return {
+        "offsets": np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(int),
+        "counts": counts,
+        "child": child,
+        "service_start": df_participation["ServicePlanDate"].to_numpy().astype("datetime64[D]"),
+        "service_end": df_participation["ServicePlanEndDate"].to_numpy().astype("datetime64[D]"),
+    }
 
-df_participation = pd.DataFrame(participations)
-df_participation.to_csv(OUTPUT_DIR / "ChildParticipation.csv", index=False)
-print(f"   ✓ Generated {len(df_participation):,} participation records")
 
 # ============================================================================
 # 4. GENERATE CHILDDISABILITY.CSV
 # ============================================================================
-print("4. Generating ChildDisability.csv...")
+def generate_disabilities(rng, df_child, tier):
+    """Disability prevalence (10-14%, higher for high-risk)"""
+    has_disability = bernoulli(rng, by_tier(tier, DISABILITY_RATES))
+    child = df_child[has_disability]
+    return pd.DataFrame({
+        "Child DCN": child["Child DCN"].to_numpy(),
+        "Child MOSIS ID": child["Child MOSIS ID"].to_numpy(),
+        "DisabilityStatus": "Yes",
+        "RefIDEADisabilityType": choose(rng, DISABILITY_TYPES, len(child))
+    })
 
-disabilities = []
 
-for _, child in df_child.iterrows():
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    risk_tier = risk_tiers[child_dcn]
+# ============================================================================
+# 5. GENERATE CHILDMONITORING.CSV
+# ============================================================================
+def generate_monitoring(rng, df_child, tier, episodes):
+    """Monitoring visits during a random participation episode (±30 days)"""
+    offsets, counts = episodes["offsets"], episodes["counts"]
 
-    # Disability prevalence (10-14%, higher for high-risk)
-    if risk_tier == "High":
-        has_disability = random.random() < 0.18
-    elif risk_tier == "Medium":
-        has_disability = random.random() < 0.12
-    else:
-        has_disability = random.random() < 0.08
+    # Number of visits based on risk (0-6); children without participation get none
+    visits = by_tier(tier, VISIT_COUNT_RANGES)
+    num_visits = np.where(counts > 0, integers(rng, visits[:, 0], visits[:, 1]), 0)
+    child_row = np.repeat(np.arange(len(df_child)), num_visits)
 
-    if has_disability:
-        disability_type = random.choice(DISABILITY_TYPES)
+    # Select random participation episode per visit
+    episode = offsets[child_row] + np.floor(rng.random(len(child_row)) * counts[child_row]).astype(int)
+    service_start = episodes["service_start"][episode]
+    service_end = episodes["service_end"][episode]
 
-        disability = {
-            "Child DCN": child_dcn,
-            "Child MOSIS ID": child_mosis_id,
-            "DisabilityStatus": "Yes",
-            "RefIDEADisabilityType": disability_type
-        }
+    # Visit occurs during participation ±30 days
+    window_start = service_start - np.timedelta64(30, "D")
+    window_days = np.maximum(1, (service_end - service_start).astype(int) + 60)
+    visit_date = window_start + days(integers(rng, np.zeros(len(child_row), dtype=int), window_days))
 
-        disabilities.append(disability)
+    return pd.DataFrame({
+        "Child DCN": df_child["Child DCN"].to_numpy()[child_row],
+        "Child MOSIS ID": df_child["Child MOSIS ID"].to_numpy()[child_row],
+        "RefVisitingType.Description": choose(rng, VISIT_TYPES, len(child_row)),
+        "VisitDate": visit_date
+    })
 
-df_disability = pd.DataFrame(disabilities)
-df_disability.to_csv(OUTPUT_DIR / "ChildDisability.csv", index=False)
-print(f"   ✓ Generated {len(df_disability):,} disability records")
 
 # ============================================================================
-# 5. GENERATE CHILDMONITORING.CSV
+# 6. GENERATE CHILDINSURANCE.CSV
 # ============================================================================
-print("5. Generating ChildMonitoring.csv...")
+def generate_insurance(rng, df_child):
+    """1-2 insurance records per child, type based on income"""
+    n = len(df_child)
+    poverty_level = df_child["PercentOfFederalPovertyLevel"].to_numpy()
+    band = np.select([poverty_level < 150, poverty_level < 250], [0, 1], 2)
+    first_type = weighted_choice(rng, np.asarray(INSURANCE_WEIGHTS)[band])
+
+    num_records = 1 + bernoulli(rng, np.full(n, 0.25))
+    child_row = np.repeat(np.arange(n), num_records)
+    is_second = np.zeros(len(child_row), dtype=bool)
+    is_second[1:] = child_row[1:] == child_row[:-1]
+
+    # Second record might change type
+    insurance = np.where(is_second, rng.integers(0, len(INSURANCE_TYPES), len(child_row)),
+                         first_type[child_row])
+    birth = df_child["BirthDate"].to_numpy().astype("datetime64[D]")[child_row]
+    status_date = birth + days(rng.integers(0, 1826, len(child_row)))
+
+    return pd.DataFrame({
+        "Child DCN": df_child["Child DCN"].to_numpy()[child_row],
+        "Child MOSIS ID": df_child["Child MOSIS ID"].to_numpy()[child_row],
+        "RefHealthInsuranceCoverage.Description": np.asarray(INSURANCE_TYPES, dtype=object)[insurance],
+        "HealthInsuranceStatusDate": status_date
+    })
 
-monitoring_visits = []
 
-for _, child in df_child.iterrows():
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    risk_tier = risk_tiers[child_dcn]
-
-    # Get participation windows
-    child_participations = df_participation[df_participation["Child DCN"] == child_dcn]
-
-    if len(child_participations) == 0:
-        continue
-
-    # Number of visits based on risk (0-6)
-    if risk_tier == "High":
-        num_visits = random.randint(3, 6)
-    elif risk_tier == "Medium":
-        num_visits = random.randint(1, 4)
-    else:
-        num_visits = random.randint(0, 2)
+# ============================================================================
+# 7-8. GENERATE CHILDIMMUNIZATION.CSV / CHILDSCREENING.CSV
+# ============================================================================
+def scheduled_events(rng, df_child, rates, schedule, jitter, type_col, date_col):
+    """
+    One row per scheduled event received (probability rates per child), dated
+    days after birth + jitter days; no events after the extract date
+    """
+    n = len(df_child)
+    birth = df_child["BirthDate"].to_numpy().astype("datetime64[D]")
+    event_types = np.asarray([event for event, _ in schedule], dtype=object)
+    offsets = np.array([offset for _, offset in schedule])
 
-    for _ in range(num_visits):
-        # Select random participation episode
-        part_record = child_participations.sample(1).iloc[0]
+    received = rng.random((n, len(schedule))) < rates[:, None]
+    event_date = birth[:, None] + days(offsets + rng.integers(jitter[0], jitter[1] + 1, (n, len(schedule))))
+    # Don't schedule future events
+    rows, events = np.nonzero(received & (event_date <= EXTRACT_DATE))
 
-        service_start = datetime.strptime(part_record["ServicePlanDate"], "%Y-%m-%d")
-        service_end = datetime.strptime(part_record["ServicePlanEndDate"], "%Y-%m-%d")
+    return pd.DataFrame({
+        "Child DCN": df_child["Child DCN"].to_numpy()[rows],
+        "Child MOSIS ID": df_child["Child MOSIS ID"].to_numpy()[rows],
+        type_col: event_types[events],
+        date_col: event_date[rows, events]
+    })
 
-        # Visit occurs during participation ±30 days
-        visit_window_start = service_start - timedelta(days=30)
-        visit_window_end = service_end + timedelta(days=30)
 
-        visit_date = random_date(visit_window_start, visit_window_end)
-        visit_type = random.choice(VISIT_TYPES)
+def generate_immunizations(rng, df_child, tier):
+    """CDC schedule; compliance rate based on risk"""
+    return scheduled_events(rng, df_child, by_tier(tier, IMMUNIZATION_COMPLIANCE),
+                            IMMUNIZATION_SCHEDULE, (-15, 30),
+                            "RefImmunizationType.Description", "ImmunizationDate")
 
-        visit = {
-            "Child DCN": child_dcn,
-            "Child MOSIS ID": child_mosis_id,
-            "RefVisitingType.Description": visit_type,
-            "VisitDate": visit_date.strftime("%Y-%m-%d")
-        }
 
-        monitoring_visits.append(visit)
+def generate_screenings(rng, df_child, tier):
+    """Well-child screenings; completion rate based on risk"""
+    return scheduled_events(rng, df_child, by_tier(tier, SCREENING_COMPLETION),
+                            SCREENING_SCHEDULE, (-30, 60),
+                            "RefScheduledWellChildScreening.Description",
+                            "WellChildScreeningReceivedDate")
 
-df_monitoring = pd.DataFrame(monitoring_visits)
-df_monitoring.to_csv(OUTPUT_DIR / "ChildMonitoring.csv", index=False)
-print(f"   ✓ Generated {len(df_monitoring):,} monitoring visits")
 
 # ============================================================================
-# 6. GENERATE CHILDINSURANCE.CSV
+# 9. GENERATE CHILDOUTCOMES.CSV
 # ============================================================================
-print("6. Generating ChildInsurance.csv...")
+def generate_outcomes(rng, df_child, tier, episodes):
+    """1-3 COS outcome assessments per child, on distinct participation episodes"""
+    offsets, counts, episode_child = episodes["offsets"], episodes["counts"], episodes["child"]
+
+    # Generate 1-3 outcome assessments (no more than the child's episodes)
+    num_outcomes = integers(rng, np.minimum(1, counts), np.minimum(3, counts))
+
+    # Sample episodes without replacement: shuffle each child's episodes, keep the first k
+    shuffled = np.lexsort((rng.random(len(episode_child)), episode_child))
+    shuffled_child = episode_child[shuffled]
+    rank = np.arange(len(shuffled)) - offsets[shuffled_child]
+    episode = shuffled[rank < num_outcomes[shuffled_child]]
+    child_row = episode_child[episode]
+    n = len(episode)
+
+    service_start = episodes["service_start"][episode]
+    service_end = episodes["service_end"][episode]
+
+    # Outcome timepoint
+    timepoint = rng.integers(0, len(OUTCOME_TIMEPOINTS), n)
+    outcome_date = np.select(
+        [timepoint == 0, timepoint == 1],
+        [service_start + days(rng.integers(0, 31, n)),       # Entry
+         service_end + days(rng.integers(-30, 91, n))],       # Exit
+        service_start + days(rng.integers(300, 401, n)))     # Annual Review
+
+    # COS Ratings (1-7) - CORRELATED WITH RISK
+    weights = np.asarray(COS_WEIGHTS)[tier[child_row]]
+    ratings = [weighted_choice(rng, weights) + 1 for _ in range(3)]
+    rating_phys = weighted_choice(rng, np.asarray(COS_PHYSICAL_WEIGHTS)[tier[child_row]]) + 1
+
+    # Summary rating
+    rating_summary = (ratings[0] + ratings[1] + ratings[2] + rating_phys) // 4
+
+    return pd.DataFrame({
+        "Child DCN": df_child["Child DCN"].to_numpy()[child_row],
+        "Child MOSIS ID": df_child["Child MOSIS ID"].to_numpy()[child_row],
+        "COSRatingA.Description": ratings[0],
+        "COSRatingB.Description": ratings[1],
+        "COSRatingC.Description": ratings[2],
+        "COSRatingPhysical.Description": rating_phys,
+        "COSRatingSummary.Description": rating_summary,
+        "RefOutcomeTimePoint.Description": np.asarray(OUTCOME_TIMEPOINTS, dtype=object)[timepoint],
+        "OutcomeDate": outcome_date
+    })
+
+
+def stream_tables(rng, names, first_index, num_children, output_dir, batch_size=BATCH_SIZE,
+                  file_format="csv", verbose=True):
+    """
+    Generate children first_index.. in batches of batch_size children and
+    append each batch's 9 tables to output_dir/<table>.<file_format>.
 
-insurance_records = []
+    Only one batch is in memory at a time, so peak memory depends on
+    batch_size, not num_children. Batches are drawn from rng in order: the
+    files depend on (rng state, num_children, batch_size). Returns
+    {table: row count}.
+    """
+    output_dir = Path(output_dir)
+    num_batches = max(1, -(-num_children // batch_size))  # ceil
+    writers = {}
+    try:
+        for batch in range(num_batches):
+            batch_first = first_index + batch * batch_size
+            batch_size_now = min(batch_size, num_children - batch * batch_size)
+            if verbose and num_batches > 1:
+                print(f"Batch {batch + 1}/{num_batches}: children {batch_first:,}-"
+                      f"{batch_first + batch_size_now - 1:,}")
+            tables = generate_tables(rng, names, batch_first, batch_size_now,
+                                     verbose=verbose and num_batches == 1)
+            for table, df in tables.items():
+                if table not in writers:
+                    writers[table] = BatchWriter(output_dir / f"{table}.{file_format}", file_format)
+                writers[table].write(df)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {table: writer.rows for table, writer in writers.items()}
+
+
+def print_footer(location):
+    print()
+    print("=" * 70)
+    print("✨ DATA GENERATION COMPLETE!")
+    print(f"📁 Files saved to: {location}")
+    print("=" * 70)
+    print()
+    print("Generated using:")
+    print("  • Faker library for realistic synthetic data")
+    print("  • Excel field specifications for accurate schemas")
+    print("  • Risk-correlated distributions for modeling readiness")
+    print("=" * 70)
 
-for _, child in df_child.iterrows():
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    birthdate = datetime.strptime(child["BirthDate"], "%Y-%m-%d")
-    poverty_level = child["PercentOfFederalPovertyLevel"]
 
-    # Insurance type based on income
-    if poverty_level < 150:
-        insurance = random.choices(INSURANCE_TYPES, weights=[0.70, 0.20, 0.05, 0.05])[0]
-    elif poverty_level < 250:
-        insurance = random.choices(INSURANCE_TYPES, weights=[0.40, 0.35, 0.20, 0.05])[0]
-    else:
-        insurance = random.choices(INSURANCE_TYPES, weights=[0.10, 0.20, 0.65, 0.05])[0]
+# ============================================================================
+# QA CHECKS & SUMMARY
+# ============================================================================
+def run_qa(output_dir):
+    """Validate the written files with ecids_qa; the report is also saved as qa_report.json"""
+    report = qa_report(output_dir)
+    print_qa_report(report)
+    write_qa_report(report, Path(output_dir) / REPORT_FILE)
+    return report
 
-    # 1-2 insurance records per child
-    num_records = random.choices([1, 2], weights=[0.75, 0.25])[0]
 
-    for i in range(num_records):
-        status_date = birthdate + timedelta(days=random.randint(0, 1825))
+def generate_tables(rng, names, first_index, num_children, verbose=True):
+    """All 9 tables for children first_index.. drawn from rng; returns {table: DataFrame}"""
+    log = print if verbose else (lambda *args: None)
+    tables = {}
 
-        insurance_rec = {
-            "Child DCN": child_dcn,
-            "Child MOSIS ID": child_mosis_id,
-            "RefHealthInsuranceCoverage.Description": insurance,
-            "HealthInsuranceStatusDate": status_date.strftime("%Y-%m-%d")
-        }
+    log("1. Generating Child.csv...")
+    df_child, tier = generate_children(rng, names, first_index, num_children)
+    tables["Child"] = df_child
+    log(f"   ✓ Generated {len(df_child):,} children")
 
-        insurance_records.append(insurance_rec)
+    log("2. Generating RelatedPerson.csv...")
+    tables["RelatedPerson"] = generate_related_persons(rng, names, df_child, tier)
+    log(f"   ✓ Generated {len(tables['RelatedPerson']):,} related persons")
 
-        # Second record might change type
-        if i == 0 and num_records == 2:
-            insurance = random.choice(INSURANCE_TYPES)
+    log("3. Generating ChildParticipation.csv...")
+    df_participation = generate_participation(rng, df_child, tier)
+    tables["ChildParticipation"] = df_participation
+    episodes = episode_index(df_child, df_participation)
+    log(f"   ✓ Generated {len(df_participation):,} participation records")
 
-df_insurance = pd.DataFrame(insurance_records)
-df_insurance.to_csv(OUTPUT_DIR / "ChildInsurance.csv", index=False)
-print(f"   ✓ Generated {len(df_insurance):,} insurance records")
+    log("4. Generating ChildDisability.csv...")
+    tables["ChildDisability"] = generate_disabilities(rng, df_child, tier)
+    log(f"   ✓ Generated {len(tables['ChildDisability']):,} disability records")
 
-# ============================================================================
-# 7. GENERATE CHILDIMMUNIZATION.CSV
-# ============================================================================
-print("7. Generating ChildImmunization.csv...")
-
-immunizations = []
-
-for _, child in df_child.iterrows():
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    risk_tier = risk_tiers[child_dcn]
-    birthdate = datetime.strptime(child["BirthDate"], "%Y-%m-%d")
-
-    # Immunization schedule (CDC pediatric schedule)
-    scheduled_immunizations = [
-        ("HepB", 0),      # Birth
-        ("DTaP", 60),     # 2 months
-        ("Polio", 60),
-        ("Hib", 60),
-        ("PCV", 60),
-        ("Rotavirus", 60),
-        ("DTaP", 120),    # 4 months
-        ("Polio", 120),
-        ("Hib", 120),
-        ("PCV", 120),
-        ("Rotavirus", 120),
-        ("DTaP", 180),    # 6 months
-        ("Polio", 180),
-        ("Hib", 180),
-        ("PCV", 180),
-        ("HepB", 180),
-        ("MMR", 365),     # 12 months
-        ("Varicella", 365),
-        ("HepA", 365),
-        ("DTaP", 450),    # 15 months
-        ("PCV", 450),
-        ("HepA", 548),    # 18 months
-    ]
+    log("5. Generating ChildMonitoring.csv...")
+    tables["ChildMonitoring"] = generate_monitoring(rng, df_child, tier, episodes)
+    log(f"   ✓ Generated {len(tables['ChildMonitoring']):,} monitoring visits")
 
-    # Compliance rate based on risk
-    if risk_tier == "High":
-        compliance = 0.60
-    elif risk_tier == "Medium":
-        compliance = 0.80
-    else:
-        compliance = 0.95
+    log("6. Generating ChildInsurance.csv...")
+    tables["ChildInsurance"] = generate_insurance(rng, df_child)
+    log(f"   ✓ Generated {len(tables['ChildInsurance']):,} insurance records")
 
-    for immunization_type, days_after_birth in scheduled_immunizations:
-        if random.random() < compliance:
-            imm_date = birthdate + timedelta(days=days_after_birth + random.randint(-15, 30))
+    log("7. Generating ChildImmunization.csv...")
+    tables["ChildImmunization"] = generate_immunizations(rng, df_child, tier)
+    log(f"   ✓ Generated {len(tables['ChildImmunization']):,} immunization records")
 
-            # Don't schedule future immunizations
-            if imm_date > datetime(2026, 2, 26):
-                continue
+    log("8. Generating ChildScreening.csv...")
+    tables["ChildScreening"] = generate_screenings(rng, df_child, tier)
+    log(f"   ✓ Generated {len(tables['ChildScreening']):,} screening records")
 
-            immunization = {
-                "Child DCN": child_dcn,
-                "Child MOSIS ID": child_mosis_id,
-                "RefImmunizationType.Description": immunization_type,
-                "ImmunizationDate": imm_date.strftime("%Y-%m-%d")
-            }
+    log("9. Generating ChildOutcomes.csv...")
+    tables["ChildOutcomes"] = generate_outcomes(rng, df_child, tier, episodes)
+    log(f"   ✓ Generated {len(tables['ChildOutcomes']):,} outcome records")
 
-            immunizations.append(immunization)
+    return tables
 
-df_immunization = pd.DataFrame(immunizations)
-df_immunization.to_csv(OUTPUT_DIR / "ChildImmunization.csv", index=False)
-print(f"   ✓ Generated {len(df_immunization):,} immunization records")
 
-# ============================================================================
-# 8. GENERATE CHILDSCREENING.CSV
-# ============================================================================
-print("8. Generating ChildScreening.csv...")
-
-screenings = []
-
-for _, child in df_child.iterrows():
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    risk_tier = risk_tiers[child_dcn]
-    birthdate = datetime.strptime(child["BirthDate"], "%Y-%m-%d")
-
-    # Well-child screening schedule
-    screening_schedule = [
-        ("6-month", 180),
-        ("12-month", 365),
-        ("18-month", 548),
-        ("24-month", 730),
-        ("36-month", 1095),
-        ("48-month", 1460),
-    ]
+def print_header(num_children, seed, reference_xlsx=None):
+    print("=" * 70)
+    print("ECIDS SYNTHETIC DATA GENERATION")
+    print("=" * 70)
+    print(f"Generating data for {num_children:,} children using Faker library (seed {seed})...")
+    print()
 
-    # Completion rate based on risk (lower risk = better compliance)
-    if risk_tier == "High":
-        completion_rate = 0.50
-    elif risk_tier == "Medium":
-        completion_rate = 0.75
-    else:
-        completion_rate = 0.92
+    print(f"Loading reference lists from {reference_xlsx or REFERENCE_FILE.name}...")
+    languages, relationship_types = load_reference_lists(reference_xlsx)
+    print(f"  ✓ Loaded {len(languages)} languages")
+    print(f"  ✓ Loaded {len(relationship_types)} relationship types")
+    print()
 
-    for screening_type, days_after_birth in screening_schedule:
-        if random.random() < completion_rate:
-            screening_date = birthdate + timedelta(days=days_after_birth + random.randint(-30, 60))
 
-            # Don't schedule future screenings
-            if screening_date > datetime(2026, 2, 26):
-                continue
+def generate_dataset(num_children=NUM_CHILDREN, seed=SEED, output_dir=OUTPUT_DIR,
+                     batch_size=BATCH_SIZE, file_format="csv", reference_xlsx=None, qa=True):
+    """
+    Generate and write all 9 flat files, batch_size children at a time, then
+    (unless qa=False) check the written files with ecids_qa.
 
-            screening = {
-                "Child DCN": child_dcn,
-                "Child MOSIS ID": child_mosis_id,
-                "RefScheduledWellChildScreening.Description": screening_type,
-                "WellChildScreeningReceivedDate": screening_date.strftime("%Y-%m-%d")
-            }
+    Returns {table: row count}.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
 
-            screenings.append(screening)
+    print_header(num_children, seed, reference_xlsx)
+    names = build_name_pools(seed)
+    row_counts = stream_tables(rng, names, 1, num_children, output_dir, batch_size, file_format)
 
-df_screening = pd.DataFrame(screenings)
-df_screening.to_csv(OUTPUT_DIR / "ChildScreening.csv", index=False)
-print(f"   ✓ Generated {len(df_screening):,} screening records")
+    if num_children > batch_size:
+        for table, count in row_counts.items():
+            print(f"   ✓ Generated {count:,} {table} rows")
+    if qa:
+        run_qa(output_dir)
+    print_footer(output_dir.absolute())
+    return row_counts
 
-# ============================================================================
-# 9. GENERATE CHILDOUTCOMES.CSV
-# ============================================================================
-print("9. Generating ChildOutcomes.csv...")
-
-outcomes = []
-
-for _, child in df_child.iterrows():
-    child_dcn = child["Child DCN"]
-    child_mosis_id = child["Child MOSIS ID"]
-    risk_tier = risk_tiers[child_dcn]
-
-    # Get participation records
-    child_participations = df_participation[df_participation["Child DCN"] == child_dcn]
-
-    if len(child_participations) == 0:
-        continue
-
-    # Generate 1-3 outcome assessments
-    num_outcomes = random.randint(1, min(3, len(child_participations)))
-    sampled_parts = child_participations.sample(min(num_outcomes, len(child_participations)))
-
-    for _, part_record in sampled_parts.iterrows():
-        service_start = datetime.strptime(part_record["ServicePlanDate"], "%Y-%m-%d")
-        service_end = datetime.strptime(part_record["ServicePlanEndDate"], "%Y-%m-%d")
-
-        # Outcome timepoint
-        timepoint = random.choice(OUTCOME_TIMEPOINTS)
-
-        if timepoint == "Entry":
-            outcome_date = service_start + timedelta(days=random.randint(0, 30))
-        elif timepoint == "Exit":
-            outcome_date = service_end + timedelta(days=random.randint(-30, 90))
-        else:  # Annual Review
-            outcome_date = service_start + timedelta(days=random.randint(300, 400))
-
-        # COS Ratings (1-7) - CORRELATED WITH RISK
-        if risk_tier == "High":
-            rating_a = random.choices(COS_RATINGS, weights=[0.25, 0.25, 0.20, 0.15, 0.10, 0.03, 0.02])[0]
-            rating_b = random.choices(COS_RATINGS, weights=[0.25, 0.25, 0.20, 0.15, 0.10, 0.03, 0.02])[0]
-            rating_c = random.choices(COS_RATINGS, weights=[0.25, 0.25, 0.20, 0.15, 0.10, 0.03, 0.02])[0]
-            rating_phys = random.choices(COS_RATINGS, weights=[0.20, 0.20, 0.20, 0.20, 0.10, 0.05, 0.05])[0]
-        elif risk_tier == "Medium":
-            rating_a = random.choices(COS_RATINGS, weights=[0.10, 0.15, 0.20, 0.25, 0.20, 0.07, 0.03])[0]
-            rating_b = random.choices(COS_RATINGS, weights=[0.10, 0.15, 0.20, 0.25, 0.20, 0.07, 0.03])[0]
-            rating_c = random.choices(COS_RATINGS, weights=[0.10, 0.15, 0.20, 0.25, 0.20, 0.07, 0.03])[0]
-            rating_phys = random.choices(COS_RATINGS, weights=[0.08, 0.12, 0.20, 0.25, 0.20, 0.10, 0.05])[0]
-        else:  # Low risk
-            rating_a = random.choices(COS_RATINGS, weights=[0.03, 0.05, 0.10, 0.15, 0.27, 0.25, 0.15])[0]
-            rating_b = random.choices(COS_RATINGS, weights=[0.03, 0.05, 0.10, 0.15, 0.27, 0.25, 0.15])[0]
-            rating_c = random.choices(COS_RATINGS, weights=[0.03, 0.05, 0.10, 0.15, 0.27, 0.25, 0.15])[0]
-            rating_phys = random.choices(COS_RATINGS, weights=[0.02, 0.03, 0.08, 0.12, 0.25, 0.30, 0.20])[0]
-
-        # Summary rating
-        avg_rating = (int(rating_a) + int(rating_b) + int(rating_c) + int(rating_phys)) // 4
-        rating_summary = str(avg_rating)
-
-        outcome = {
-            "Child DCN": child_dcn,
-            "Child MOSIS ID": child_mosis_id,
-            "COSRatingA.Description": rating_a,
-            "COSRatingB.Description": rating_b,
-            "COSRatingC.Description": rating_c,
-            "COSRatingPhysical.Description": rating_phys,
-            "COSRatingSummary.Description": rating_summary,
-            "RefOutcomeTimePoint.Description": timepoint,
-            "OutcomeDate": outcome_date.strftime("%Y-%m-%d")
-        }
-
-        outcomes.append(outcome)
-
-df_outcomes = pd.DataFrame(outcomes)
-df_outcomes.to_csv(OUTPUT_DIR / "ChildOutcomes.csv", index=False)
-print(f"   ✓ Generated {len(df_outcomes):,} outcome records")
 
-# ============================================================================
-# QA CHECKS & SUMMARY
-# ============================================================================
-print()
-print("=" * 70)
-print("QA CHECKS & DATA SUMMARY")
-print("=" * 70)
-
-print("\n📊 Row Counts by File:")
-print(f"   Child.csv: {len(df_child):,}")
-print(f"   RelatedPerson.csv: {len(df_related):,}")
-print(f"   ChildParticipation.csv: {len(df_participation):,}")
-print(f"   ChildDisability.csv: {len(df_disability):,}")
-print(f"   ChildMonitoring.csv: {len(df_monitoring):,}")
-print(f"   ChildInsurance.csv: {len(df_insurance):,}")
-print(f"   ChildImmunization.csv: {len(df_immunization):,}")
-print(f"   ChildScreening.csv: {len(df_screening):,}")
-print(f"   ChildOutcomes.csv: {len(df_outcomes):,}")
-total_records = (len(df_child) + len(df_related) + len(df_participation) +
-                 len(df_disability) + len(df_monitoring) + len(df_insurance) +
-                 len(df_immunization) + len(df_screening) + len(df_outcomes))
-print(f"   TOTAL RECORDS: {total_records:,}")
-
-print("\n📈 Participation Statistics:")
-part_counts = df_participation.groupby("Child DCN").size()
-children_with_no_part = len(df_child) - len(part_counts)
-print(f"   Children with 0 participation records: {children_with_no_part} (0%)")
-print(f"   Children with 1 participation record: {(part_counts == 1).sum()} ({(part_counts == 1).sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Children with 2 participation records: {(part_counts == 2).sum()} ({(part_counts == 2).sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Children with 3 participation records: {(part_counts == 3).sum()} ({(part_counts == 3).sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Children with 4-5 participation records: {(part_counts >= 4).sum()} ({(part_counts >= 4).sum() / NUM_CHILDREN * 100:.1f}%)")
-
-# Gap analysis
-children_with_gaps = 0
-children_with_concurrent = 0
-
-for dcn in df_child["Child DCN"]:
-    child_parts = df_participation[df_participation["Child DCN"] == dcn].sort_values("EnrollmentDate")
-
-    if len(child_parts) >= 2:
-        # Check for gaps
-        for i in range(len(child_parts) - 1):
-            end1 = datetime.strptime(child_parts.iloc[i]["ServicePlanEndDate"], "%Y-%m-%d")
-            start2 = datetime.strptime(child_parts.iloc[i+1]["EnrollmentDate"], "%Y-%m-%d")
-            gap = (start2 - end1).days
-            if gap > 30:
-                children_with_gaps += 1
-                break
-
-        # Check for concurrent enrollment
-        for i in range(len(child_parts)):
-            for j in range(i+1, len(child_parts)):
-                start1 = datetime.strptime(child_parts.iloc[i]["EnrollmentDate"], "%Y-%m-%d")
-                end1 = datetime.strptime(child_parts.iloc[i]["ServicePlanEndDate"], "%Y-%m-%d")
-                start2 = datetime.strptime(child_parts.iloc[j]["EnrollmentDate"], "%Y-%m-%d")
-                end2 = datetime.strptime(child_parts.iloc[j]["ServicePlanEndDate"], "%Y-%m-%d")
-
-                # Check overlap
-                if start2 <= end1 and start1 <= end2:
-                    children_with_concurrent += 1
-                    break
-            if children_with_concurrent > 0:
-                break
-
-print(f"   Children with ≥1 gap (>30 days): {children_with_gaps} ({children_with_gaps / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Children with concurrent programs: {children_with_concurrent} ({children_with_concurrent / NUM_CHILDREN * 100:.1f}%)")
-
-print("\n⚠️  Risk Indicator Prevalence:")
-print(f"   Homelessness: {(df_child['HomelessnessStatus'] == 'Yes').sum()} ({(df_child['HomelessnessStatus'] == 'Yes').sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Foster Care: {(df_child['FosterCareStartDate'] != '').sum()} ({(df_child['FosterCareStartDate'] != '').sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Migrant Status: {(df_child['MigrantStatus'] == 'Yes').sum()} ({(df_child['MigrantStatus'] == 'Yes').sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Disability: {len(df_disability)} ({len(df_disability) / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Child Abuse/Neglect: {(df_child['ChildAbuseNeglect'] == 'Yes').sum()} ({(df_child['ChildAbuseNeglect'] == 'Yes').sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Family Incarceration: {(df_child['FamilyMemberIncarcerated'] == 'Yes').sum()} ({(df_child['FamilyMemberIncarcerated'] == 'Yes').sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Substance Abuse: {(df_child['FamilyMemberSubstanceUseAbuse'] == 'Yes').sum()} ({(df_child['FamilyMemberSubstanceUseAbuse'] == 'Yes').sum() / NUM_CHILDREN * 100:.1f}%)")
-print(f"   Depression/Mental Illness: {(df_child['HouseholdMemberDepressedOrMentallyIll'] == 'Yes').sum()} ({(df_child['HouseholdMemberDepressedOrMentallyIll'] == 'Yes').sum() / NUM_CHILDREN * 100:.1f}%)")
-
-print("\n✅ Referential Integrity Checks:")
-all_child_dcns = set(df_child["Child DCN"])
-checks = {
-    "RelatedPerson": df_related['Child DCN'].isin(all_child_dcns).all(),
-    "Participation": df_participation['Child DCN'].isin(all_child_dcns).all(),
-    "Disability": df_disability['Child DCN'].isin(all_child_dcns).all() if len(df_disability) > 0 else True,
-    "Monitoring": df_monitoring['Child DCN'].isin(all_child_dcns).all() if len(df_monitoring) > 0 else True,
-    "Insurance": df_insurance['Child DCN'].isin(all_child_dcns).all(),
-    "Immunization": df_immunization['Child DCN'].isin(all_child_dcns).all(),
-    "Screening": df_screening['Child DCN'].isin(all_child_dcns).all(),
-    "Outcomes": df_outcomes['Child DCN'].isin(all_child_dcns).all() if len(df_outcomes) > 0 else True,
-}
+def shard_plan(num_children, seed, num_shards):
+    """
+    [(shard, first_index, num_children, SeedSequence)] covering children 1..num_children.
 
-for file_name, is_valid in checks.items():
-    status = "✓ PASS" if is_valid else "✗ FAIL"
-    print(f"   {file_name}: {status}")
-
-print()
-print("=" * 70)
-print("✨ DATA GENERATION COMPLETE!")
-print(f"📁 Files saved to: {OUTPUT_DIR.absolute()}")
-print("=" * 70)
-print()
-print("Generated using:")
-print("  • Faker library for realistic synthetic data")
-print("  • Excel field specifications for accurate schemas")
-print("  • Risk-correlated distributions for modeling readiness")
-print("=" * 70)
+    Shards are contiguous, near-equal blocks of child numbers, and each gets
+    an independent stream spawned from the root SeedSequence(seed), so the
+    output depends only on (seed, num_children, num_shards), never on how
+    many workers ran or in which order they finished.
+    """
+    sizes = np.full(num_shards, num_children // num_shards)
+    sizes[:num_children % num_shards] += 1
+    first_indexes = 1 + np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    seeds = np.random.SeedSequence(seed).spawn(num_shards)
+    return [(shard, int(first), int(size), shard_seed)
+            for shard, (first, size, shard_seed) in enumerate(zip(first_indexes, sizes, seeds))]
+
+
+def _generate_shard(shard, first_index, num_children, seed_seq, names, output_dir,
+                    batch_size, file_format):
+    """Worker: generate one shard and write it to output_dir/part-NNNN; returns row counts"""
+    shard_dir = partition_dir(output_dir, shard)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    row_counts = stream_tables(np.random.default_rng(seed_seq), names, first_index, num_children,
+                               shard_dir, batch_size, file_format, verbose=False)
+    return row_counts
+
+
+def concat_part_files(output_dir, num_shards, file_name):
+    """Append part-NNNN/<file_name> files (in shard order, one header) into output_dir/<file_name>"""
+    output_dir = Path(output_dir)
+    part_paths = [partition_dir(output_dir, shard) / file_name for shard in range(num_shards)]
+    if file_name.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        # Row group by row group, so memory stays at one batch
+        with BatchWriter(output_dir / file_name, "parquet") as writer:
+            for part_path in part_paths:
+                part = pq.ParquetFile(part_path)
+                for row_group in range(part.num_row_groups):
+                    writer.write(part.read_row_group(row_group).to_pandas())
+                part_path.unlink()
+        return
+
+    with open(output_dir / file_name, "wb") as out:
+        for shard, part_path in enumerate(part_paths):
+            with open(part_path, "rb") as part:
+                header = part.readline()
+                if shard == 0:
+                    out.write(header)
+                shutil.copyfileobj(part, out, 16 * 1024 * 1024)
+            part_path.unlink()
+
+
+def generate_sharded_dataset(num_children=NUM_CHILDREN, seed=SEED, output_dir=OUTPUT_DIR,
+                             num_shards=None, workers=None, keep_parts=False,
+                             batch_size=BATCH_SIZE, file_format="csv", reference_xlsx=None,
+                             qa=True):
+    """
+    Generate the 9 flat files in independently seeded shards on a process pool.
+
+    Each worker writes its shard's files to output_dir/part-NNNN/. Unless
+    keep_parts is set, the parts are then concatenated into output_dir/<file>
+    in shard order and removed. Child numbering is the same as an unsharded
+    run, but the sampled values differ: reproducible per (seed, num_shards,
+    batch_size). Workers stream their shard in batches (see stream_tables).
+    The concatenated files are checked with ecids_qa unless qa=False.
+    Returns {table: row count}.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    num_shards = max(1, min(num_shards or workers, num_children))
+
+    print_header(num_children, seed, reference_xlsx)
+    names = build_name_pools(seed)
+    plan = shard_plan(num_children, seed, num_shards)
+
+    print(f"Generating {num_shards} shards on {min(workers, num_shards)} workers...")
+    with ProcessPoolExecutor(max_workers=min(workers, num_shards)) as pool:
+        futures = [pool.submit(_generate_shard, shard, first_index, size, seed_seq, names, output_dir,
+                               batch_size, file_format)
+                   for shard, first_index, size, seed_seq in plan]
+        shard_counts = [future.result() for future in futures]
+
+    row_counts = {table: sum(counts[table] for counts in shard_counts) for table in shard_counts[0]}
+    for table, count in row_counts.items():
+        print(f"   ✓ Generated {count:,} {table} rows")
+
+    if not keep_parts:
+        for table in row_counts:
+            concat_part_files(output_dir, num_shards, f"{table}.{file_format}")
+        for shard in range(num_shards):
+            partition_dir(output_dir, shard).rmdir()
+        if qa:
+            run_qa(output_dir)
+
+    location = "part-NNNN/ directories under " if keep_parts else ""
+    print_footer(f"{location}{output_dir.absolute()}")
+    return row_counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic ECIDS flat files")
+    parser.add_argument("--children", type=int, default=NUM_CHILDREN,
+                        help="Number of children to generate")
+    parser.add_argument("--seed", type=int, default=SEED,
+                        help="Random seed (same seed + size = same files)")
+    parser.add_argument("--out", default=str(OUTPUT_DIR),
+                        help="Output directory for the 9 CSV files")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Generate in this many independently seeded shards, in parallel "
+                             "(same seed + size + shards = same files)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for --shards (default: CPU count)")
+    parser.add_argument("--keep-parts", action="store_true",
+                        help="Leave shards as part-NNNN/ directories instead of concatenating")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="Children generated and written per batch (bounds peak memory)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Output file format")
+    parser.add_argument("--skip-qa", action="store_true",
+                        help="Don't run the ecids_qa checks on the written files")
+    parser.add_argument("--reference-xlsx", default=None,
+                        help="Flat File Templates workbook to take the reference lists from "
+                             "(converted once, cached next to it) instead of reference_lists.json")
+    args = parser.parse_args()
+
+    if args.shards > 1:
+        generate_sharded_dataset(args.children, args.seed, args.out, args.shards,
+                                 args.workers, args.keep_parts, args.batch_size, args.format,
+                                 args.reference_xlsx, not args.skip_qa)
+    else:
+        generate_dataset(args.children, args.seed, args.out, args.batch_size, args.format,
+                         args.reference_xlsx, not args.skip_qa)
@@ -11,55 +11,172 @@ Author: Claude Code
 Date: 2026-02-26
 """
 
+import argparse
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from ecids_io import (ECIDS_SCHEMAS, HAS_PYARROW, STRING, concat_ecids, dcn_partition,
+                      load_ecids_table, partition_dir, partition_ecids_tables,
+                      read_cached_frame, read_ecids_csv, read_frame, source_fingerprint,
+                      write_cached_frame, write_frame)
+
+from dashboard_export import write_dashboard_bundle, write_rollups
+from scoring_rules import load_scoring_rules, sweep
+from stage_metrics import StageMetrics, instrumented, write_metrics_jsonl, write_prometheus
+from timeline import episode_timelines
+
+RISK_TIERS = load_scoring_rules().labels
+
+# Bump whenever an indicator calculation changes, so cached indicator
+# matrices (.ecids_cache/indicators.parquet) are rebuilt
+INDICATOR_VERSION = 2
+
+
+def has_foster_care_start(foster_start):
+    """Foster care flag: True where FosterCareStartDate holds a date (not blank/NaN)"""
+    return pd.to_datetime(foster_start, errors="coerce").notna()
+
+
+def numeric_ratings(values):
+    """
+    Rating column -> float64, non-numeric values as NaN. Categoricals are
+    coerced once per category (and stay numeric when there are no rows).
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = pd.to_numeric(pd.Series(values.cat.categories, dtype=object), errors="coerce")
+        lookup = np.append(categories.to_numpy(dtype=float), np.nan)  # code -1 (missing) -> NaN
+        return pd.Series(lookup[values.cat.codes.to_numpy()], index=values.index)
+    return pd.to_numeric(values.astype(object), errors="coerce").astype(float)
+
+
+def program_membership(df_participation, dcns):
+    """
+    Each child's distinct programs, aligned to dcns, as (programs_mask,
+    programs_enrolled, programs):
+    - programs_mask: multi-hot int64 bitmask, bit i set for programs[i]
+    - programs_enrolled: the same programs as ", "-joined names (None for none)
+    - programs: the program names, sorted (bit order)
+    """
+    pairs = df_participation[["Child DCN", "RefProgramType.Description"]].dropna().drop_duplicates()
+    codes, programs = pd.factorize(pairs["RefProgramType.Description"], sort=True)
+    if len(programs) > 63:
+        raise ValueError(f"{len(programs)} program types don't fit an int64 bitmask")
+
+    # (DCN, program) pairs are distinct, so summing the bits is a bitwise OR
+    bits = pd.Series(np.left_shift(1, codes.astype(np.int64)), index=pairs["Child DCN"].to_numpy())
+    masks = bits.groupby(level=0).sum().reindex(dcns, fill_value=0).to_numpy()
+
+    # Join names once per distinct program combination, not once per child
+    combinations, inverse = np.unique(masks, return_inverse=True)
+    names = np.array([", ".join(program for bit, program in enumerate(programs) if mask >> bit & 1) or None
+                      for mask in combinations.tolist()], dtype=object)
+    return masks, names[inverse], list(programs)
+
+
+class LazyTable:
+    """Descriptor for a scorer table attribute: read on first access, then kept"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __get__(self, scorer, owner=None):
+        if scorer is None:
+            return self
+        if self.table not in scorer._tables:
+            scorer._tables[self.table] = scorer._read_table(self.table)
+        return scorer._tables[self.table]
+
+    def __set__(self, scorer, df):
+        scorer._tables[self.table] = df
+        scorer._replaced.add(self.table)  # No longer matches the file on disk
+
 
 class ReadinessRiskScorer:
     """Calculate composite readiness risk scores from ECIDS data"""
 
-    def __init__(self, data_dir="synthetic_data"):
-        """Load all ECIDS flat files"""
+    # Tables are loaded lazily, so a scoring run never reads RelatedPerson,
+    # ChildMonitoring or ChildInsurance (no risk domain uses them)
+    df_child = LazyTable("Child")
+    df_related = LazyTable("RelatedPerson")
+    df_participation = LazyTable("ChildParticipation")
+    df_disability = LazyTable("ChildDisability")
+    df_monitoring = LazyTable("ChildMonitoring")
+    df_insurance = LazyTable("ChildInsurance")
+    df_immunization = LazyTable("ChildImmunization")
+    df_screening = LazyTable("ChildScreening")
+    df_outcomes = LazyTable("ChildOutcomes")
+
+    # Tables read by the four risk domains (all keyed by Child DCN)
+    SCORING_TABLES = ["Child", "ChildParticipation", "ChildDisability",
+                      "ChildImmunization", "ChildScreening", "ChildOutcomes"]
+
+    def __init__(self, data_dir="synthetic_data", use_cache=True, rebuild_cache=False,
+                 rules=None):
+        """
+        Point the scorer at a directory of ECIDS flat files (loaded on first use)
+
+        use_cache: read/write the Parquet cache in data_dir/.ecids_cache
+        rebuild_cache: re-parse every CSV and overwrite the cache
+        rules: ScoringRules or a JSON/YAML rules path (default: scoring_rules.json)
+        """
         self.data_dir = Path(data_dir)
-        self.load_data()
-
+        self.use_cache = use_cache
+        self.rebuild_cache = rebuild_cache
+        self.rules = load_scoring_rules(rules)
+        self._tables = {}
+        self._replaced = set()
+        self.metrics = StageMetrics()
+
+    @property
+    def last_run_metrics(self):
+        """
+        Stage records of the last top-level call (load_data,
+        calculate_all_indicators, generate_full_dataset, ...): one dict per
+        stage with wall_seconds, cpu_seconds, rows, rss_mb and rss_delta_mb
+        (see stage_metrics)
+        """
+        return list(self.metrics.last_run)
+
+    def _read_table(self, table):
+        """Load one table (typed CSV read, or Parquet cache hit)"""
+        with self.metrics.stage(f"load_{table}") as record:
+            df = load_ecids_table(self.data_dir, table, use_cache=self.use_cache,
+                                  rebuild=self.rebuild_cache)
+            record["rows"] = len(df)
+        return df
+
+    def preload(self, tables=None):
+        """Load tables now instead of on first access (default: all 9)"""
+        tables = list(ECIDS_SCHEMAS) if tables is None else list(tables)
+        unknown = [table for table in tables if table not in ECIDS_SCHEMAS]
+        if unknown:
+            raise ValueError(f"Unknown ECIDS tables: {unknown}")
+
+        for table in tables:
+            if table not in self._tables:
+                self._tables[table] = self._read_table(table)
+        return self
+
+    @instrumented(rows=lambda scorer, _: sum(len(df) for df in scorer._tables.values()))
     def load_data(self):
-        """Load all 9 CSV files"""
+        """(Re)load all 9 CSV files with the dtypes pinned in ecids_io.ECIDS_SCHEMAS"""
         print("Loading ECIDS data files...")
-        self.df_child = pd.read_csv(self.data_dir / "Child.csv")
-        self.df_related = pd.read_csv(self.data_dir / "RelatedPerson.csv")
-        self.df_participation = pd.read_csv(self.data_dir / "ChildParticipation.csv")
-        self.df_disability = pd.read_csv(self.data_dir / "ChildDisability.csv")
-        self.df_monitoring = pd.read_csv(self.data_dir / "ChildMonitoring.csv")
-        self.df_insurance = pd.read_csv(self.data_dir / "ChildInsurance.csv")
-        self.df_immunization = pd.read_csv(self.data_dir / "ChildImmunization.csv")
-        self.df_screening = pd.read_csv(self.data_dir / "ChildScreening.csv")
-        self.df_outcomes = pd.read_csv(self.data_dir / "ChildOutcomes.csv")
+        self._tables = {}
+        self._replaced = set()  # Every table matches its file again
+        self.preload()
         print(f"✓ Loaded data for {len(self.df_child):,} children")
 
+    @instrumented()
     def calculate_all_indicators(self):
         """Calculate all risk indicators across domains"""
         print("Calculating risk indicators...")
-
-        # Start with base child data
-        risk_df = self.df_child[["Child DCN", "Child MOSIS ID"]].copy()
-
-        # Domain 1: Stability Indicators
-        stability = self.calculate_stability_indicators()
-        risk_df = risk_df.merge(stability, on="Child DCN", how="left")
-
-        # Domain 2: Engagement Indicators
-        engagement = self.calculate_engagement_indicators()
-        risk_df = risk_df.merge(engagement, on="Child DCN", how="left")
-
-        # Domain 3: Developmental Indicators
-        developmental = self.calculate_developmental_indicators()
-        risk_df = risk_df.merge(developmental, on="Child DCN", how="left")
-
-        # Domain 4: Family Context Indicators
-        context = self.calculate_context_indicators()
-        risk_df = risk_df.merge(context, on="Child DCN", how="left")
+        risk_df = self.calculate_indicators()
 
         # Calculate domain scores
         risk_df = self.calculate_domain_scores(risk_df)
@@ -70,8 +187,219 @@ class ReadinessRiskScorer:
         print(f"✓ Calculated risk indicators for {len(risk_df):,} children")
         return risk_df
 
+    @instrumented()
+    def calculate_indicators(self):
+        """Indicator columns for every child (no domain scores, tiers)"""
+        # Every domain frame is indexed by Child DCN in df_child order, so the
+        # domains line up side by side without any join
+        ids = self.df_child[["Child DCN", "Child MOSIS ID"]].set_index("Child DCN", drop=False)
+
+        domains = [
+            self.calculate_stability_indicators(),     # Domain 1
+            self.calculate_engagement_indicators(),    # Domain 2
+            self.calculate_developmental_indicators(), # Domain 3
+            self.calculate_context_indicators(),       # Domain 4
+        ]
+
+        with self.metrics.stage("assemble_indicators", rows=len(ids)):
+            risk_df = pd.concat([ids[["Child MOSIS ID"]], *domains], axis=1)
+            risk_df.insert(0, "Child DCN", ids["Child DCN"].array)
+            return risk_df.reset_index(drop=True)
+
+    def indicator_matrix(self, refresh=False):
+        """
+        Indicator frame (calculate_indicators), cached in data_dir/.ecids_cache.
+
+        The cache entry is keyed on INDICATOR_VERSION and the fingerprints of
+        the scoring CSVs, so it is rebuilt when either changes (or with
+        refresh=True). Scorers whose tables were replaced in memory (subset,
+        apply_deltas) always recompute, as do runs with use_cache=False.
+        """
+        cacheable = (self.use_cache and HAS_PYARROW
+                     and not self._replaced.intersection(self.SCORING_TABLES))
+        if not cacheable:
+            return self.calculate_indicators()
+
+        fingerprint = {
+            "indicator_version": INDICATOR_VERSION,
+            "tables": [source_fingerprint(self.data_dir / ECIDS_SCHEMAS[table]["file"], table)
+                       for table in self.SCORING_TABLES],
+        }
+        if not (refresh or self.rebuild_cache):
+            cached = read_cached_frame(self.data_dir, "indicators", fingerprint)
+            if cached is not None:
+                return cached
+
+        indicators = self.calculate_indicators()
+        write_cached_frame(self.data_dir, "indicators", indicators, fingerprint)
+        return indicators
+
+    def score_streaming(self, output_path, num_partitions=16, chunksize=250_000, work_dir=None):
+        """
+        Score children partition by partition for populations that don't fit in memory.
+
+        The scoring tables are split by DCN hash into num_partitions folders
+        (streamed in chunks of chunksize rows), then each partition is scored
+        on its own and appended to output_path. Peak memory is bounded by the
+        partition size, and every child's scores match calculate_all_indicators;
+        rows come out grouped by partition rather than in Child.csv order.
+        Partition files live in a temporary folder under work_dir (default:
+        data_dir) and are removed afterwards. Returns the number of rows written.
+        """
+        output_path = Path(output_path)
+        work_dir = Path(work_dir) if work_dir is not None else self.data_dir
+        num_rows = 0
+
+        print(f"Streaming risk scores in {num_partitions} partitions...")
+        with tempfile.TemporaryDirectory(prefix="ecids_partitions_", dir=work_dir) as tmp_dir:
+            partition_ecids_tables(self.data_dir, tmp_dir, self.SCORING_TABLES,
+                                   num_partitions, chunksize=chunksize)
+
+            for partition in range(num_partitions):
+                scorer = ReadinessRiskScorer(partition_dir(tmp_dir, partition), use_cache=False,
+                                             rules=self.rules)
+                if len(scorer.df_child) == 0:
+                    continue
+                risk_df = scorer.calculate_all_indicators()
+                risk_df.to_csv(output_path, mode="w" if num_rows == 0 else "a",
+                               header=num_rows == 0, index=False)
+                num_rows += len(risk_df)
+
+        print(f"✓ Streamed risk scores for {num_rows:,} children to {output_path}")
+        return num_rows
+
+    @instrumented()
+    def score_parallel(self, workers=None, num_shards=None, work_dir=None):
+        """
+        Score children in DCN-hash shards across a process pool.
+
+        The parent splits each scoring table into num_shards (default: 4 per
+        worker, for load balancing) and writes every shard once as Parquet, so
+        workers read only their own shard instead of receiving pickled copies
+        of whole tables. Results are put back in Child.csv order, matching
+        calculate_all_indicators exactly.
+        """
+        workers = workers or os.cpu_count() or 1
+        num_shards = num_shards or workers * 4
+        work_dir = Path(work_dir) if work_dir is not None else self.data_dir
+
+        child_shard = dcn_partition(self.df_child["Child DCN"], num_shards)
+        shard_positions = [np.flatnonzero(child_shard == shard) for shard in range(num_shards)]
+
+        print(f"Scoring {len(self.df_child):,} children in {num_shards} shards "
+              f"on {workers} workers...")
+        with tempfile.TemporaryDirectory(prefix="ecids_shards_", dir=work_dir) as tmp_dir:
+            shard_dirs = [partition_dir(tmp_dir, shard) for shard in range(num_shards)]
+            for shard_dir in shard_dirs:
+                shard_dir.mkdir()
+
+            for table in self.SCORING_TABLES:
+                df = getattr(self, TABLE_ATTRS[table])
+                table_shard = child_shard if table == "Child" else dcn_partition(df["Child DCN"], num_shards)
+                for shard, shard_dir in enumerate(shard_dirs):
+                    write_frame(df[table_shard == shard], shard_dir / f"{table}.frame")
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = []
+                for shard, (shard_df, records) in enumerate(
+                        pool.map(_score_shard, shard_dirs, repeat(self.rules))):
+                    results.append(shard_df)
+                    self.metrics.merge(records, shard=shard)
+
+        # Shard results keep Child.csv order within each shard; interleave them back
+        risk_df = pd.concat(results, ignore_index=True)
+        order = np.argsort(np.concatenate(shard_positions), kind="stable")
+        risk_df = risk_df.iloc[order].reset_index(drop=True)
+
+        print(f"✓ Calculated risk indicators for {len(risk_df):,} children")
+        return risk_df
+
+    def subset(self, dcns):
+        """New scorer over the scoring tables restricted to the given Child DCNs"""
+        scorer = ReadinessRiskScorer(self.data_dir, use_cache=self.use_cache, rules=self.rules)
+        for table in self.SCORING_TABLES:
+            df = getattr(self, TABLE_ATTRS[table])
+            setattr(scorer, TABLE_ATTRS[table], df[df["Child DCN"].isin(dcns)])
+        return scorer
+
+    def apply_deltas(self, delta_dir):
+        """
+        Merge delta flat files (same names/columns as the base files) into the loaded tables.
+
+        Event-table deltas are appended. Child.csv deltas replace existing
+        children in place and append new ones, matching the base files after
+        an upsert. Returns the DCNs whose risk inputs changed.
+        """
+        delta_dir = Path(delta_dir)
+        affected = []
+
+        for table, schema in ECIDS_SCHEMAS.items():
+            delta_path = delta_dir / schema["file"]
+            if not delta_path.exists():
+                continue
+            delta = read_ecids_csv(delta_path, table)
+            attr = TABLE_ATTRS[table]
+            current = getattr(self, attr)
+
+            if table == "Child":
+                # Upsert: updated children keep their row position, new ones go last
+                position = pd.Series(np.arange(len(current)), index=current["Child DCN"].to_numpy())
+                order = delta["Child DCN"].map(position).to_numpy(dtype=float, copy=True)
+                is_new = np.isnan(order)
+                order[is_new] = len(current) + np.arange(is_new.sum())
+                merged = concat_ecids([current.assign(_order=np.arange(len(current))),
+                                       delta.assign(_order=order)], table)
+                merged = merged.drop_duplicates("Child DCN", keep="last")
+                current = merged.sort_values("_order", kind="stable").drop(columns="_order")
+                setattr(self, attr, current.reset_index(drop=True))
+            else:
+                setattr(self, attr, concat_ecids([current, delta], table))
+
+            if table in self.SCORING_TABLES:
+                affected.append(delta["Child DCN"])
+
+        if not affected:
+            return pd.Index([], dtype=self.df_child["Child DCN"].dtype)
+        return pd.Index(pd.concat(affected, ignore_index=True).unique())
+
+    @instrumented()
+    def rescore_incremental(self, previous_scores, delta_dir):
+        """
+        Re-score only the children touched by a set of delta files.
+
+        previous_scores is the last calculate_all_indicators output: a DataFrame,
+        a risk_scores.csv path, or a .parquet state file (keeps dtypes exactly).
+        data_dir must hold the tables *before* the deltas. The deltas are merged
+        into the loaded tables, affected DCNs are re-scored, and their rows
+        replace (or extend) previous_scores, in Child.csv order.
+        """
+        previous = read_scores(previous_scores)
+        affected = self.apply_deltas(delta_dir)
+        print(f"Re-scoring {len(affected):,} children affected by deltas...")
+        if len(affected) == 0:
+            return previous
+
+        subset = self.subset(affected)
+        updated = subset.calculate_all_indicators()
+        self.metrics.merge(subset.last_run_metrics)
+        check_previous_scores(previous, updated, self.df_child["Child DCN"])
+        previous = previous[~previous["Child DCN"].isin(affected)]
+        # Match dtypes (e.g. after a CSV round trip), but never cast missing values
+        # into a bool/int column
+        previous = previous.astype({
+            col: dtype for col, dtype in updated.dtypes.items()
+            if dtype.kind in "fO" or previous[col].notna().all()
+        })
+        risk_df = pd.concat([previous, updated], ignore_index=True)
+
+        # Restore Child.csv order (same order as a full calculate_all_indicators run)
+        position = pd.Series(np.arange(len(self.df_child)), index=self.df_child["Child DCN"].to_numpy())
+        risk_df = risk_df.iloc[np.argsort(risk_df["Child DCN"].map(position).to_numpy(), kind="stable")]
+        return risk_df.reset_index(drop=True)
+
+    @instrumented()
     def calculate_stability_indicators(self):
-        """Domain 1: Participation stability"""
+        """Domain 1: Participation stability (indexed by Child DCN, in df_child order)"""
         # Participation counts and gaps
         part_stats = self.df_participation.groupby("Child DCN").agg({
             "EnrollmentDate": "count",
@@ -79,256 +407,198 @@ class ReadinessRiskScorer:
         }).rename(columns={
             "EnrollmentDate": "num_participation_episodes",
             "NumberOfDaysInAttendance": "total_attendance_days"
-        }).reset_index()
-
-        # Calculate gaps between participation episodes
-        self.df_participation["EnrollmentDate"] = pd.to_datetime(self.df_participation["EnrollmentDate"])
-        self.df_participation["ServicePlanEndDate"] = pd.to_datetime(self.df_participation["ServicePlanEndDate"])
-
-        gap_stats = []
-        for dcn in self.df_participation["Child DCN"].unique():
-            child_parts = self.df_participation[
-                self.df_participation["Child DCN"] == dcn
-            ].sort_values("EnrollmentDate")
-
-            num_gaps = 0
-            max_gap = 0
-            has_long_gap = False
-
-            if len(child_parts) >= 2:
-                for i in range(len(child_parts) - 1):
-                    end_date = child_parts.iloc[i]["ServicePlanEndDate"]
-                    start_date = child_parts.iloc[i + 1]["EnrollmentDate"]
-                    gap_days = (start_date - end_date).days
-
-                    if gap_days > 30:
-                        num_gaps += 1
-                        max_gap = max(max_gap, gap_days)
-                        if gap_days > 180:  # 6 months
-                            has_long_gap = True
-
-            gap_stats.append({
-                "Child DCN": dcn,
-                "num_enrollment_gaps": num_gaps,
-                "max_gap_days": max_gap,
-                "has_gap_over_6mo": has_long_gap
-            })
-
-        df_gaps = pd.DataFrame(gap_stats)
-
-        # Merge stability indicators
-        stability = part_stats.merge(df_gaps, on="Child DCN", how="left")
-        stability["num_enrollment_gaps"] = stability["num_enrollment_gaps"].fillna(0)
-        stability["max_gap_days"] = stability["max_gap_days"].fillna(0)
-        stability["has_gap_over_6mo"] = stability["has_gap_over_6mo"].fillna(False)
-
-        return stability
-
+        })
+
+        # Episode timelines (dates are parsed at load time): episodes sorted by
+        # child and enrollment date, in one linear pass (see timeline.py)
+        # - gaps: start more than 30 days after the previous episode's end
+        # - overlaps: start on or before the latest earlier end (concurrent enrollment)
+        timelines = episode_timelines(self.df_participation["Child DCN"],
+                                      self.df_participation["EnrollmentDate"],
+                                      self.df_participation["ServicePlanEndDate"])
+        df_gaps = pd.DataFrame({
+            "num_enrollment_gaps": timelines["num_gaps"].astype(int),
+            "max_gap_days": timelines["max_gap"].astype(int),
+            "has_gap_over_6mo": timelines["max_gap"] > 180,  # 6 months
+            "num_overlapping_episodes": timelines["num_overlaps"].astype(int),
+            "has_concurrent_enrollment": timelines["num_overlaps"] > 0,
+            "covered_days": timelines["covered_days"].astype(int)
+        })
+
+        # Both frames cover the same DCNs (sorted, as groupby gives), so they sit side by side;
+        # children without participation get NaN
+        stability = pd.concat([part_stats, df_gaps], axis=1)
+        return stability.reindex(self.df_child["Child DCN"])
+
+    @instrumented()
     def calculate_engagement_indicators(self):
-        """Domain 2: Program engagement (attendance, screenings, immunizations)"""
-        engagement_data = []
-
-        for dcn in self.df_child["Child DCN"]:
-            # Attendance (average days per participation episode)
-            child_parts = self.df_participation[self.df_participation["Child DCN"] == dcn]
-            if len(child_parts) > 0:
-                avg_attendance = child_parts["NumberOfDaysInAttendance"].mean()
-            else:
-                avg_attendance = 0
-
-            # Screening completion (out of 6 possible: 6mo, 12mo, 18mo, 24mo, 36mo, 48mo)
-            screenings = self.df_screening[self.df_screening["Child DCN"] == dcn]
-            num_screenings = len(screenings)
-            screening_completion_rate = num_screenings / 6.0  # Max 6 screenings
-
-            # Immunization compliance (out of ~12 expected)
-            immunizations = self.df_immunization[self.df_immunization["Child DCN"] == dcn]
-            num_immunizations = len(immunizations)
-            immunization_compliance_rate = min(num_immunizations / 12.0, 1.0)
-
-            engagement_data.append({
-                "Child DCN": dcn,
-                "avg_attendance_days": avg_attendance,
-                "num_screenings_completed": num_screenings,
-                "screening_completion_rate": screening_completion_rate,
-                "num_immunizations": num_immunizations,
-                "immunization_compliance_rate": immunization_compliance_rate,
-                "missed_screening": num_screenings < 4  # Flag if < 4 screenings
-            })
-
-        return pd.DataFrame(engagement_data)
-
+        """Domain 2: Program engagement (indexed by Child DCN, in df_child order)"""
+        dcns = self.df_child["Child DCN"]
+
+        # One groupby per table, aligned to df_child; children without rows get 0
+        # (reindex fill_value only applies to missing DCNs, not to NaN means)
+        # Attendance (average days per participation episode)
+        avg_attendance = self.df_participation.groupby("Child DCN")[
+            "NumberOfDaysInAttendance"
+        ].mean().reindex(dcns, fill_value=0)
+
+        # Screening completion (out of 6 possible: 6mo, 12mo, 18mo, 24mo, 36mo, 48mo)
+        num_screenings = self.df_screening.groupby("Child DCN").size().reindex(dcns, fill_value=0)
+
+        # Immunization compliance (out of ~12 expected)
+        num_immunizations = self.df_immunization.groupby("Child DCN").size().reindex(dcns, fill_value=0)
+
+        return pd.DataFrame({
+            "avg_attendance_days": avg_attendance.to_numpy(dtype=float),
+            "num_screenings_completed": num_screenings.to_numpy(),
+            "screening_completion_rate": num_screenings.to_numpy() / 6.0,  # Max 6 screenings
+            "num_immunizations": num_immunizations.to_numpy(),
+            "immunization_compliance_rate": np.minimum(num_immunizations.to_numpy() / 12.0, 1.0),
+            "missed_screening": num_screenings.to_numpy() < 4  # Flag if < 4 screenings
+        }, index=pd.Index(dcns))
+
+    @instrumented()
     def calculate_developmental_indicators(self):
-        """Domain 3: Developmental outcomes and disability"""
-        dev_data = []
-
-        for dcn in self.df_child["Child DCN"]:
-            # Disability status
-            has_disability = dcn in self.df_disability["Child DCN"].values
-
-            # COS outcomes (average rating)
-            outcomes = self.df_outcomes[self.df_outcomes["Child DCN"] == dcn]
-            if len(outcomes) > 0:
-                # Average COS ratings (convert to numeric)
-                cos_cols = ["COSRatingA.Description", "COSRatingB.Description",
-                           "COSRatingC.Description", "COSRatingPhysical.Description"]
-                cos_ratings = []
-                for col in cos_cols:
-                    cos_ratings.extend(pd.to_numeric(outcomes[col], errors='coerce').dropna().tolist())
-
-                avg_cos_rating = np.mean(cos_ratings) if cos_ratings else 4.0
-                has_outcomes = True
-            else:
-                avg_cos_rating = None
-                has_outcomes = False
-
-            dev_data.append({
-                "Child DCN": dcn,
-                "has_disability": has_disability,
-                "has_outcomes_data": has_outcomes,
-                "avg_cos_rating": avg_cos_rating,
-                "low_outcomes": avg_cos_rating < 4.0 if avg_cos_rating is not None else False
-            })
-
-        return pd.DataFrame(dev_data)
-
+        """Domain 3: Developmental outcomes and disability (indexed by Child DCN, in df_child order)"""
+        dcns = self.df_child["Child DCN"]
+
+        # Disability status (hash join instead of a scan per child)
+        has_disability = dcns.isin(self.df_disability["Child DCN"])
+
+        # COS outcomes (average rating): coerce the four rating columns once, then
+        # pool every numeric rating per child as sum / count
+        cos_cols = ["COSRatingA.Description", "COSRatingB.Description",
+                    "COSRatingC.Description", "COSRatingPhysical.Description"]
+        ratings = pd.DataFrame({col: numeric_ratings(self.df_outcomes[col]) for col in cos_cols})
+        cos_totals = pd.DataFrame({
+            "Child DCN": self.df_outcomes["Child DCN"],
+            "rating_sum": ratings.sum(axis=1),
+            "rating_count": ratings.count(axis=1)
+        }).groupby("Child DCN").sum()
+
+        has_outcomes = dcns.isin(cos_totals.index)
+        cos_totals = cos_totals.reindex(dcns)
+        avg_cos_rating = (
+            cos_totals["rating_sum"] / cos_totals["rating_count"]
+        ).to_numpy(dtype=float, copy=True)
+
+        # Children with outcome rows but no numeric ratings default to 4.0
+        avg_cos_rating[has_outcomes.to_numpy() & (cos_totals["rating_count"] == 0).to_numpy()] = 4.0
+
+        return pd.DataFrame({
+            "has_disability": has_disability.to_numpy(),
+            "has_outcomes_data": has_outcomes.to_numpy(),
+            "avg_cos_rating": avg_cos_rating,
+            "low_outcomes": avg_cos_rating < 4.0  # NaN (no outcomes) compares False
+        }, index=pd.Index(dcns))
+
+    @instrumented()
     def calculate_context_indicators(self):
-        """Domain 4: Family and contextual risk factors"""
-        context_data = []
-
-        for _, child in self.df_child.iterrows():
-            dcn = child["Child DCN"]
-
-            # Convert Yes/No to boolean
-            homelessness = child["HomelessnessStatus"] == "Yes"
-            migrant = child["MigrantStatus"] == "Yes"
-            abuse = child["ChildAbuseNeglect"] == "Yes"
-            incarcerated = child["FamilyMemberIncarcerated"] == "Yes"
-            substance = child["FamilyMemberSubstanceUseAbuse"] == "Yes"
-            depression = child["HouseholdMemberDepressedOrMentallyIll"] == "Yes"
-            loss_parent = child["LossOfParent"] == "Yes"
-
-            # Foster care flag
-            in_foster_care = child["FosterCareStartDate"] != ""
-
-            # Deep poverty flag
-            deep_poverty = child["PercentOfFederalPovertyLevel"] < 100
-
-            # Count household stressors
-            num_stressors = sum([incarcerated, substance, depression, loss_parent])
-
-            context_data.append({
-                "Child DCN": dcn,
-                "homelessness_flag": homelessness,
-                "migrant_flag": migrant,
-                "abuse_flag": abuse,
-                "incarcerated_flag": incarcerated,
-                "substance_flag": substance,
-                "depression_flag": depression,
-                "loss_parent_flag": loss_parent,
-                "in_foster_care": in_foster_care,
-                "deep_poverty": deep_poverty,
-                "num_household_stressors": num_stressors
-            })
-
-        return pd.DataFrame(context_data)
-
+        """Domain 4: Family and contextual risk factors (indexed by Child DCN, in df_child order)"""
+        child = self.df_child.set_index("Child DCN")
+
+        # Convert Yes/No to boolean
+        context = pd.DataFrame({
+            "homelessness_flag": child["HomelessnessStatus"] == "Yes",
+            "migrant_flag": child["MigrantStatus"] == "Yes",
+            "abuse_flag": child["ChildAbuseNeglect"] == "Yes",
+            "incarcerated_flag": child["FamilyMemberIncarcerated"] == "Yes",
+            "substance_flag": child["FamilyMemberSubstanceUseAbuse"] == "Yes",
+            "depression_flag": child["HouseholdMemberDepressedOrMentallyIll"] == "Yes",
+            "loss_parent_flag": child["LossOfParent"] == "Yes",
+            # Foster care flag (blank start dates are read as NaN, not "")
+            "in_foster_care": has_foster_care_start(child["FosterCareStartDate"]),
+            # Deep poverty flag (a blank poverty level counts as not deep poverty)
+            "deep_poverty": child["PercentOfFederalPovertyLevel"].lt(100).fillna(False).astype(bool)
+        })
+
+        # Count household stressors
+        context["num_household_stressors"] = context[[
+            "incarcerated_flag", "substance_flag", "depression_flag", "loss_parent_flag"
+        ]].sum(axis=1).astype("int8")
+
+        return context
+
+    @instrumented()
     def calculate_domain_scores(self, risk_df):
-        """Calculate 0-100 score for each domain (higher = more risk)"""
-
-        # Domain 1: Stability Score (0-100)
-        # More gaps, longer gaps, more episodes = higher instability
-        risk_df["stability_score"] = (
-            (risk_df["num_enrollment_gaps"].fillna(0) * 15) +  # Each gap adds 15 points
-            (risk_df["has_gap_over_6mo"].astype(int) * 25) +    # Long gap adds 25 points
-            (risk_df["num_participation_episodes"].fillna(1) > 3).astype(int) * 15 +  # Multiple episodes
-            (risk_df["total_attendance_days"].fillna(0) < 100).astype(int) * 20  # Low attendance
-        ).clip(0, 100)
-
-        # Domain 2: Engagement Score (0-100)
-        # Missing screenings, low immunizations, low attendance = higher risk
-        risk_df["engagement_score"] = (
-            (1 - risk_df["screening_completion_rate"].fillna(0)) * 35 +  # Missing screenings
-            (1 - risk_df["immunization_compliance_rate"].fillna(0)) * 25 +  # Missing immunizations
-            (risk_df["avg_attendance_days"].fillna(0) < 80).astype(int) * 40  # Low attendance
-        ).clip(0, 100)
-
-        # Domain 3: Developmental Score (0-100)
-        # Disability, low COS ratings = higher risk
-        risk_df["developmental_score"] = (
-            risk_df["has_disability"].astype(int) * 40 +  # Disability
-            risk_df["low_outcomes"].astype(int) * 35 +     # Low COS ratings
-            (~risk_df["has_outcomes_data"]).astype(int) * 25  # No outcome data
-        ).clip(0, 100)
-
-        # Domain 4: Context Score (0-100)
-        # Poverty, household stressors, homelessness, foster care = higher risk
-        risk_df["context_score"] = (
-            risk_df["deep_poverty"].astype(int) * 25 +
-            risk_df["homelessness_flag"].astype(int) * 25 +
-            risk_df["in_foster_care"].astype(int) * 20 +
-            risk_df["abuse_flag"].astype(int) * 15 +
-            (risk_df["num_household_stressors"] * 5)  # Each stressor adds 5 points
-        ).clip(0, 100)
+        """Calculate 0-100 score for each domain (higher = more risk), per self.rules"""
+        for domain, scores in self.rules.domain_scores(risk_df).items():
+            risk_df[domain] = scores
 
         return risk_df
 
+    @instrumented()
     def calculate_composite_score(self, risk_df):
-        """Calculate composite readiness risk score (weighted average of domains)"""
-
-        # Weights for each domain (must sum to 1.0)
-        weights = {
-            "stability_score": 0.30,      # 30% - Participation continuity
-            "engagement_score": 0.25,      # 25% - Program engagement
-            "developmental_score": 0.25,   # 25% - Developmental outcomes
-            "context_score": 0.20          # 20% - Family context
-        }
+        """Calculate composite readiness risk score (weighted average of domains) and tier"""
+        composite = self.rules.composite(risk_df[self.rules.domains].to_numpy(dtype=float))
+        risk_df["composite_risk_score"] = composite
+        risk_df["risk_tier"] = self.rules.tiers(self.rules.tier_codes(composite))
+
+        return risk_df
 
-        # Calculate weighted composite score
-        risk_df["composite_risk_score"] = (
-            risk_df["stability_score"] * weights["stability_score"] +
-            risk_df["engagement_score"] * weights["engagement_score"] +
-            risk_df["developmental_score"] * weights["developmental_score"] +
-            risk_df["context_score"] * weights["context_score"]
-        )
-
-        # Assign risk tier based on composite score
-        # Thresholds adjusted to match actual score distribution
-        # Low: 0-24 (~50%), Moderate: 24-35 (~30%), High: 35+ (~20%)
-        risk_df["risk_tier"] = pd.cut(
-            risk_df["composite_risk_score"],
-            bins=[0, 24, 35, 100],
-            labels=["Low", "Moderate", "High"],
-            include_lowest=True
-        )
+    def rescore(self, risk_df, rules=None):
+        """
+        Re-apply scoring rules to already-calculated indicators (no indicator recomputation).
 
+        rules: ScoringRules or a JSON/YAML path (default: self.rules)
+        """
+        rules = load_scoring_rules(rules) if rules is not None else self.rules
+        risk_df = risk_df.copy()
+        for col, values in rules.score(risk_df).items():
+            risk_df[col] = values
         return risk_df
 
-    def generate_full_dataset(self):
-        """Generate complete dataset with risk scores and all indicators"""
+    def sweep(self, configs, baseline=None, chunk_size=100_000):
+        """
+        Score many what-if configs against the cached indicator matrix at once.
+
+        configs: {name: ScoringRules | rules path | dict of overrides merged onto
+        the baseline, e.g. {"tiers": {"bins": [0, 35, 60, 100]}}}
+        baseline: default self.rules
+
+        Returns scoring_rules.sweep's dict (summary, composite, delta, tier),
+        with per-child frames indexed by Child DCN.
+        """
+        indicators = self.indicator_matrix().set_index("Child DCN")
+        baseline = self.rules if baseline is None else load_scoring_rules(baseline)
+        return sweep(indicators, configs, baseline=baseline, chunk_size=chunk_size)
+
+    @instrumented()
+    def generate_full_dataset(self, export_dir=None, risk_df=None):
+        """
+        Generate complete dataset with risk scores and all indicators.
+
+        With export_dir, the export stage also writes the dashboard bundle
+        (children_with_risk.json.gz + children_with_risk.csv) and the rollup
+        cubes (rollups/<dimension>.json), see dashboard_export. risk_df
+        reuses an existing calculate_all_indicators result instead of
+        scoring again.
+        """
         # Calculate all risk indicators
-        risk_df = self.calculate_all_indicators()
+        if risk_df is None:
+            risk_df = self.calculate_all_indicators()
+        elif not np.array_equal(risk_df["Child DCN"].to_numpy(), self.df_child["Child DCN"].to_numpy()):
+            # e.g. incremental results: put them in df_child order
+            risk_df = risk_df.set_index("Child DCN").reindex(self.df_child["Child DCN"]).reset_index()
 
         # Start with ALL child data
         full_df = self.df_child.copy()
 
-        # Merge risk scores and indicators
-        # Only keep new columns from risk_df (avoid duplicates)
-        risk_cols_to_merge = [col for col in risk_df.columns if col not in full_df.columns or col == "Child DCN"]
-        risk_df_filtered = risk_df[risk_cols_to_merge]
-
-        full_df = full_df.merge(risk_df_filtered, on="Child DCN", how="left")
-
-        # Add participation data (aggregated)
-        part_agg = self.df_participation.groupby("Child DCN").agg({
-            "RefProgramType.Description": lambda x: ", ".join(x.unique()),
-            "EnrollmentDate": "count"
-        }).rename(columns={
-            "RefProgramType.Description": "programs_enrolled",
-            "EnrollmentDate": "total_enrollments"
-        }).reset_index()
-
-        full_df = full_df.merge(part_agg, on="Child DCN", how="left")
+        # Add risk scores and indicators: risk_df rows are in df_child order, so
+        # columns are assigned positionally. Only keep new columns (avoid duplicates)
+        risk_cols = [col for col in risk_df.columns if col not in full_df.columns]
+        with self.metrics.stage("merge_indicators", rows=len(full_df)):
+            for col in risk_cols:
+                full_df[col] = risk_df[col].array
+
+        # Programs per child: multi-hot bitmask (filter with integer ops) and names
+        with self.metrics.stage("program_membership", rows=len(full_df)):
+            masks, programs_enrolled, _ = program_membership(self.df_participation, full_df["Child DCN"])
+        full_df["programs_enrolled"] = pd.array(programs_enrolled, dtype=STRING)
+        # Same count as num_participation_episodes (kept for dashboard compatibility),
+        # 0 for children without participation
+        full_df["total_enrollments"] = full_df["num_participation_episodes"].fillna(0).astype(int).array
+        full_df["programs_mask"] = masks
 
         # Convert Yes/No columns to boolean for easier filtering
         yes_no_cols = [
@@ -342,15 +612,131 @@ class ReadinessRiskScorer:
 
         # Foster care flag (add if not already present from risk_df)
         if "in_foster_care" not in full_df.columns:
-            full_df["in_foster_care"] = full_df["FosterCareStartDate"] != ""
+            full_df["in_foster_care"] = has_foster_care_start(full_df["FosterCareStartDate"])
+
+        if export_dir is not None:
+            with self.metrics.stage("export_bundle", rows=len(full_df)):
+                bundle_path, csv_path = write_dashboard_bundle(full_df, export_dir)
+            print(f"✓ Dashboard bundle saved to: {bundle_path} ({bundle_path.stat().st_size / 1e6:.2f} MB)")
+            print(f"✓ Full dataset saved to: {csv_path}")
+            with self.metrics.stage("export_rollups", rows=len(full_df)):
+                rollup_dir = write_rollups(full_df, export_dir)
+            print(f"✓ Dashboard rollups saved to: {rollup_dir}")
 
         return full_df
 
 
+def read_scores(scores):
+    """Load saved risk scores (DataFrame passthrough, .parquet state file, or CSV)"""
+    if isinstance(scores, pd.DataFrame):
+        return scores
+    scores = Path(scores)
+    if scores.suffix == ".parquet":
+        return pd.read_parquet(scores)
+
+    scores = pd.read_csv(scores, dtype={"Child DCN": STRING, "Child MOSIS ID": STRING})
+    scores["risk_tier"] = pd.Categorical(scores["risk_tier"], categories=RISK_TIERS, ordered=True)
+    return scores
+
+
+def check_previous_scores(previous, updated, child_dcns):
+    """
+    Raise ValueError if previous scores can't be merged with updated ones:
+    different columns (an older scorer version), or children missing from
+    Child.csv (e.g. DCNs saved without their leading zeros)
+    """
+    rerun = "rerun a full score (without --deltas) to rebuild them"
+    if list(previous.columns) != list(updated.columns):
+        missing = [col for col in updated.columns if col not in previous.columns]
+        extra = [col for col in previous.columns if col not in updated.columns]
+        raise ValueError(f"Previous scores don't match this scorer's columns "
+                         f"(missing {missing}, unexpected {extra}); {rerun}")
+    unknown = ~previous["Child DCN"].isin(child_dcns)
+    if unknown.any():
+        raise ValueError(f"Previous scores hold {unknown.sum():,} children not in Child.csv "
+                         f"(e.g. {previous['Child DCN'][unknown].iloc[0]!r}); {rerun}")
+
+
+# ECIDS table name -> ReadinessRiskScorer attribute
+TABLE_ATTRS = {
+    descriptor.table: name
+    for name, descriptor in vars(ReadinessRiskScorer).items()
+    if isinstance(descriptor, LazyTable)
+}
+
+
+def _score_shard(shard_dir, rules):
+    """Process-pool worker: score one shard written by score_parallel -> (risk_df, stage records)"""
+    shard_dir = Path(shard_dir)
+    scorer = ReadinessRiskScorer(shard_dir, use_cache=False, rules=rules)
+    for table in ReadinessRiskScorer.SCORING_TABLES:
+        setattr(scorer, TABLE_ATTRS[table], read_frame(shard_dir / f"{table}.frame"))
+    return scorer.calculate_all_indicators(), scorer.last_run_metrics
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calculate ECIDS readiness risk scores")
+    parser.add_argument("--data-dir", default="synthetic_data",
+                        help="Directory containing the ECIDS flat files")
+    parser.add_argument("--rebuild-cache", action="store_true",
+                        help="Re-parse all CSVs and rewrite the Parquet cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Read the CSVs directly, bypassing the Parquet cache")
+    parser.add_argument("--partitions", type=int, default=0,
+                        help="Stream-score in N DCN-hash partitions (bounded memory)")
+    parser.add_argument("--chunksize", type=int, default=250_000,
+                        help="Rows per CSV chunk when partitioning (with --partitions)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Score DCN shards in a pool of N processes")
+    parser.add_argument("--rules", help="Scoring rules JSON/YAML (default: scoring_rules.json)")
+    parser.add_argument("--previous-scores",
+                        help="Prior risk_scores.csv/.parquet to update incrementally (needs --deltas)")
+    parser.add_argument("--deltas",
+                        help="Directory of delta flat files; only affected children are re-scored")
+    parser.add_argument("--export-dir",
+                        help="Also write the dashboard bundle (children_with_risk.json.gz/.csv) here, "
+                             "e.g. dashboard-react/public/data")
+    parser.add_argument("--metrics-jsonl",
+                        help="Append per-stage timing/memory records (JSON lines) to this file")
+    parser.add_argument("--metrics-prom",
+                        help="Write per-stage timing/memory as Prometheus text to this file "
+                             "(e.g. for node_exporter's textfile collector)")
+    parser.add_argument("--sweep",
+                        help="JSON file of {scenario name: rules path or overrides}; "
+                             "prints tier distributions per scenario")
+    args = parser.parse_args()
+
+    if args.sweep:
+        scorer = ReadinessRiskScorer(args.data_dir, use_cache=not args.no_cache,
+                                     rebuild_cache=args.rebuild_cache, rules=args.rules)
+        result = scorer.sweep(json.loads(Path(args.sweep).read_text()))
+
+        print("\n" + "=" * 70)
+        print("SCENARIO SWEEP")
+        print("=" * 70)
+        print(result["summary"].to_string(float_format="{:.2f}".format))
+
+        output_path = Path(args.data_dir) / "risk_sweep.csv"
+        result["summary"].to_csv(output_path, index_label="scenario")
+        print(f"\n✓ Scenario summary saved to: {output_path}")
+        raise SystemExit(0)
+
+    if args.partitions:
+        scorer = ReadinessRiskScorer(args.data_dir, use_cache=False, rules=args.rules)
+        scorer.score_streaming(Path(args.data_dir) / "risk_scores.csv",
+                               num_partitions=args.partitions, chunksize=args.chunksize)
+        raise SystemExit(0)
+
     # Test the risk scorer
-    scorer = ReadinessRiskScorer()
-    risk_data = scorer.calculate_all_indicators()
+    scorer = ReadinessRiskScorer(args.data_dir, use_cache=not args.no_cache,
+                                 rebuild_cache=args.rebuild_cache, rules=args.rules)
+    if args.deltas:
+        previous = args.previous_scores or Path(args.data_dir) / "risk_scores.csv"
+        risk_data = scorer.rescore_incremental(previous, args.deltas)
+    elif args.workers > 1:
+        risk_data = scorer.score_parallel(workers=args.workers)
+    else:
+        risk_data = scorer.calculate_all_indicators()
 
     print("\n" + "=" * 70)
     print("RISK SCORE SUMMARY")
@@ -368,6 +754,18 @@ if __name__ == "__main__":
     print(f"  Context:        {risk_data['context_score'].mean():.1f}")
 
     # Save to CSV
-    output_path = Path("synthetic_data") / "risk_scores.csv"
+    output_path = Path(args.data_dir) / "risk_scores.csv"
     risk_data.to_csv(output_path, index=False)
     print(f"\n✓ Risk scores saved to: {output_path}")
+
+    run_metrics = scorer.last_run_metrics
+    if args.export_dir:
+        scorer.generate_full_dataset(export_dir=args.export_dir, risk_df=risk_data)
+        run_metrics += scorer.last_run_metrics
+
+    if args.metrics_jsonl:
+        write_metrics_jsonl(run_metrics, args.metrics_jsonl, data_dir=str(args.data_dir))
+        print(f"✓ Stage metrics appended to: {args.metrics_jsonl}")
+    if args.metrics_prom:
+        write_prometheus(run_metrics, args.metrics_prom, data_dir=str(args.data_dir))
+        print(f"✓ Stage metrics saved to: {args.metrics_prom}")
@@ -0,0 +1,340 @@
+"""
+ECIDS Readiness Risk Index - Scoring Rules
+
+Loads the declarative scoring config (scoring_rules.json by default, or any
+JSON/YAML file with the same layout) and compiles it into array operations:
+
+    indicators --features--> X (children x terms)
+    X --points, clip--> domain scores --weights--> composite --bins--> tier
+
+Each term turns one indicator into a number:
+- fill:      value used where the indicator is missing
+- op/value:  optional comparison (">", ">=", "<", "<=", "==", "!="), giving 0/1
+- transform: optional "complement" (1 - x), e.g. for completion rates
+and contributes x * points to its domain. Domain weights must sum to 1, so the
+composite stays on the domains' 0-100 scale. Because the indicators are kept
+separate from the rules, re-scoring under a new config only re-runs the
+compiled evaluation, not the indicator calculations.
+
+sweep() goes one step further for what-if analysis: many configs (scenarios)
+are stacked into a points/weights tensor and evaluated against one indicator
+matrix in a single batched pass.
+"""
+
+import copy
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "scoring_rules.json"
+# Domain weights must sum to 1 within float rounding
+WEIGHT_SUM_TOLERANCE = 1e-9
+
+OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+TRANSFORMS = {
+    "complement": lambda x: 1 - x,
+}
+
+
+class ScoringRules:
+    """Scoring config compiled to per-term arrays"""
+
+    def __init__(self, config):
+        self.config = config
+        self._validate(config)
+
+        self.domains = list(config["domains"])
+        self.terms = []
+        term_domain = []
+        for domain_index, domain in enumerate(self.domains):
+            for term in config["domains"][domain]["terms"]:
+                self.terms.append(term)
+                term_domain.append(domain_index)
+
+        self.term_domain = np.array(term_domain, dtype=int)
+        self.points = np.array([term["points"] for term in self.terms], dtype=float)
+        self.clip = np.array([config["domains"][d].get("clip", [0, 100]) for d in self.domains],
+                             dtype=float)
+        self.weights = np.array([config["weights"][d] for d in self.domains], dtype=float)
+        self.bins = np.array(config["tiers"]["bins"], dtype=float)
+        self.labels = list(config["tiers"]["labels"])
+
+    @staticmethod
+    def _validate(config):
+        """Raise ValueError for configs that can't be compiled"""
+        for key in ("domains", "weights", "tiers"):
+            if key not in config:
+                raise ValueError(f"Scoring rules are missing '{key}'")
+
+        domains = config["domains"]
+        if set(config["weights"]) != set(domains):
+            raise ValueError(f"Weights {sorted(config['weights'])} don't match domains {sorted(domains)}")
+        weight_sum = sum(config["weights"].values())
+        if abs(weight_sum - 1) > WEIGHT_SUM_TOLERANCE:
+            # Composite scores would leave the domains' 0-100 scale and shift every tier
+            raise ValueError(f"Weights must sum to 1, not {weight_sum:g}: {config['weights']}")
+
+        for domain, spec in domains.items():
+            if not spec.get("terms"):
+                raise ValueError(f"Domain '{domain}' has no terms")
+            for term in spec["terms"]:
+                if "indicator" not in term or "points" not in term:
+                    raise ValueError(f"Term in '{domain}' needs 'indicator' and 'points': {term}")
+                if "op" in term and (term["op"] not in OPS or "value" not in term):
+                    raise ValueError(f"Term in '{domain}' has a bad comparison: {term}")
+                if term.get("transform", None) not in (None, *TRANSFORMS):
+                    raise ValueError(f"Term in '{domain}' has an unknown transform: {term}")
+
+        bins = config["tiers"]["bins"]
+        if len(config["tiers"]["labels"]) != len(bins) - 1:
+            raise ValueError("Tiers need exactly one label per bin interval")
+        if any(lo >= hi for lo, hi in zip(bins, bins[1:])):
+            raise ValueError(f"Tier bins must increase: {bins}")
+
+    @classmethod
+    def from_file(cls, path=None):
+        """Load rules from JSON (or YAML, if PyYAML is installed)"""
+        path = Path(path) if path is not None else DEFAULT_RULES_PATH
+        text = path.read_text()
+        if path.suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required for YAML scoring rules") from None
+            return cls(yaml.safe_load(text))
+        return cls(json.loads(text))
+
+    def with_overrides(self, overrides):
+        """
+        New rules with overrides deep-merged onto this config: nested dicts merge
+        key by key, anything else (numbers, lists such as tier bins) is replaced.
+        E.g. {"weights": {"context_score": 0.3, ...}} or {"tiers": {"bins": [0, 35, 60, 100]}}
+        """
+        return ScoringRules(_merge_config(self.config, overrides))
+
+    @property
+    def indicators(self):
+        """Indicator columns the rules read"""
+        return list(dict.fromkeys(term["indicator"] for term in self.terms))
+
+    def features(self, indicators):
+        """
+        Indicator frame -> (X, integral): X is the children x terms feature matrix,
+        integral flags terms whose feature is always a whole number
+        """
+        return term_features(indicators, self.terms)
+
+    def evaluate(self, X):
+        """Feature matrix -> (domain scores, composite score, tier codes; -1 = no tier)"""
+        scores = np.zeros((X.shape[0], len(self.domains)))
+        # Accumulate term by term (the config's order), so sums round exactly
+        # like the written-out formula
+        for k, domain_index in enumerate(self.term_domain):
+            scores[:, domain_index] = scores[:, domain_index] + X[:, k] * self.points[k]
+        scores = np.clip(scores, self.clip[:, 0], self.clip[:, 1])
+
+        composite = self.composite(scores)
+        return scores, composite, self.tier_codes(composite)
+
+    def composite(self, scores):
+        """Domain score matrix (children x domains, in self.domains order) -> weighted composite"""
+        composite = np.zeros(scores.shape[0])
+        for domain_index, weight in enumerate(self.weights):
+            composite = composite + scores[:, domain_index] * weight
+        return composite
+
+    def tier_codes(self, composite):
+        """Right-closed bins with the lowest edge included (same as pd.cut(include_lowest=True))"""
+        codes = np.searchsorted(self.bins, composite, side="left") - 1
+        codes[composite == self.bins[0]] = 0
+        codes[~((composite >= self.bins[0]) & (composite <= self.bins[-1]))] = -1
+        return codes
+
+    def tiers(self, codes):
+        """Tier codes -> ordered categorical of tier labels"""
+        return pd.Categorical.from_codes(codes, categories=self.labels, ordered=True)
+
+    def _domain_frame(self, scores, integral, index):
+        """Domain score matrix -> frame; int64 for domains whose terms are all whole numbers"""
+        domains = pd.DataFrame(index=index)
+        for domain_index, domain in enumerate(self.domains):
+            in_domain = self.term_domain == domain_index
+            whole = integral[in_domain].all() and np.all(self.points[in_domain] % 1 == 0)
+            domains[domain] = scores[:, domain_index].astype("int64" if whole else "float64")
+        return domains
+
+    def domain_scores(self, indicators):
+        """Indicator frame -> frame of domain scores"""
+        X, integral = self.features(indicators)
+        scores, _, _ = self.evaluate(X)
+        return self._domain_frame(scores, integral, indicators.index)
+
+    def score(self, indicators):
+        """Indicator frame -> frame of domain scores, composite_risk_score and risk_tier"""
+        X, integral = self.features(indicators)
+        scores, composite, codes = self.evaluate(X)
+
+        result = self._domain_frame(scores, integral, indicators.index)
+        result["composite_risk_score"] = composite
+        result["risk_tier"] = self.tiers(codes)
+        return result
+
+
+def term_features(indicators, terms):
+    """Evaluate terms against an indicator frame -> (X, integral); see ScoringRules.features"""
+    X = np.empty((len(indicators), len(terms)))
+    integral = np.empty(len(terms), dtype=bool)
+
+    for k, term in enumerate(terms):
+        column = indicators[term["indicator"]]
+        values = column.astype(float).to_numpy()
+        values = np.where(np.isnan(values), float(term.get("fill", 0)), values)
+
+        if "op" in term:
+            values = OPS[term["op"]](values, float(term["value"])).astype(float)
+        if "transform" in term:
+            values = TRANSFORMS[term["transform"]](values)
+
+        X[:, k] = values
+        integral[k] = "transform" not in term and (
+            "op" in term or isinstance(term.get("fill"), bool) or column.dtype.kind in "biu"
+        )
+
+    return X, integral
+
+
+def _merge_config(base, overrides):
+    """Deep-merge overrides onto a copy of base (dicts merge, other values replace)"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def load_scoring_rules(rules=None):
+    """ScoringRules passthrough, or load from a path (default: scoring_rules.json)"""
+    if isinstance(rules, ScoringRules):
+        return rules
+    return ScoringRules.from_file(rules)
+
+
+def resolve_scenario(spec, baseline):
+    """
+    Scenario spec -> ScoringRules: a ScoringRules, a rules file path, or a dict of
+    overrides merged onto the baseline config (see ScoringRules.with_overrides)
+    """
+    if isinstance(spec, dict):
+        return baseline.with_overrides(spec)
+    return load_scoring_rules(spec)
+
+
+def _term_key(domain, term):
+    """Terms that compute the same feature for the same domain share a column"""
+    return (domain, term["indicator"], json.dumps(term.get("fill", 0)), term.get("op"),
+            json.dumps(term.get("value")), term.get("transform"))
+
+
+def sweep(indicators, scenarios, baseline=None, chunk_size=100_000):
+    """
+    Score every scenario against one indicator frame in a batched array pass.
+
+    scenarios: {name: spec} (see resolve_scenario); baseline: ScoringRules or
+    path (default: scoring_rules.json), always included as scenario "baseline".
+
+    The union of all scenarios' terms becomes one feature matrix X (children x
+    terms) and each scenario a row of a points matrix (0 for terms it lacks),
+    so domain scores for all scenarios are one (scenarios x children x domains)
+    tensor, clipped and weighted per scenario. Children are processed in chunks
+    of chunk_size to bound the tensor's size. Terms accumulate in baseline
+    order, so the baseline (and any scenario that only changes weights/tiers)
+    matches ScoringRules.score exactly.
+
+    Returns a dict:
+        summary:   per scenario - children per tier, mean composite score,
+                   mean delta vs. baseline, number of children changing tier
+        composite: children x scenarios composite scores (index: indicators.index)
+        delta:     composite minus the baseline composite
+        tier:      children x scenarios tier labels (categorical)
+    """
+    baseline = load_scoring_rules(baseline)
+    rules = {"baseline": baseline}
+    for name, spec in scenarios.items():
+        if name == "baseline":
+            raise ValueError("'baseline' is reserved for the baseline rules")
+        rules[name] = resolve_scenario(spec, baseline)
+    names = list(rules)
+
+    # Union of domains and terms, baseline first
+    domains = list(dict.fromkeys(d for r in rules.values() for d in r.domains))
+    term_index = {}
+    union_terms = []
+    for r in rules.values():
+        for term, domain_index in zip(r.terms, r.term_domain):
+            key = _term_key(r.domains[domain_index], term)
+            if key not in term_index:
+                term_index[key] = len(union_terms)
+                union_terms.append((domains.index(key[0]), term))
+
+    num_scenarios, num_terms, num_domains = len(names), len(union_terms), len(domains)
+    points = np.zeros((num_scenarios, num_terms))
+    weights = np.zeros((num_scenarios, num_domains))
+    clip = np.tile([0.0, 0.0], (num_scenarios, num_domains, 1))
+    for s, r in enumerate(rules.values()):
+        for term, domain_index, term_points in zip(r.terms, r.term_domain, r.points):
+            points[s, term_index[_term_key(r.domains[domain_index], term)]] += term_points
+        for domain_index, domain in enumerate(r.domains):
+            d = domains.index(domain)
+            weights[s, d] = r.weights[domain_index]
+            clip[s, d] = r.clip[domain_index]
+
+    term_domain = np.array([domain_index for domain_index, _ in union_terms], dtype=int)
+    X, _ = term_features(indicators, [term for _, term in union_terms])
+
+    composite = np.empty((len(indicators), num_scenarios))
+    for start in range(0, len(indicators), chunk_size):
+        X_chunk = X[start:start + chunk_size]
+        scores = np.zeros((num_scenarios, len(X_chunk), num_domains))
+        for k, d in enumerate(term_domain):
+            scores[:, :, d] = scores[:, :, d] + X_chunk[None, :, k] * points[:, k, None]
+        scores = np.clip(scores, clip[:, None, :, 0], clip[:, None, :, 1])
+
+        chunk_composite = np.zeros((num_scenarios, len(X_chunk)))
+        for d in range(num_domains):
+            chunk_composite = chunk_composite + scores[:, :, d] * weights[:, d, None]
+        composite[start:start + chunk_size] = chunk_composite.T
+
+    # Tier bins/labels differ in length between scenarios: one searchsorted each
+    composite = pd.DataFrame(composite, index=indicators.index, columns=names)
+    delta = composite.sub(composite["baseline"], axis=0)
+    tier = pd.DataFrame({
+        name: r.tiers(r.tier_codes(composite[name].to_numpy()))
+        for name, r in rules.items()
+    }, index=indicators.index)
+
+    labels = list(dict.fromkeys(label for r in rules.values() for label in r.labels))
+    baseline_tier = tier["baseline"].astype(object)
+    baseline_untiered = baseline_tier.isna()
+    summary = pd.DataFrame({
+        name: tier[name].value_counts().reindex(labels, fill_value=0) for name in names
+    }).T.fillna(0).astype(int)
+    summary["mean_composite"] = composite.mean()
+    summary["mean_delta"] = delta.mean()
+    summary["tier_changes"] = [
+        int(((tier[name].astype(object) != baseline_tier)
+             & ~(tier[name].isna() & baseline_untiered)).sum())
+        for name in names
+    ]
+
+    return {"summary": summary, "composite": composite, "delta": delta, "tier": tier}
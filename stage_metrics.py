@@ -0,0 +1,166 @@
+"""
+ECIDS Stage Metrics - Per-stage timing and memory instrumentation
+
+Records, for each stage of a pipeline run (table loads, domain calculators,
+merges, ...):
+- wall_seconds: elapsed time (time.perf_counter)
+- cpu_seconds: CPU time of this process (time.process_time)
+- rows: rows produced by the stage (None where it doesn't apply)
+- rss_mb / rss_delta_mb: resident memory after the stage and its change
+  over the stage (Linux /proc; None elsewhere)
+
+Stages nest: the outermost stage is a run, and starts a fresh list of
+records (StageMetrics.last_run) in which each stage appears in the order it
+started, with its nesting depth; runs of sub-scorers and worker processes are
+merged into it (StageMetrics.merge). Runs can be appended to a JSON lines file
+or written as Prometheus text exposition (e.g. for node_exporter's textfile
+collector), so a scheduler can alert when a stage slows down.
+"""
+
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 2**20 if hasattr(os, "sysconf") else None
+PROMETHEUS_PREFIX = "ecids_scorer_stage"
+# Record field -> (Prometheus metric suffix, help text)
+PROMETHEUS_METRICS = {
+    "wall_seconds": ("wall_seconds", "Wall-clock time of the stage"),
+    "cpu_seconds": ("cpu_seconds", "CPU time of the stage"),
+    "rows": ("rows", "Rows produced by the stage"),
+    "rss_delta_mb": ("rss_delta_megabytes", "Change in resident memory over the stage"),
+}
+
+
+def rss_mb():
+    """Resident memory of this process in MB (None where /proc isn't available)"""
+    try:
+        return int(Path("/proc/self/statm").read_text().split()[1]) * PAGE_MB
+    except (OSError, TypeError):
+        return None
+
+
+def result_rows(result):
+    """Rows in a stage result: len() of frames/arrays, None for anything else"""
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+class StageMetrics:
+    """Collects stage records; the outermost stage starts a new run"""
+
+    def __init__(self):
+        self.last_run = []
+        self._depth = 0
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Record one stage. Yields its record dict, so the block can fill in
+        record["rows"] once it knows them.
+        """
+        if self._depth == 0:
+            self.last_run = []
+        record = {"stage": name, "depth": self._depth, "rows": rows}
+        self.last_run.append(record)
+
+        start_rss = rss_mb()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        self._depth += 1
+        try:
+            yield record
+        finally:
+            self._depth -= 1
+            end_rss = rss_mb()
+            record["wall_seconds"] = round(time.perf_counter() - start_wall, 6)
+            record["cpu_seconds"] = round(time.process_time() - start_cpu, 6)
+            record["rss_mb"] = None if end_rss is None else round(end_rss, 1)
+            record["rss_delta_mb"] = None if end_rss is None else round(end_rss - start_rss, 1)
+
+    def merge(self, records, **fields):
+        """
+        Add another run's stage records (a subset scorer, a worker process)
+        under the stage currently running, tagged with any extra fields
+        (e.g. shard=3). rss_mb of merged records is that of their own process.
+        """
+        for record in records:
+            self.last_run.append({**record, **fields, "depth": record["depth"] + self._depth})
+
+
+def instrumented(name=None, rows=None):
+    """
+    Method decorator: record each call as a stage of self.metrics.
+
+    name: stage name (default: the method name)
+    rows: function (self, result) -> rows (default: len(result) where defined)
+    """
+    def decorator(method):
+        stage_name = name or method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.stage(stage_name) as record:
+                result = method(self, *args, **kwargs)
+                record["rows"] = rows(self, result) if rows is not None else result_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def write_metrics_jsonl(records, path, **labels):
+    """Append one JSON line per stage record, stamped with the time and any labels"""
+    recorded_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps({"recorded_at": recorded_at, **labels, **record}) + "\n")
+
+
+def prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(records, prefix=PROMETHEUS_PREFIX, **labels):
+    """
+    Prometheus text exposition of stage records: one gauge per field,
+    labelled by stage, plus shard for records merged from score_parallel
+    workers (each shard is its own process, so its times are kept apart
+    rather than added to the parent's). Repeated stages of one process are
+    summed into one sample.
+    """
+    totals = {}
+    for record in records:
+        total = totals.setdefault((record["stage"], record.get("shard")), {})
+        for field in PROMETHEUS_METRICS:
+            if record.get(field) is not None:
+                total[field] = total.get(field, 0) + record[field]
+
+    lines = []
+    for field, (suffix, help_text) in PROMETHEUS_METRICS.items():
+        metric = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for (stage, shard), total in totals.items():
+            if field not in total:
+                continue
+            sample_labels = {**labels, "stage": stage}
+            if shard is not None:
+                sample_labels["shard"] = shard
+            label_text = ",".join(f'{key}="{prometheus_label(value)}"'
+                                  for key, value in sample_labels.items())
+            lines.append(f"{metric}{{{label_text}}} {round(total[field], 6)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(records, path, **labels):
+    """Write prometheus_text atomically (textfile collectors may read at any time)"""
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(prometheus_text(records, **labels))
+    os.replace(tmp_path, path)
@@ -0,0 +1,22 @@
+"""Shared fixtures: the repository root on sys.path, and small ECIDS directories"""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SYNTHETIC_DATA = ROOT / "synthetic_data"
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A scratch copy of synthetic_data's CSVs (no cache), safe to modify"""
+    out = tmp_path / "data"
+    out.mkdir()
+    for csv_path in SYNTHETIC_DATA.glob("*.csv"):
+        shutil.copy(csv_path, out / csv_path.name)
+    return out
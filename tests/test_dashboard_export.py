@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from dashboard_export import build_bundle, encode_column
+
+
+def test_bool_flags_with_missing_values_stay_boolean():
+    flags = pd.Series([True, False, np.nan], dtype=object)
+    assert encode_column(flags) == {"type": "boolean", "values": [True, False, None]}
+
+    nullable = pd.Series([True, None, False], dtype="boolean")
+    assert encode_column(nullable) == {"type": "boolean", "values": [True, None, False]}
+
+
+def test_repetitive_strings_are_dictionary_encoded():
+    county = pd.Series(["BOONE", "ADAIR", "BOONE", None, "BOONE"])
+    assert encode_column(county) == {"type": "dictionary", "dictionary": ["ADAIR", "BOONE"],
+                                     "codes": [1, 0, 1, -1, 1]}
+
+
+def test_programs_list():
+    full_df = pd.DataFrame({"programs_enrolled": ["Head Start, Child Care", None, "Head Start"]})
+    bundle = build_bundle(full_df)
+    assert bundle["columns"]["programs_list"] == {
+        "type": "list", "dictionary": ["Child Care", "Head Start"], "codes": [[1, 0], [], [1]]}
+
+
+def test_full_dataset_program_columns(data_dir):
+    from risk_scoring import ReadinessRiskScorer
+
+    participation = pd.read_csv(data_dir / "ChildParticipation.csv", dtype=str)
+    dropped = participation["Child DCN"].drop_duplicates().iloc[:5]
+    participation[~participation["Child DCN"].isin(dropped)].to_csv(
+        data_dir / "ChildParticipation.csv", index=False)
+
+    scorer = ReadinessRiskScorer(data_dir, use_cache=False)
+    scorer.load_data()
+    full_df = scorer.generate_full_dataset()
+
+    no_programs = full_df["Child DCN"].isin(dropped)
+    assert (full_df.loc[no_programs, "total_enrollments"] == 0).all()
+    assert full_df["total_enrollments"].dtype.kind == "i"
+
+    # programs_mask bit i is the bundle's programs_list dictionary entry i
+    programs_list = build_bundle(full_df)["columns"]["programs_list"]
+    for mask, codes in zip(full_df["programs_mask"], programs_list["codes"]):
+        assert mask == sum(2 ** code for code in codes)
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from ecids_io import read_ecids_csv
+
+
+def rewrite(path, edit):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    edit(df)
+    df.to_csv(path, index=False)
+
+
+def test_blank_counts_read_as_na(data_dir):
+    columns = ["PercentOfFederalPovertyLevel", "FamilyIncome", "NumberOfPeopleInFamily",
+               "WeightAtBirth", "WeeksOfGestation"]
+
+    def blank(df):
+        df.loc[3, columns] = ""
+    rewrite(data_dir / "Child.csv", blank)
+
+    df = read_ecids_csv(data_dir / "Child.csv", "Child")
+    assert df.loc[3, columns].isna().all()
+    assert df.loc[4, columns].notna().all()
+
+
+def test_non_iso_dates_warn_and_read_as_missing(data_dir):
+    def us_date(df):
+        df.loc[5, "BirthDate"] = "03/12/2020"
+    rewrite(data_dir / "Child.csv", us_date)
+
+    with pytest.warns(UserWarning, match="BirthDate: 1 values are not YYYY-MM-DD"):
+        df = read_ecids_csv(data_dir / "Child.csv", "Child")
+    assert pd.api.types.is_datetime64_any_dtype(df["BirthDate"])
+    assert pd.isna(df.loc[5, "BirthDate"])
+    assert df["BirthDate"].notna().sum() == len(df) - 1
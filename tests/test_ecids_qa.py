@@ -0,0 +1,20 @@
+import pandas as pd
+
+from ecids_qa import qa_report
+
+
+def test_blank_participation_dcn_fails_the_checks(data_dir):
+    participation_file = data_dir / "ChildParticipation.csv"
+    participation = pd.read_csv(participation_file, dtype=str, keep_default_na=False)
+    clean = qa_report(data_dir)
+    assert clean["passed"]
+    assert clean["checks"]["missing_participation_dcns"] == 0
+
+    participation.loc[0, "Child DCN"] = ""
+    participation.to_csv(participation_file, index=False)
+    report = qa_report(data_dir)
+
+    assert not report["passed"]
+    assert report["checks"]["missing_participation_dcns"] == 1
+    assert report["participation"]["episodes"] == len(participation)
+    assert report["participation"]["children_with_gap"] <= clean["participation"]["children_with_gap"]
@@ -0,0 +1,141 @@
+"""
+rescore_incremental vs. a full rescore over several simulated days of
+delta files built from synthetic_data
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SYNTHETIC_DATA
+from ecids_io import ECIDS_SCHEMAS
+from risk_scoring import ReadinessRiskScorer
+
+NUM_DAYS = 4
+# Event tables whose new rows arrive in the daily deltas
+DELTA_TABLES = ["ChildParticipation", "ChildScreening", "ChildImmunization", "ChildOutcomes"]
+
+
+def read_raw(table):
+    """A flat file as verbatim strings (blanks stay blank)"""
+    return pd.read_csv(SYNTHETIC_DATA / ECIDS_SCHEMAS[table]["file"], dtype=str,
+                       keep_default_na=False)
+
+
+def write_tables(out_dir, tables):
+    out_dir.mkdir(parents=True)
+    for table, df in tables.items():
+        df.to_csv(out_dir / ECIDS_SCHEMAS[table]["file"], index=False)
+
+
+def simulate_days(seed=7):
+    """
+    (base tables, [delta tables per day], DCN): each of NUM_DAYS days brings
+    new event rows for existing children, an updated Child.csv row and two new
+    children. On a final day, a single new child (the DCN) arrives with
+    participation but no outcome rows, so that re-score sees no outcomes at all.
+    """
+    rng = np.random.default_rng(seed)
+    base = {table: read_raw(table) for table in ECIDS_SCHEMAS}
+    dcns = base["Child"]["Child DCN"]
+    # The last few children only arrive in the deltas, two per day
+    new_children = [dcns.iloc[-2 * NUM_DAYS:][2 * day:2 * day + 2].tolist() for day in range(NUM_DAYS)]
+    no_outcomes_child = dcns.iloc[-2 * NUM_DAYS - 1]
+    new_children.append([no_outcomes_child])
+
+    days = [dict() for _ in range(NUM_DAYS + 1)]
+    arrivals = {}
+    for table, df in base.items():
+        if table == "Child":
+            day = np.full(len(df), -1)
+        elif table in DELTA_TABLES:
+            # About 3% of each table's rows arrive later
+            day = np.where(rng.random(len(df)) < 0.03, rng.integers(0, NUM_DAYS, len(df)), -1)
+        else:
+            day = np.full(len(df), -1)
+        for d, children in enumerate(new_children):
+            day[df["Child DCN"].isin(children).to_numpy()] = d
+        arrivals[table] = day
+
+    outcomes = base["ChildOutcomes"]
+    keep = (outcomes["Child DCN"] != no_outcomes_child).to_numpy()
+    base["ChildOutcomes"], arrivals["ChildOutcomes"] = outcomes[keep], arrivals["ChildOutcomes"][keep]
+
+    for table, df in base.items():
+        for d in range(NUM_DAYS + 1):
+            rows = df[arrivals[table] == d]
+            if len(rows):
+                days[d][table] = rows
+        base[table] = df[arrivals[table] == -1]
+
+    # Child.csv updates: an existing child becomes homeless each day
+    for d in range(NUM_DAYS):
+        updated = base["Child"].iloc[[10 * (d + 1)]].copy()
+        updated["HomelessnessStatus"] = "Yes"
+        days[d]["Child"] = pd.concat([updated, days[d].get("Child", updated.iloc[:0])])
+    return base, days, no_outcomes_child
+
+
+def upsert_children(current, delta):
+    """Child.csv after a delta: updated rows in place, new children last"""
+    updated = current.set_index("Child DCN")
+    delta = delta.set_index("Child DCN")
+    existing = delta.index.isin(updated.index)
+    updated.loc[delta.index[existing]] = delta[existing]
+    return pd.concat([updated, delta[~existing]]).reset_index()
+
+
+def test_incremental_matches_full_rescore(tmp_path):
+    base, days, no_outcomes_child = simulate_days()
+    state = dict(base)
+    write_tables(tmp_path / "day0", state)
+    scores = ReadinessRiskScorer(tmp_path / "day0", use_cache=False).calculate_all_indicators()
+
+    for day, delta in enumerate(days, start=1):
+        delta_dir = tmp_path / f"delta{day}"
+        write_tables(delta_dir, delta)
+        # Day 2 reads the previous scores back from CSV, as the nightly job does
+        previous = scores
+        if day == 2:
+            previous = tmp_path / "risk_scores.csv"
+            scores.to_csv(previous, index=False)
+
+        incremental = ReadinessRiskScorer(tmp_path / f"day{day - 1}",
+                                          use_cache=False).rescore_incremental(previous, delta_dir)
+
+        for table, rows in delta.items():
+            state[table] = (upsert_children(state[table], rows) if table == "Child"
+                            else pd.concat([state[table], rows], ignore_index=True))
+        write_tables(tmp_path / f"day{day}", state)
+        full = ReadinessRiskScorer(tmp_path / f"day{day}", use_cache=False).calculate_all_indicators()
+
+        pd.testing.assert_frame_equal(incremental, full, check_dtype=False)
+        scores = incremental
+
+    # The child who never had outcome rows was scored (no TypeError on empty ratings)
+    row = scores.loc[scores["Child DCN"] == no_outcomes_child].iloc[0]
+    assert not row["has_outcomes_data"]
+    assert pd.isna(row["avg_cos_rating"])
+
+
+def test_no_deltas_keeps_previous_scores(tmp_path):
+    scorer = ReadinessRiskScorer(SYNTHETIC_DATA, use_cache=False)
+    previous = scorer.calculate_all_indicators()
+    (tmp_path / "empty").mkdir()
+    assert scorer.rescore_incremental(previous, tmp_path / "empty") is previous
+
+
+def test_stale_previous_scores_are_rejected(tmp_path):
+    base = {table: read_raw(table) for table in ECIDS_SCHEMAS}
+    write_tables(tmp_path / "day0", base)
+    write_tables(tmp_path / "delta", {"ChildParticipation": base["ChildParticipation"].head(1)})
+    scorer = ReadinessRiskScorer(tmp_path / "day0", use_cache=False)
+    previous = scorer.calculate_all_indicators()
+
+    # Scores from an older scorer (fewer columns), and DCNs without leading zeros
+    with pytest.raises(ValueError, match="rerun a full score"):
+        scorer.rescore_incremental(previous.drop(columns="num_overlapping_episodes"), tmp_path / "delta")
+    unpadded = previous.assign(**{"Child DCN": previous["Child DCN"].str.lstrip("0")})
+    with pytest.raises(ValueError, match="not in Child.csv"):
+        ReadinessRiskScorer(tmp_path / "day0", use_cache=False).rescore_incremental(
+            unpadded, tmp_path / "delta")
@@ -0,0 +1,22 @@
+import pytest
+
+from ecids_io import HAS_PYARROW, cache_paths
+from risk_scoring import ReadinessRiskScorer
+
+pytestmark = pytest.mark.skipif(not HAS_PYARROW, reason="the cache needs pyarrow")
+
+
+def test_replaced_tables_skip_the_cache_until_reloaded(data_dir):
+    parquet_path, _ = cache_paths(data_dir, "indicators")
+    scorer = ReadinessRiskScorer(data_dir)
+    scorer.df_outcomes = scorer.df_outcomes.iloc[:0]
+
+    # In-memory tables no longer match the files: never cached
+    scorer.indicator_matrix()
+    assert not parquet_path.exists()
+
+    # After a reload they do again
+    scorer.load_data()
+    full = scorer.indicator_matrix()
+    assert parquet_path.exists()
+    assert full.equals(scorer.indicator_matrix())
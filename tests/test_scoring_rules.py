@@ -0,0 +1,15 @@
+import pytest
+
+from scoring_rules import ScoringRules
+
+
+def test_weights_must_sum_to_one():
+    rules = ScoringRules.from_file()
+    weights = dict(rules.config["weights"])
+
+    with pytest.raises(ValueError, match="sum to 1"):
+        rules.with_overrides({"weights": {domain: 0.5 for domain in weights}})
+
+    # Rounding noise is fine
+    first = next(iter(weights))
+    rules.with_overrides({"weights": {first: weights[first] + 1e-12}})
@@ -0,0 +1,107 @@
+"""
+calculate_stability_indicators vs. the original per-child loop, on
+synthetic_data (which has overlapping episodes) with some children's
+participation removed
+"""
+
+import pandas as pd
+import pytest
+
+import timeline
+from conftest import SYNTHETIC_DATA
+from risk_scoring import ReadinessRiskScorer
+
+LOOP_COLUMNS = ["num_participation_episodes", "total_attendance_days",
+                "num_enrollment_gaps", "max_gap_days", "has_gap_over_6mo"]
+
+
+def reference_stability(df_participation):
+    """The per-child loop calculate_stability_indicators used to run (one row per child with episodes)"""
+    part_stats = df_participation.groupby("Child DCN").agg({
+        "EnrollmentDate": "count",
+        "NumberOfDaysInAttendance": "sum"
+    }).rename(columns={
+        "EnrollmentDate": "num_participation_episodes",
+        "NumberOfDaysInAttendance": "total_attendance_days"
+    }).reset_index()
+
+    gap_stats = []
+    for dcn in df_participation["Child DCN"].unique():
+        child_parts = df_participation[df_participation["Child DCN"] == dcn].sort_values("EnrollmentDate")
+
+        num_gaps = 0
+        max_gap = 0
+        has_long_gap = False
+
+        if len(child_parts) >= 2:
+            for i in range(len(child_parts) - 1):
+                end_date = child_parts.iloc[i]["ServicePlanEndDate"]
+                start_date = child_parts.iloc[i + 1]["EnrollmentDate"]
+                gap_days = (start_date - end_date).days
+
+                if gap_days > 30:
+                    num_gaps += 1
+                    max_gap = max(max_gap, gap_days)
+                    if gap_days > 180:  # 6 months
+                        has_long_gap = True
+
+        gap_stats.append({
+            "Child DCN": dcn,
+            "num_enrollment_gaps": num_gaps,
+            "max_gap_days": max_gap,
+            "has_gap_over_6mo": has_long_gap
+        })
+
+    stability = part_stats.merge(pd.DataFrame(gap_stats), on="Child DCN", how="left")
+    return stability.set_index("Child DCN")
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    scorer = ReadinessRiskScorer(SYNTHETIC_DATA, use_cache=False)
+    # Children without any participation episodes
+    no_participation = scorer.df_child["Child DCN"].iloc[:25]
+    scorer.df_participation = scorer.df_participation[
+        ~scorer.df_participation["Child DCN"].isin(no_participation)]
+    return scorer
+
+
+def test_matches_per_child_loop(scorer):
+    stability = scorer.calculate_stability_indicators()
+    assert stability.index.equals(pd.Index(scorer.df_child["Child DCN"]))
+    assert (stability["num_overlapping_episodes"] > 0).sum() > 100
+
+    expected = reference_stability(scorer.df_participation)
+    actual = stability.loc[expected.index, LOOP_COLUMNS]
+    # Integer widths (nullable Int16 attendance, NaN-able reindexed columns) and the
+    # DCN index dtype differ; the values must not
+    pd.testing.assert_frame_equal(actual.astype(float), expected.astype(float),
+                                  check_index_type=False)
+
+
+def test_children_without_participation(scorer):
+    stability = scorer.calculate_stability_indicators()
+    missing = ~stability.index.isin(scorer.df_participation["Child DCN"])
+    assert missing.sum() == 25
+    assert stability.loc[missing, LOOP_COLUMNS].isna().all().all()
+
+
+@pytest.mark.parametrize("kernel", [timeline._timeline_numpy, timeline._timeline_loop],
+                         ids=["numpy", "loop"])
+def test_blank_participation_dcn_is_ignored(data_dir, monkeypatch, kernel):
+    # _timeline_loop is what Numba compiles when it's installed
+    monkeypatch.setattr(timeline, "timeline_kernel", kernel)
+    participation_file = data_dir / "ChildParticipation.csv"
+    participation = pd.read_csv(participation_file, dtype=str, keep_default_na=False)
+
+    expected = ReadinessRiskScorer(data_dir, use_cache=False).calculate_stability_indicators()
+
+    # An extra episode with a blank DCN, dated to open a gap for whichever child it joined
+    blank = participation.iloc[[0]].assign(**{"Child DCN": "", "EnrollmentDate": "2030-01-01",
+                                              "ServicePlanEndDate": "2030-06-30"})
+    pd.concat([blank, participation]).to_csv(participation_file, index=False)
+    scorer = ReadinessRiskScorer(data_dir, use_cache=False)
+    assert scorer.df_participation["Child DCN"].isna().sum() == 1
+
+    pd.testing.assert_frame_equal(scorer.calculate_stability_indicators(), expected)
+    scorer.calculate_all_indicators()
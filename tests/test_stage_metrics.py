@@ -0,0 +1,55 @@
+import pandas as pd
+
+from ecids_io import ECIDS_SCHEMAS
+from risk_scoring import ReadinessRiskScorer
+from stage_metrics import prometheus_text
+
+
+def stages_under(records, parent):
+    """Stage names of the records nested under the first `parent` record"""
+    start = next(i for i, record in enumerate(records) if record["stage"] == parent)
+    nested = []
+    for record in records[start + 1:]:
+        if record["depth"] <= records[start]["depth"]:
+            break
+        nested.append(record)
+    return nested
+
+
+def test_score_parallel_merges_worker_stages(data_dir):
+    scorer = ReadinessRiskScorer(data_dir, use_cache=False)
+    scorer.score_parallel(workers=2, num_shards=3)
+
+    records = scorer.last_run_metrics
+    nested = stages_under(records, "score_parallel")
+    shard_runs = [record for record in nested if record["stage"] == "calculate_all_indicators"]
+    assert [record["shard"] for record in shard_runs] == [0, 1, 2]
+    assert all(record["depth"] == 1 for record in shard_runs)
+    assert sum(record["rows"] for record in shard_runs) == len(scorer.df_child)
+    assert {"calculate_stability_indicators", "calculate_composite_score"} <= {
+        record["stage"] for record in nested}
+
+    # Each shard's worker stages are their own samples, not summed into one
+    text = prometheus_text(records)
+    worker_samples = [line for line in text.splitlines()
+                      if line.startswith("ecids_scorer_stage_wall_seconds{")
+                      and 'stage="calculate_all_indicators"' in line]
+    assert [line.split('shard="')[1][0] for line in worker_samples] == ["0", "1", "2"]
+    assert 'ecids_scorer_stage_wall_seconds{stage="score_parallel"}' in text
+
+
+def test_rescore_incremental_merges_subset_stages(data_dir, tmp_path):
+    delta_dir = tmp_path / "delta"
+    delta_dir.mkdir()
+    child_file = ECIDS_SCHEMAS["Child"]["file"]
+    pd.read_csv(data_dir / child_file, dtype=str, keep_default_na=False).head(3).to_csv(
+        delta_dir / child_file, index=False)
+
+    scorer = ReadinessRiskScorer(data_dir, use_cache=False)
+    previous = scorer.calculate_all_indicators()
+    scorer.rescore_incremental(previous, delta_dir)
+
+    nested = stages_under(scorer.last_run_metrics, "rescore_incremental")
+    subset_run = next(record for record in nested if record["stage"] == "calculate_all_indicators")
+    assert subset_run["rows"] == 3
+    assert "calculate_developmental_indicators" in {record["stage"] for record in nested}
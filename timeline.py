@@ -0,0 +1,149 @@
+"""
+ECIDS Readiness Risk Index - Episode Timeline Features
+
+Per-child features of participation episode timelines, from (child, start,
+end) arrays sorted by child then start date, in one linear pass:
+- num_gaps:     episodes starting more than GAP_DAYS after the previous
+                episode's end
+- max_gap:      longest such gap in days (0 if none)
+- num_overlaps: episodes starting on or before the latest end of an earlier
+                episode (concurrent enrollment)
+- covered_days: days covered by the union of episodes (start and end inclusive)
+
+Dates are int64 day numbers with NAT_DAYS for missing dates. A missing date
+never counts as a gap, and episodes with a missing start or end add no
+coverage or overlap. The kernel is compiled with Numba when it's installed;
+otherwise an equivalent vectorized NumPy version is used.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+GAP_DAYS = 30  # A break longer than this counts as an enrollment gap
+NAT_DAYS = np.iinfo(np.int64).min  # datetime64 NaT viewed as int64
+TIMELINE_COLUMNS = ["num_gaps", "max_gap", "num_overlaps", "covered_days"]
+
+
+def _timeline_loop(codes, start, end, num_children):
+    """Reference kernel: one pass over the sorted episodes (compiled with Numba if available)"""
+    num_gaps = np.zeros(num_children, dtype=np.int64)
+    max_gap = np.zeros(num_children, dtype=np.int64)
+    num_overlaps = np.zeros(num_children, dtype=np.int64)
+    covered_days = np.zeros(num_children, dtype=np.int64)
+
+    prev_code = -1
+    prev_end = NAT_DAYS
+    latest_end = NAT_DAYS  # Latest end of the child's earlier episodes
+    for i in range(len(codes)):
+        code = codes[i]
+        if code != prev_code:
+            prev_code = code
+            prev_end = NAT_DAYS
+            latest_end = NAT_DAYS
+        elif start[i] != NAT_DAYS and prev_end != NAT_DAYS:
+            gap = start[i] - prev_end
+            if gap > GAP_DAYS:
+                num_gaps[code] += 1
+                if gap > max_gap[code]:
+                    max_gap[code] = gap
+
+        if start[i] != NAT_DAYS and end[i] != NAT_DAYS:
+            if latest_end != NAT_DAYS and start[i] <= latest_end:
+                num_overlaps[code] += 1
+            new_days = end[i] - max(start[i] - 1, latest_end)
+            if new_days > 0:
+                covered_days[code] += new_days
+            if end[i] > latest_end:
+                latest_end = end[i]
+        prev_end = end[i]
+
+    return num_gaps, max_gap, num_overlaps, covered_days
+
+
+def _timeline_numpy(codes, start, end, num_children):
+    """Vectorized equivalent of _timeline_loop"""
+    codes = np.asarray(codes, dtype=np.int64)
+    start = np.asarray(start, dtype=np.int64)
+    end = np.asarray(end, dtype=np.int64)
+    if len(codes) == 0:
+        return tuple(np.zeros(num_children, dtype=np.int64) for _ in TIMELINE_COLUMNS)
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+
+    # Gaps: each episode's start vs. the previous episode's end (same child)
+    prev_end = np.empty_like(end)
+    prev_end[0] = NAT_DAYS
+    prev_end[1:] = end[:-1]
+    has_gap_dates = ~first & (start != NAT_DAYS) & (prev_end != NAT_DAYS)
+    gap = np.where(has_gap_dates, start - np.where(has_gap_dates, prev_end, 0), 0)
+    is_gap = gap > GAP_DAYS
+
+    num_gaps = np.bincount(codes[is_gap], minlength=num_children).astype(np.int64)
+    max_gap = np.zeros(num_children, dtype=np.int64)
+    np.maximum.at(max_gap, codes[is_gap], gap[is_gap])
+
+    # Latest earlier end per child: a running max made per-child by shifting every
+    # child onto its own band of day numbers (codes are sorted, so bands increase)
+    valid = (start != NAT_DAYS) & (end != NAT_DAYS)
+    if valid.any():
+        origin = min(start[valid].min(), end[valid].min()) - 1
+        span = max(start[valid].max(), end[valid].max()) - origin + 1
+    else:
+        origin, span = 0, 1
+    band = codes * span
+    # Invalid episodes sit at their band's floor (0 = nothing covered yet)
+    shifted_end = np.where(valid, end - origin, 0) + band
+    running = np.maximum.accumulate(shifted_end)
+    latest_end = np.empty_like(running)
+    latest_end[0] = band[0]
+    latest_end[1:] = running[:-1]
+    latest_end = np.where(first, band, latest_end) - band
+
+    shifted_start = start - origin
+    overlaps = valid & (latest_end > 0) & (shifted_start <= latest_end)
+    new_days = np.where(valid, (end - origin) - np.maximum(shifted_start - 1, latest_end), 0)
+
+    num_overlaps = np.bincount(codes[overlaps], minlength=num_children).astype(np.int64)
+    covered_days = np.bincount(codes, weights=np.maximum(new_days, 0),
+                               minlength=num_children).astype(np.int64)
+    return num_gaps, max_gap, num_overlaps, covered_days
+
+
+if HAS_NUMBA:
+    timeline_kernel = numba.njit(cache=True, nogil=True)(_timeline_loop)
+else:
+    timeline_kernel = _timeline_numpy
+
+
+def to_days(dates):
+    """datetime Series/array -> int64 day numbers (NAT_DAYS where missing)"""
+    return np.asarray(dates, dtype="datetime64[D]").view(np.int64)
+
+
+def episode_timelines(dcns, start_dates, end_dates):
+    """
+    Timeline features per child (index: sorted unique DCNs, as groupby gives).
+
+    Episodes are ordered by DCN, then start date (stable, missing starts last,
+    as sort_values puts them) before running timeline_kernel. Episodes with a
+    missing DCN belong to no child and are left out, as groupby drops them.
+    """
+    codes, uniques = pd.factorize(pd.Series(dcns), sort=True)
+    start = to_days(start_dates)
+    end = to_days(end_dates)
+
+    sort_start = np.where(start == NAT_DAYS, np.iinfo(np.int64).max, start)
+    # factorize codes missing DCNs as -1, which the kernels would index with
+    has_dcn = np.flatnonzero(codes >= 0)
+    order = has_dcn[np.lexsort((sort_start[has_dcn], codes[has_dcn]))]
+    features = timeline_kernel(codes[order].astype(np.int64), start[order], end[order],
+                               len(uniques))
+
+    index = pd.Index(uniques, name=getattr(dcns, "name", None))
+    return pd.DataFrame(dict(zip(TIMELINE_COLUMNS, features)), index=index)